@@ -7,6 +7,11 @@ from typing import List
 
 from PIL import Image
 
+try:
+    import numpy as np
+except ImportError:  # The pure-Python engine doesn't need it
+    np = None
+
 from pdqhashing.types.containers import HashAndQuality, HashesAndQuality
 from pdqhashing.types.hash256 import Hash256
 from pdqhashing.utils.matrix import MatrixUtil
@@ -59,14 +64,25 @@ class PDQHasher:
             d[i] = di
         return d
 
-    def __init__(self) -> None:
+    def __init__(self, useNumpy=None) -> None:
         """Christoph Zauner 'Implementation and Benchmarking of Perceptual
         Image Hash Functions' 2010
 
         See also comments on dct64To16. Input is (0..63)x(0..63); output is
         (1..16)x(1..16) with the latter indexed as (0..15)x(0..15).
-        Returns 16x64 matrix."""
+        Returns 16x64 matrix.
+
+        useNumpy picks the engine fromFile, fromBufferedImage and
+        dihedralFromFile hash with: NumPy arrays (around 20x faster), or
+        Python lists. By default NumPy is used if it is installed."""
         self.DCT_matrix = self.compute_dct_matrix()
+        if useNumpy is None:
+            useNumpy = np is not None
+        if useNumpy and np is None:
+            raise ImportError("useNumpy requires numpy to be installed")
+        self.useNumpy = useNumpy
+        if useNumpy:
+            self.DCT_array = np.array(self.DCT_matrix)
 
     class HashingMetadata:
         def __init__(self) -> None:
@@ -86,15 +102,8 @@ class PDQHasher:
         t2 = time.time()
         readSeconds = t2 - t1
         numCols, numRows = img.size
-        buffer1 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
-        buffer2 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
-        buffer64x64 = MatrixUtil.allocateMatrix(64, 64)
-        buffer16x64 = MatrixUtil.allocateMatrix(16, 64)
-        buffer16x16 = MatrixUtil.allocateMatrix(16, 16)
         t1 = time.time()
-        rv = self.fromImage(
-            img, buffer1, buffer2, buffer64x64, buffer16x64, buffer16x16
-        )
+        rv = self._hashImage(img)
         t2 = time.time()
 
         if hashingMetadata is not None:
@@ -110,6 +119,12 @@ class PDQHasher:
             img.thumbnail((512, 512))
         except IOError as e:
             raise e
+        return self._hashImage(img)
+
+    def _hashImage(self, img):
+        """fromImage or fromImageNumpy, depending on self.useNumpy"""
+        if self.useNumpy:
+            return self.fromImageNumpy(img)
         numCols, numRows = img.size
         buffer1 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
         buffer2 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
@@ -179,23 +194,26 @@ class PDQHasher:
         hashingMetadata.readSeconds = t2 - t1
         numCols, numRows = img.size
         hashingMetadata.imageHeightTimesWidth = numRows * numCols
-        buffer1 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
-        buffer2 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
-        buffer64x64 = MatrixUtil.allocateMatrix(64, 64)
-        buffer16x64 = MatrixUtil.allocateMatrix(16, 64)
-        buffer16x16 = MatrixUtil.allocateMatrix(16, 16)
-        buffer16x16Aux = MatrixUtil.allocateMatrix(16, 16)
         t1 = time.time()
-        rv = self.dihedralFromBufferedImage(
-            img,
-            buffer1,
-            buffer2,
-            buffer64x64,
-            buffer16x64,
-            buffer16x16,
-            buffer16x16Aux,
-            dihFlags,
-        )
+        if self.useNumpy:
+            rv = self.dihedralFromImageNumpy(img, dihFlags)
+        else:
+            buffer1 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
+            buffer2 = MatrixUtil.allocateMatrixAsRowMajorArray(numRows, numCols)
+            buffer64x64 = MatrixUtil.allocateMatrix(64, 64)
+            buffer16x64 = MatrixUtil.allocateMatrix(16, 64)
+            buffer16x16 = MatrixUtil.allocateMatrix(16, 16)
+            buffer16x16Aux = MatrixUtil.allocateMatrix(16, 16)
+            rv = self.dihedralFromBufferedImage(
+                img,
+                buffer1,
+                buffer2,
+                buffer64x64,
+                buffer16x64,
+                buffer16x16,
+                buffer16x16Aux,
+                dihFlags,
+            )
         t2 = time.time()
         hashingMetadata.hashSeconds = t2 - t1
         return rv
@@ -675,3 +693,104 @@ class PDQHasher:
         while j < numCols:
             cls.box1DFloat(input, j, output, j, numRows, numCols, windowSize)
             j += 1
+
+    # ----------------------------------------------------------------
+    # NumPy engine: the same steps as above, on whole arrays at once.
+
+    def fromImageNumpy(self, img):
+        """fromImage, computed with NumPy arrays rather than Python lists"""
+        dct16x16, quality = self.dct16x16FromImageNumpy(img)
+        return HashAndQuality(self.pdqBuffer16x16ToBitsNumpy(dct16x16), quality)
+
+    def dihedralFromImageNumpy(self, img, dihFlags):
+        """dihedralFromBufferedImage, computed with NumPy arrays rather than
+        Python lists. See the table above dct16OriginalToRotate90 for the
+        sign patterns."""
+        A, quality = self.dct16x16FromImageNumpy(img)
+        odd = (np.arange(16) & 1) == 1
+        oddRows = np.where(odd, 1.0, -1.0)[:, np.newaxis]
+        oddCols = np.where(odd, 1.0, -1.0)[np.newaxis, :]
+        checkerboard = oddRows * oddCols
+        transforms = [
+            (self.PDQ_DO_DIH_ORIGINAL, lambda: A),
+            (self.PDQ_DO_DIH_ROTATE_90, lambda: (A * oddCols).T),
+            (self.PDQ_DO_DIH_ROTATE_180, lambda: A * checkerboard),
+            (self.PDQ_DO_DIH_ROTATE_270, lambda: (A * oddRows).T),
+            (self.PDQ_DO_DIH_FLIPX, lambda: A * oddRows),
+            (self.PDQ_DO_DIH_FLIPY, lambda: A * oddCols),
+            (self.PDQ_DO_DIH_FLIP_PLUS1, lambda: A.T),
+            (self.PDQ_DO_DIH_FLIP_MINUS1, lambda: (A * checkerboard).T),
+        ]
+        hashes = [
+            self.pdqBuffer16x16ToBitsNumpy(transform())
+            if (dihFlags & flag) != 0
+            else None
+            for flag, transform in transforms
+        ]
+        return HashesAndQuality(*hashes, quality)
+
+    def dct16x16FromImageNumpy(self, img):
+        """The 16x16 DCT output and the quality, from the luma of the image"""
+        rgb = np.asarray(img.convert("RGB"), dtype=np.float64)
+        luma = (
+            self.LUMA_FROM_R_COEFF * rgb[..., 0]
+            + self.LUMA_FROM_G_COEFF * rgb[..., 1]
+            + self.LUMA_FROM_B_COEFF * rgb[..., 2]
+        )
+        numRows, numCols = luma.shape
+        windowSizeAlongRows = self.computeJaroszFilterWindowSize(numCols)
+        windowSizeAlongCols = self.computeJaroszFilterWindowSize(numRows)
+        for _i in range(self.PDQ_NUM_JAROSZ_XY_PASSES):
+            luma = self.boxAlongAxisNumpy(luma, windowSizeAlongRows, 1)
+            luma = self.boxAlongAxisNumpy(luma, windowSizeAlongCols, 0)
+        buffer64x64 = self.decimateFloatNumpy(luma)
+        quality = self.computePDQImageDomainQualityMetricNumpy(buffer64x64)
+        D = self.DCT_array
+        return D @ buffer64x64 @ D.T, quality
+
+    @classmethod
+    def boxAlongAxisNumpy(cls, input, windowSize, axis):
+        """box1DFloat along every row (axis=1) or column (axis=0) at once.
+
+        Each output is the mean of the inputs from halfWindowSize - 1 after it
+        to the rest of the window before it, or to the edge if that's closer.
+        The sums of the windows are differences of cumulative sums."""
+        halfWindowSize = int((windowSize + 2) / 2)
+        n = input.shape[axis]
+        k = np.arange(n)
+        hi = np.minimum(k + halfWindowSize, n)
+        lo = np.maximum(k - (windowSize - halfWindowSize), 0)
+        sums = np.insert(np.cumsum(input, axis=axis), 0, 0.0, axis=axis)
+        windowSums = np.take(sums, hi, axis=axis) - np.take(sums, lo, axis=axis)
+        counts = (hi - lo).astype(np.float64)
+        if axis == 0:
+            counts = counts[:, np.newaxis]
+        return windowSums / counts
+
+    @classmethod
+    def decimateFloatNumpy(cls, in_):
+        inNumRows, inNumCols = in_.shape
+        rows = [int(((i + 0.5) * inNumRows) / 64) for i in range(64)]
+        cols = [int(((j + 0.5) * inNumCols) / 64) for j in range(64)]
+        return in_[np.ix_(rows, cols)]
+
+    @classmethod
+    def computePDQImageDomainQualityMetricNumpy(cls, buffer64x64):
+        gradients = np.concatenate(
+            [
+                (buffer64x64[:-1, :] - buffer64x64[1:, :]).ravel(),
+                (buffer64x64[:, :-1] - buffer64x64[:, 1:]).ravel(),
+            ]
+        )
+        gradientSum = int(np.abs(np.trunc((gradients * 100) / 255)).sum())
+        return min(100, int(gradientSum / 90))
+
+    @classmethod
+    def pdqBuffer16x16ToBitsNumpy(cls, dctOutput16x16):
+        """pdqBuffer16x16ToBits. The Torben median is the (n + 1) / 2'th
+        smallest value, which np.partition finds directly."""
+        values = dctOutput16x16.ravel()
+        midn = int((len(values) + 1) / 2)
+        dctMedian = np.partition(values, midn - 1)[midn - 1]
+        bits = np.packbits((dctOutput16x16 > dctMedian).ravel(), bitorder="little")
+        return Hash256(int.from_bytes(bits.tobytes(), "little"))
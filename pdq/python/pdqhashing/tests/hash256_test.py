@@ -1,7 +1,7 @@
 # pyre-strict
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 from pdqhashing.types.exceptions import PDQHashFormatException
-from pdqhashing.types.hash256 import Hash256
+from pdqhashing.types.hash256 import Hash256, Hash256Array, np
 import unittest
 
 
@@ -72,3 +72,61 @@ class Hash256Test(unittest.TestCase):
 
         self.assertEqual(hash.bitwiseOR(hash_negative), hash_set_all)
         self.assertEqual(hash.bitwiseXOR(hash_negative), hash_set_all)
+
+    def test_bits_and_slots(self) -> None:
+        hash = Hash256()
+        hash.setBit(0)
+        hash.setBit(17)
+        hash.setBit(255)
+        self.assertEqual(hash.w[0], 1)
+        self.assertEqual(hash.w[1], 2)
+        self.assertEqual(hash.w[15], 0x8000)
+        self.assertEqual(hash.hammingNorm(), 3)
+        hash.flipBit(17)
+        self.assertEqual(hash.w[1], 0)
+        with self.assertRaises(TypeError):
+            hash.w[0] = 0
+        self.assertEqual(hash.w[0], 1)
+
+        slots = Hash256.fromHexString(self.SAMPLE_HASH).w
+        hash = Hash256()
+        hash.w = slots
+        self.assertEqual(str(hash), self.SAMPLE_HASH)
+        self.assertEqual(
+            len({Hash256.fromHexString(self.SAMPLE_HASH), hash, Hash256()}), 2
+        )
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class Hash256ArrayTest(unittest.TestCase):
+    HEX_STRINGS = [
+        Hash256Test.SAMPLE_HASH,
+        "0" * 64,
+        "f" * 64,
+        "0123456789abcdef" * 4,
+    ]
+
+    def test_from_hex_strings(self) -> None:
+        hashes = Hash256Array.fromHexStrings(self.HEX_STRINGS)
+        self.assertEqual(len(hashes), 4)
+        self.assertEqual([str(h) for h in hashes], self.HEX_STRINGS)
+        same = Hash256Array(Hash256.fromHexString(s) for s in self.HEX_STRINGS)
+        self.assertEqual(same.words.tolist(), hashes.words.tolist())
+        with self.assertRaises(PDQHashFormatException):
+            Hash256Array.fromHexStrings(["AAA"])
+
+    def test_hamming_distances(self) -> None:
+        hashes = Hash256Array.fromHexStrings(self.HEX_STRINGS)
+        singles = [Hash256.fromHexString(s) for s in self.HEX_STRINGS]
+        for query in singles:
+            expected = [query.hammingDistance(h) for h in singles]
+            self.assertEqual(hashes.hammingDistances(query).tolist(), expected)
+            self.assertEqual(
+                hashes.indicesWithinDistance(query, 128).tolist(),
+                [i for i, d in enumerate(expected) if d <= 128],
+            )
+        matrix = hashes.hammingDistanceMatrix(Hash256Array(singles[:2]))
+        self.assertEqual(
+            matrix.tolist(),
+            [[q.hammingDistance(h) for h in singles] for q in singles[:2]],
+        )
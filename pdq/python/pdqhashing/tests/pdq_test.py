@@ -2,7 +2,7 @@ import os
 
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
-from pdqhashing.hasher.pdq_hasher import PDQHasher
+from pdqhashing.hasher.pdq_hasher import PDQHasher, np
 from pdqhashing.types.hash256 import Hash256
 import unittest
 
@@ -100,3 +100,31 @@ class PdqTest(unittest.TestCase):
             hamming_distance = computed_hash.hammingDistance(expected_hash)
             print(computed_hash, expected_hash, hamming_distance)
             self.assertLessEqual(hamming_distance, hamming_tolerance)
+
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_numpy_engine(self) -> None:
+        python_pdq = PDQHasher(useNumpy=False)
+        numpy_pdq = PDQHasher(useNumpy=True)
+        for path in (
+            SAMPLE_MEDIA + "misc-images/small.jpg",
+            SAMPLE_MEDIA + "misc-images/wee.jpg",
+            SAMPLE_MEDIA + "reg-test-input/labelme-subset/q0003.jpg",
+        ):
+            expected = python_pdq.fromFile(path)
+            computed = numpy_pdq.fromFile(path)
+            self.assertEqual(computed.getHash(), expected.getHash())
+            self.assertEqual(computed.getQuality(), expected.getQuality())
+
+        path = SAMPLE_MEDIA + "reg-test-input/dih/bridge-1-original.jpg"
+        expected = python_pdq.dihedralFromFile(
+            path, PDQHasher.HashingMetadata(), PDQHasher.PDQ_DO_DIH_ALL
+        )
+        computed = numpy_pdq.dihedralFromFile(
+            path, PDQHasher.HashingMetadata(), PDQHasher.PDQ_DO_DIH_ALL
+        )
+        self.assertEqual(vars(computed), vars(expected))
+        computed = numpy_pdq.dihedralFromFile(
+            path, PDQHasher.HashingMetadata(), PDQHasher.PDQ_DO_DIH_ROTATE_90
+        )
+        self.assertIsNone(computed.hash)
+        self.assertEqual(computed.hashRotate90, expected.hashRotate90)
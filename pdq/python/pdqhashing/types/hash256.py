@@ -1,13 +1,34 @@
 #!/usr/bin/env python
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import re
 from random import randint
 
+try:
+    import numpy as np
+except ImportError:  # Only Hash256Array needs it
+    np = None
+
 from pdqhashing.types.exceptions import PDQHashFormatException
 
+_HEX_RE = re.compile("[0-9a-fA-F]{64}")
+
+
+def _popcount(x):
+    return x.bit_count()
+
+
+if not hasattr(int, "bit_count"):  # Before Python 3.10
+
+    def _popcount(x):
+        return bin(x).count("1")
+
 
 class Hash256:
-    """256-bit hashes with Hamming distance"""
+    """256-bit hashes with Hamming distance
+
+    The hash is stored as a single 256-bit int, value. Bit k of the hash is
+    bit k of value, and bit (k & 15) of the 16-bit slot k >> 4 in w."""
 
     # 16 slots of 16 bits each.
     # See hashing/pdq/README-MIH.md in this repo for why not 8x32 or 32x8, etc.
@@ -15,35 +36,37 @@ class Hash256:
 
     HASH256_HEX_NUM_NYBBLES = 4 * HASH256_NUM_SLOTS
 
-    def __init__(self) -> None:
-        self.w = [0] * self.HASH256_NUM_SLOTS
+    HASH256_ALL_BITS = (1 << 256) - 1
+
+    def __init__(self, value=0) -> None:
+        self.value = value
+
+    @property
+    def w(self):
+        """The 16-bit slots, lowest first. A tuple, so it can't be changed in
+        place: assign to w, or use setBit/flipBit, to change the hash."""
+        return tuple(
+            (self.value >> (16 * i)) & 0xFFFF for i in range(self.HASH256_NUM_SLOTS)
+        )
+
+    @w.setter
+    def w(self, slots):
+        value = 0
+        for i, slot in enumerate(slots):
+            value |= (int(slot) & 0xFFFF) << (16 * i)
+        self.value = value
 
     def getNumWords(self):
         return self.HASH256_NUM_SLOTS
 
     def clone(self):
-        rv = Hash256()
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            rv.w[i] = self.w[i]
-            i += 1
-        return rv
+        return Hash256(self.value)
 
     def __str__(self):
-        i = self.HASH256_NUM_SLOTS - 1
-        result = []
-        while i >= 0:
-            result.append("{:04x}".format(self.w[i] & 0xFFFF))
-            i = i - 1
-        return "".join(result)
+        return "{:064x}".format(self.value)
 
     def __repr__(self):
-        i = self.HASH256_NUM_SLOTS - 1
-        result = []
-        while i >= 0:
-            result.append("{:04x}".format(self.w[i] & 0xFFFF))
-            i = i - 1
-        return "".join(result)
+        return self.__str__()
 
     def toHexString(self):
         return self.__str__()
@@ -52,16 +75,9 @@ class Hash256:
     def fromHexString(cls, s):
         if len(s) != cls.HASH256_HEX_NUM_NYBBLES:
             raise PDQHashFormatException("Incorrect length", s)
-
-        rv = Hash256()
-        i = cls.HASH256_NUM_SLOTS
-        for x in range(0, len(s), 4):
-            try:
-                i -= 1
-                rv.w[i] = int(s[x : x + 4], 16)
-            except ValueError:
-                raise PDQHashFormatException("Incorrect format", s)
-        return rv
+        if not _HEX_RE.fullmatch(s):
+            raise PDQHashFormatException("Incorrect format", s)
+        return Hash256(int(s, 16))
 
     @classmethod
     def hammingNorm16(cls, h):
@@ -69,116 +85,47 @@ class Hash256:
 
     @classmethod
     def bitCount(cls, x):
-        x -= (x >> 1) & 0x55555555
-        x = ((x >> 2) & 0x33333333) + (x & 0x33333333)
-        x = ((x >> 4) + x) & 0x0F0F0F0F
-        x += x >> 8
-        x += x >> 16
-        return x & 0x0000003F
+        return _popcount(x & 0xFFFFFFFF)
 
     def clearAll(self):
-        for i in range(self.HASH256_NUM_SLOTS):
-            self.w[i] = 0
+        self.value = 0
 
     def setAll(self):
-        for i in range(self.HASH256_NUM_SLOTS):
-            self.w[i] = 0xFFFF
+        self.value = self.HASH256_ALL_BITS
 
     def hammingNorm(self):
-        n = 0
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            n += self.hammingNorm16(self.w[i])
-            i += 1
-        return n
+        return _popcount(self.value)
 
     def hammingDistance(self, that):
-        n = 0
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            n += self.hammingNorm16(int((self.w[i] ^ that.w[i])))
-            i += 1
-        return n
+        return _popcount(self.value ^ that.value)
 
     def hammingDistanceLE(self, that, d) -> bool:
-        e = 0
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            e += self.hammingNorm16(int((self.w[i] ^ that.w[i])))
-            if e > d:
-                return False
-            i += 1
-        return True
+        return _popcount(self.value ^ that.value) <= d
 
     def setBit(self, k):
-        self.w[(k & 255) >> 4] |= 1 << (k & 15)
+        self.value |= 1 << (k & 255)
 
     def flipBit(self, k):
-        self.w[(k & 255) >> 4] ^= 1 << (k & 15)
+        self.value ^= 1 << (k & 255)
 
     def bitwiseXOR(self, that):
-        rv = Hash256()
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            rv.w[i] = int((self.w[i] ^ that.w[i]))
-            i += 1
-        return rv
+        return Hash256(self.value ^ that.value)
 
     def bitwiseAND(self, that):
-        rv = Hash256()
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            rv.w[i] = int((self.w[i] & that.w[i]))
-            i += 1
-        return rv
+        return Hash256(self.value & that.value)
 
     def bitwiseOR(self, that):
-        rv = Hash256()
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            rv.w[i] = int((self.w[i] | that.w[i]))
-            i += 1
-        return rv
+        return Hash256(self.value | that.value)
 
     def bitwiseNOT(self):
-        rv = Hash256()
-        i = 0
-        while i < self.HASH256_NUM_SLOTS:
-            rv.w[i] = int((~self.w[i])) & 0xFFFF
-            i += 1
-        return rv
+        return Hash256(self.value ^ self.HASH256_ALL_BITS)
 
     def dumpBits(self):
-        i = self.HASH256_NUM_SLOTS - 1
-        str = []
-        while i >= 0:
-            word = self.w[i] & 0xFFFF
-            j = 15
-            bits = []
-            while j >= 0:
-                if (word & (1 << j)) != 0:
-                    bits.append("1")
-                else:
-                    bits.append("0")
-                j -= 1
-            str.append(" ".join(bits))
-            i -= 1
-        return "\n".join(str)
+        bits = "{:0256b}".format(self.value)
+        return "\n".join(" ".join(bits[i : i + 16]) for i in range(0, 256, 16))
 
     def dumpBitsAcross(self):
-        i = self.HASH256_NUM_SLOTS - 1
-        str = []
-        while i >= 0:
-            word = self.w[i] & 0xFFFF
-            j = 15
-            while j >= 0:
-                if (word & (1 << j)) != 0:
-                    str.append("1")
-                else:
-                    str.append("0")
-                j -= 1
-            i -= 1
-        return " ".join(str)
+        return " ".join("{:0256b}".format(self.value))
 
     def dumpWords(self):
         return ",".join(str(v) for v in list(reversed(self.w)))
@@ -197,27 +144,85 @@ class Hash256:
 
     def __eq__(self, other) -> bool:
         if isinstance(other, (Hash256,)):
-            for i in range(self.HASH256_NUM_SLOTS):
-                if self.w[i] != other.w[i]:
-                    return False
-            return True
+            return self.value == other.value
         else:
             return False
 
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    # Slots are compared in order, lowest first
     def __gt__(self, other) -> bool:
-        # pyre-fixme[16]: `int` has no attribute `__iter__`.
-        for i in self.HASH256_NUM_SLOTS:
-            if self.w[i] > other.w[i]:
-                return True
-            elif self.w[i] < other.w[i]:
-                return False
-        return False
+        return self.w > other.w
 
     def __lt__(self, other) -> bool:
-        # pyre-fixme[16]: `int` has no attribute `__iter__`.
-        for i in self.HASH256_NUM_SLOTS:
-            if self.w[i] < other.w[i]:
-                return True
-            elif self.w[i] > other.w[i]:
-                return False
-        return False
+        return self.w < other.w
+
+
+class Hash256Array:
+    """Many Hash256s, stored as an (n, 4) NumPy array of 64-bit words, for
+    computing distances against all of them at once. Requires NumPy."""
+
+    def __init__(self, hashes=()) -> None:
+        if np is None:
+            raise ImportError("Hash256Array requires numpy to be installed")
+        raw = b"".join(h.value.to_bytes(32, "little") for h in hashes)
+        self.words = np.frombuffer(raw, dtype="<u8").reshape(-1, 4)
+
+    @classmethod
+    def fromHexStrings(cls, strings):
+        strings = list(strings)
+        for s in strings:
+            if len(s) != Hash256.HASH256_HEX_NUM_NYBBLES or not _HEX_RE.fullmatch(s):
+                raise PDQHashFormatException("Incorrect format", s)
+        rv = cls()
+        # Hex strings are big-endian, words are little-endian
+        raw = np.frombuffer(bytes.fromhex("".join(strings)), dtype=np.uint8)
+        rv.words = (
+            np.ascontiguousarray(raw.reshape(-1, 32)[:, ::-1])
+            .view("<u8")
+            .reshape(-1, 4)
+        )
+        return rv
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, i):
+        return Hash256(int.from_bytes(self.words[i].astype("<u8").tobytes(), "little"))
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def hammingDistances(self, that):
+        """The distance from that (a Hash256) to each hash, as an int array"""
+        query = np.frombuffer(that.value.to_bytes(32, "little"), dtype="<u8")
+        return self._popcounts(self.words ^ query)
+
+    def hammingDistanceMatrix(self, that):
+        """The distance from each hash of that (a Hash256Array) to each hash,
+        as a (len(that), len(self)) int array"""
+        return self._popcounts(that.words[:, np.newaxis, :] ^ self.words)
+
+    def indicesWithinDistance(self, that, d):
+        """The indices of the hashes at most d from that (a Hash256)"""
+        return np.flatnonzero(self.hammingDistances(that) <= d)
+
+    @classmethod
+    def _popcounts(cls, words):
+        """Sums the bit counts of the last axis of words"""
+        if hasattr(np, "bitwise_count"):  # NumPy 2
+            counts = np.bitwise_count(words)
+        else:
+            counts = _BYTE_POPCOUNTS[
+                np.ascontiguousarray(words).view(np.uint8).reshape(
+                    words.shape[:-1] + (-1,)
+                )
+            ]
+        return counts.sum(axis=-1, dtype=np.int64)
+
+
+_BYTE_POPCOUNTS = (
+    None if np is None else np.array([_popcount(i) for i in range(256)], np.uint8)
+)
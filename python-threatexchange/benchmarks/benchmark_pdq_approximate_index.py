@@ -0,0 +1,186 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import argparse
+import time
+
+import numpy
+import faiss
+
+from pdq_benchmark_utils import (
+    generate_random_hash,
+    generate_random_hash_with_hamming_distance,
+)
+from threatexchange.signal_type.pdq.pdq_approximate_index import (
+    METHOD_HNSW,
+    METHOD_IVF,
+    PDQApproximateIndex,
+)
+from threatexchange.signal_type.pdq.pdq_faiss_matcher import PDQFlatHashIndex
+
+parser = argparse.ArgumentParser(
+    description="Benchmark recall vs latency of PDQApproximateIndex against exact PDQFlatHashIndex results",
+    formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+)
+
+parser.add_argument(
+    "--faiss-threads",
+    type=int,
+    default=1,
+    help="number of threads for faiss to use while searching",
+)
+parser.add_argument(
+    "--dataset-size",
+    type=int,
+    default=250000,
+    help="number of hashes to generate for the dataset to search against",
+)
+parser.add_argument(
+    "--num-queries",
+    type=int,
+    default=1000,
+    help="number of queries to generate for each search",
+)
+parser.add_argument(
+    "--thresholds",
+    type=int,
+    default=[15, 31],
+    choices=range(256),
+    nargs="+",
+    metavar="THRESHOLDS",
+    help="PDQ similarity threshold values to benchmark with",
+)
+parser.add_argument(
+    "--methods",
+    default=[METHOD_IVF, METHOD_HNSW],
+    choices=[METHOD_IVF, METHOD_HNSW],
+    nargs="+",
+    help="approximate index types to benchmark",
+)
+parser.add_argument(
+    "--nlist",
+    type=int,
+    help="number of IVF clusters, picked from the dataset size if not given",
+)
+parser.add_argument(
+    "--nprobes",
+    type=int,
+    default=[1, 4, 16, 64],
+    nargs="+",
+    help="IVF nprobe values to benchmark with",
+)
+parser.add_argument(
+    "--ef-searches",
+    type=int,
+    default=[16, 64, 256],
+    nargs="+",
+    help="HNSW efSearch values to benchmark with",
+)
+parser.add_argument("--seed", type=int, help="seed for random number generator")
+
+args = parser.parse_args()
+
+######
+# Print Benchmark Settings
+######
+
+print("Benchmark: PDQ Approximate Index Recall vs Latency")
+print("")
+print("Options:")
+for arg in vars(args):
+    print("\t", arg, ": ", getattr(args, arg))
+print("")
+
+######
+# Set up environment
+######
+
+faiss.omp_set_num_threads(args.faiss_threads)
+seed = args.seed if args.seed else time.time_ns()
+rng = numpy.random.default_rng(seed)
+if args.seed is None:
+    print("using random seed of ", seed)
+    print("use --seed ", seed, " to rerun with same random values")
+    print("")
+
+######
+# Generate Random Dataset and Build Indexes
+######
+
+dataset = [generate_random_hash(rng) for _ in range(args.dataset_size)]
+entries = [(h, i) for i, h in enumerate(dataset)]
+
+print("Building Stats:")
+
+start_build_flat_hash_index = time.time()
+flat_index = PDQFlatHashIndex()
+flat_index.add(dataset, custom_ids=range(args.dataset_size))
+print(
+    "\tPDQFlatHashIndex: time to build (s): ",
+    time.time() - start_build_flat_hash_index,
+)
+
+approximate_indices = {}
+for method in args.methods:
+    start_build = time.time()
+    approximate_indices[method] = PDQApproximateIndex.build(
+        entries, method=method, nlist=args.nlist
+    )
+    print(
+        f"\tPDQApproximateIndex({method}): time to build (s): ",
+        time.time() - start_build,
+    )
+print("")
+
+######
+# Run benchmarks for each requested search threshold
+######
+
+
+def recall(truth, results):
+    """
+    The fraction of all ground truth matches that were in the results
+    """
+    expected = sum(len(t) for t in truth)
+    found = sum(len(t & r) for t, r in zip(truth, results))
+    return found / expected * 100 if expected else 100.0
+
+
+for threshold in args.thresholds:
+    print("Benchmarks for threshold: ", threshold)
+
+    # Create queries with hamming distance of threshold compared to their search targets
+    search_targets = rng.choice(dataset, size=args.num_queries)
+    queries = [
+        generate_random_hash_with_hamming_distance(rng, target, threshold)
+        for target in search_targets
+    ]
+
+    start_flat_search = time.time()
+    flat_results = flat_index.search(queries, threshold, return_as_ids=True)
+    flat_time = time.time() - start_flat_search
+    truth = [set(r) for r in flat_results]
+
+    print(
+        "\tPDQFlatHashIndex - Time per query (ms): ",
+        flat_time / len(queries) * 1000,
+    )
+
+    for method, index in approximate_indices.items():
+        if method == METHOD_IVF:
+            knob, values = "nprobe", args.nprobes
+        else:
+            knob, values = "ef_search", args.ef_searches
+        for value in values:
+            setattr(index, knob, value)
+            start_search = time.time()
+            results = index.query_many(queries, threshold)
+            search_time = time.time() - start_search
+            print(
+                f"\tPDQApproximateIndex({method}, {knob}={value}) - "
+                f"Time per query (ms): {search_time / len(queries) * 1000:.4f}, "
+                f"speedup: {flat_time / search_time:.1f}x, "
+                "recall: "
+                f"{recall(truth, [{m.metadata for m in r} for r in results]):.1f}%"
+            )
+
+    print("")
@@ -1,15 +1,16 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
 import argparse
-import binascii
 import time
 import pickle
 
 import numpy
 import faiss
 
-from threatexchange.signal_type.pdq.pdq_utils import BITS_IN_PDQ
-
+from pdq_benchmark_utils import (
+    generate_random_hash,
+    generate_random_hash_with_hamming_distance,
+)
 from threatexchange.signal_type.pdq.pdq_faiss_matcher import (
     PDQFlatHashIndex,
     PDQMultiHashIndex,
@@ -47,6 +48,12 @@ parser.add_argument(
     metavar="THRESHOLDS",
     help="PDQ similarity threshold values to benchmark with",
 )
+parser.add_argument(
+    "--incremental-batch-size",
+    type=int,
+    default=1000,
+    help="number of hashes per add() when benchmarking incremental index builds",
+)
 parser.add_argument("--seed", type=int, help="seed for random number generator")
 
 args = parser.parse_args()
@@ -75,44 +82,11 @@ if args.seed is None:
     print("")
 
 
-def generate_random_hash():
-    """
-    returns a random 256 bit PDQ hash as a hexstring of 64 characters
-    """
-    hash_bytes = rng.bytes(BITS_IN_PDQ // 8)
-    return binascii.hexlify(hash_bytes).decode()
-
-
-def generate_random_distance_mask(hamming_distance):
-    """
-    returns a random numpy array of uint8s that can be used as bitwise mask
-    to generate a hash with the given hamming distance
-    """
-    ones = numpy.ones(hamming_distance, dtype=numpy.uint8)
-    bitmask = numpy.pad(
-        ones, (0, BITS_IN_PDQ - hamming_distance), "constant", constant_values=0
-    )
-    return numpy.packbits(rng.permutation(bitmask))
-
-
-def generate_random_hash_with_hamming_distance(original_hash, desired_hamming_distance):
-    """
-    returns a random 256 bit PDQ hash as a hexstring of 64 characters that is the given
-    hamming distance from the provided original hash
-    """
-    original_hash_bytes = numpy.frombuffer(
-        binascii.unhexlify(original_hash), dtype=numpy.uint8
-    )
-    mask = generate_random_distance_mask(desired_hamming_distance)
-    new_hash_bytes = numpy.bitwise_xor(original_hash_bytes, mask).tobytes()
-    return binascii.hexlify(new_hash_bytes).decode()
-
-
 ######
 # Generate Random Dataset and Build Indexes
 ######
 
-dataset = [generate_random_hash() for _ in range(args.dataset_size)]
+dataset = [generate_random_hash(rng) for _ in range(args.dataset_size)]
 
 
 custom_ids = [i + 100_000_000_000_000 for i in range(args.dataset_size)]
@@ -147,6 +121,34 @@ print(
 )
 print("")
 
+######
+# Benchmark building an index from many small batches
+######
+
+print("Incremental Building Stats (batches of ", args.incremental_batch_size, "):")
+# Time per tenth of the dataset should stay flat if adds are linear
+incremental_index = PDQMultiHashIndex()
+segment_size = max(args.dataset_size // 10, 1)
+start_incremental_build = time.time()
+start_segment = start_incremental_build
+for batch_start in range(0, args.dataset_size, args.incremental_batch_size):
+    batch_end = min(batch_start + args.incremental_batch_size, args.dataset_size)
+    incremental_index.add(
+        dataset[batch_start:batch_end], custom_ids[batch_start:batch_end]
+    )
+    if batch_end // segment_size != batch_start // segment_size:
+        now = time.time()
+        print(
+            f"\tPDQMultiHashIndex: {batch_end:,d} hashes, last segment (s): ",
+            now - start_segment,
+        )
+        start_segment = now
+print(
+    "\tPDQMultiHashIndex: total time to build incrementally (s): ",
+    time.time() - start_incremental_build,
+)
+print("")
+
 ######
 # Run benchmarks for each requested search threshold
 ######
@@ -156,7 +158,7 @@ for threshold in args.thresholds:
     # Create queries with hamming distance of threshold compared to their search targets
     search_targets = rng.choice(dataset, size=args.num_queries)
     queries = [
-        generate_random_hash_with_hamming_distance(target, threshold)
+        generate_random_hash_with_hamming_distance(rng, target, threshold)
         for target in search_targets
     ]
 
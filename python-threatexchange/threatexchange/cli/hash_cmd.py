@@ -19,6 +19,7 @@ from threatexchange.content_type.photo import PhotoContent
 from threatexchange.content_type.file import FileContent
 from threatexchange.content_type.content_base import RotationType
 
+from threatexchange.signal_type.pdq.signal import PdqSignal
 from threatexchange.signal_type.signal_base import FileHasher, SignalType
 from threatexchange.cli import command_base
 from threatexchange.cli.helpers import FlexFilesInputAction
@@ -158,6 +159,25 @@ class HashCommand(command_base.Command):
                         print(hasher.get_name(), hash_str)
             return
 
+        if (
+            self.photo_preprocess == "rotations"
+            and not self.save_preprocess
+            and all(issubclass(hasher, PdqSignal) for hasher in hashers)
+        ):
+            # Nothing to save, so hash the decoded rotations directly
+            for file in self.files:
+                image_bytes = file.read_bytes()
+                hashes_by_hasher = [
+                    (h, h.hash_all_rotations_from_bytes(image_bytes))
+                    for h in t.cast(t.List[t.Type[PdqSignal]], hashers)
+                ]
+                for rotation in RotationType:
+                    for pdq_hasher, rotation_hashes in hashes_by_hasher:
+                        hash_str = rotation_hashes[rotation]
+                        if hash_str:
+                            print(f"{rotation.name} {pdq_hasher.get_name()} {hash_str}")
+            return
+
         def pre_processed_files() -> (
             t.Iterator[t.Tuple[Path, bytes, t.Union[None, RotationType], str]]
         ):
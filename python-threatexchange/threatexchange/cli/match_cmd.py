@@ -29,6 +29,7 @@ from threatexchange.signal_type.signal_base import BytesHasher, SignalType
 from threatexchange.cli.cli_config import CLISettings
 from threatexchange.content_type.content_base import ContentType, RotationType
 from threatexchange.content_type.photo import PhotoContent
+from threatexchange.signal_type.pdq.signal import PdqSignal
 
 from threatexchange.signal_type.signal_base import MatchesStr, TextHasher, FileHasher
 from threatexchange.cli import command_base
@@ -274,6 +275,18 @@ def _match_file(
     with open(path, "rb") as f:
         image_data = f.read()
 
+    if issubclass(s_type, PdqSignal):
+        # Hash the decoded pixels directly rather than round-tripping
+        # every rotation through an encoded temporary file
+        return [
+            _IndexMatchWithRotation(match=match, rotation_type=rotation_type)
+            for rotation_type, hash in s_type.hash_all_rotations_from_bytes(
+                image_data
+            ).items()
+            if hash
+            for match in index.query(hash)
+        ]
+
     rotated_images: t.Dict[RotationType, bytes] = PhotoContent.all_simple_rotations(
         image_data
     )
@@ -301,7 +314,7 @@ def _match_file(
 def _match_hashes(
     path: pathlib.Path, s_type: t.Type[SignalType], index: SignalTypeIndex
 ) -> t.Sequence[_IndexMatchWithRotation]:
-    ret: t.List[_IndexMatchWithRotation] = []
+    hashes: t.List[str] = []
     for hash in path.read_text().splitlines():
         hash = hash.strip()
         if not hash:
@@ -317,6 +330,9 @@ def _match_hashes(
                 f"{hash_repr} from {path} is not a valid hash for {s_type.get_name()}",
                 2,
             )
-        matches = index.query(hash)
-        ret.extend([_IndexMatchWithRotation(match=match) for match in matches])
-    return ret
+        hashes.append(hash)
+    return [
+        _IndexMatchWithRotation(match=match)
+        for matches in index.query_many(hashes)
+        for match in matches
+    ]
@@ -10,6 +10,8 @@ from threatexchange.cli.tests.e2e_test_helper import (
 from threatexchange.content_type.content_base import RotationType
 from threatexchange.content_type.photo import PhotoContent
 from threatexchange.signal_type.md5 import VideoMD5Signal
+from threatexchange.signal_type.pdq.pdq_utils import simple_distance
+from threatexchange.signal_type.pdq.signal import PdqSignal
 
 
 class MatchCommandTest(ThreatExchangeCLIE2eTest):
@@ -67,7 +69,14 @@ class MatchCommandTest(ThreatExchangeCLIE2eTest):
                 elif rotation == RotationType.ROTATE90:
                     rotation = RotationType.ROTATE270
 
+                # Only the first match per collab is shown. The PDQ index
+                # returns matches in the order samples were added, so that's
+                # the first sample, which all the bridge-mods are close to.
+                distance = simple_distance(
+                    PdqSignal.hash_all_rotations_from_bytes(image)[rotation],
+                    PdqSignal.get_examples()[0],
+                )
                 self.assert_cli_output(
                     ("--rotations", "photo", tmp_file.name),
-                    f"pdq {rotation.name} 16 (Sample Signals) INVESTIGATION_SEED",
+                    f"pdq {rotation.name} {distance} (Sample Signals) INVESTIGATION_SEED",
                 )
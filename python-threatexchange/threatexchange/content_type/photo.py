@@ -106,6 +106,28 @@ class PhotoContent(ContentType):
         }
         return rotations
 
+    @classmethod
+    def all_simple_rotations_of_image(
+        cls, image: Image.Image
+    ) -> t.Dict[RotationType, Image.Image]:
+        """
+        Generate the 8 naive rotations of an already decoded image.
+
+        Same transformations as all_simple_rotations(), but without
+        re-encoding each variant, for hashers that can take pixels directly.
+        """
+        transpose = Image.Transpose
+        return {
+            RotationType.ORIGINAL: image,
+            RotationType.ROTATE90: image.transpose(transpose.ROTATE_90),
+            RotationType.ROTATE180: image.transpose(transpose.ROTATE_180),
+            RotationType.ROTATE270: image.transpose(transpose.ROTATE_270),
+            RotationType.FLIPX: image.transpose(transpose.FLIP_TOP_BOTTOM),
+            RotationType.FLIPY: image.transpose(transpose.FLIP_LEFT_RIGHT),
+            RotationType.FLIPPLUS1: image.transpose(transpose.TRANSPOSE),
+            RotationType.FLIPMINUS1: image.transpose(transpose.TRANSVERSE),
+        }
+
     @classmethod
     def unletterbox(cls, file_path: Path, black_threshold: int = 0) -> bytes:
         """
@@ -115,10 +137,9 @@ class PhotoContent(ContentType):
         with file_path.open("rb") as file:
             with Image.open(file) as image:
                 img = image.convert("RGB")
-                top = unletterboxing.detect_top_border(img, black_threshold)
-                bottom = unletterboxing.detect_bottom_border(img, black_threshold)
-                left = unletterboxing.detect_left_border(img, black_threshold)
-                right = unletterboxing.detect_right_border(img, black_threshold)
+                top, bottom, left, right = unletterboxing.detect_borders(
+                    img, black_threshold
+                )
 
                 width, height = image.size
                 cropped_img = image.crop((left, top, width - right, height - bottom))
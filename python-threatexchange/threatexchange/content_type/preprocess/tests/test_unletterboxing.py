@@ -0,0 +1,93 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import random
+import typing as t
+
+from PIL import Image
+
+from threatexchange.content_type.preprocess import unletterboxing
+
+
+def _pixel_by_pixel_borders(image: Image.Image, black_threshold: int):
+    """(top, bottom, left, right) checking every pixel with is_pixel_black"""
+    width, height = image.size
+
+    def is_black(xy: t.Tuple[int, int]) -> bool:
+        pixel = t.cast(t.Union[int, t.Tuple[int, ...]], image.getpixel(xy))
+        if isinstance(pixel, int):  # L
+            pixel = (pixel,) * 3
+        return unletterboxing.is_pixel_black(pixel[:3], black_threshold)
+
+    black_rows = [all(is_black((x, y)) for x in range(width)) for y in range(height)]
+    black_cols = [all(is_black((x, y)) for y in range(height)) for x in range(width)]
+
+    def leading_black(lines):
+        return next((i for i, black in enumerate(lines) if not black), len(lines))
+
+    return (
+        leading_black(black_rows),
+        leading_black(black_rows[::-1]),
+        leading_black(black_cols),
+        leading_black(black_cols[::-1]),
+    )
+
+
+def test_detect_borders():
+    """detect_borders matches each detect_*_border, and checking every pixel"""
+    rng = random.Random(42)
+    images = [
+        Image.new("RGB", (7, 5)),  # All black
+        Image.new("RGB", (1, 1), (16, 0, 0)),
+        Image.new("RGB", (1, 9)),
+        Image.new("RGB", (9, 1)),
+    ]
+    for width, height in [(1, 9), (9, 1), (1, 1), (6, 4), (13, 17)]:
+        for _ in range(10):
+            image = Image.new("RGB", (width, height))
+            for _ in range(rng.randrange(3)):
+                xy = (rng.randrange(width), rng.randrange(height))
+                color = tuple(rng.choice((0, 15, 16, 40)) for _ in range(3))
+                image.putpixel(xy, color)
+            images.append(image)
+
+    for image in images:
+        for black_threshold in (0, 15):
+            expected = _pixel_by_pixel_borders(image, black_threshold)
+            assert (
+                unletterboxing.detect_top_border(image, black_threshold),
+                unletterboxing.detect_bottom_border(image, black_threshold),
+                unletterboxing.detect_left_border(image, black_threshold),
+                unletterboxing.detect_right_border(image, black_threshold),
+            ) == expected
+            assert unletterboxing.detect_borders(image, black_threshold) == expected
+
+    assert unletterboxing.detect_borders(Image.new("RGB", (7, 5))) == (5, 5, 7, 7)
+    one_row = Image.new("RGB", (9, 1))
+    one_row.putpixel((2, 0), (0, 0, 16))
+    assert unletterboxing.detect_borders(one_row, 15) == (0, 0, 2, 6)
+    assert unletterboxing.detect_borders(one_row, 16) == (1, 1, 9, 9)
+    one_col = Image.new("RGB", (1, 9))
+    one_col.putpixel((0, 6), (16, 0, 0))
+    assert unletterboxing.detect_borders(one_col, 15) == (6, 2, 0, 0)
+    assert unletterboxing.detect_borders(one_col, 16) == (9, 9, 1, 1)
+
+
+def test_detect_borders_ignores_alpha():
+    image = Image.new("RGBA", (6, 4), (0, 0, 0, 255))
+    image.putpixel((2, 1), (40, 0, 0, 255))
+    assert unletterboxing.detect_borders(image) == (1, 2, 2, 3)
+    assert unletterboxing.detect_borders(image) == _pixel_by_pixel_borders(image, 0)
+    transparent = Image.new("RGBA", (6, 4), (40, 40, 40, 0))
+    assert unletterboxing.detect_borders(transparent, 40) == (4, 4, 6, 6)
+
+
+def test_detect_borders_grayscale():
+    image = Image.new("L", (6, 4))
+    image.putpixel((4, 2), 16)
+    for black_threshold in (0, 15, 16):
+        expected = _pixel_by_pixel_borders(image, black_threshold)
+        assert unletterboxing.detect_borders(image, black_threshold) == expected
+    assert unletterboxing.detect_borders(image, 15) == (2, 1, 4, 1)
+    # Converted to RGB first
+    palette = image.convert("P")
+    assert unletterboxing.detect_borders(palette, 15) == (2, 1, 4, 1)
@@ -3,6 +3,7 @@
 
 import typing as t
 
+import numpy as np
 from PIL import Image
 
 
@@ -14,22 +15,46 @@ def is_pixel_black(pixel: tuple, black_threshold: int):
     return r <= black_threshold and g <= black_threshold and b <= black_threshold
 
 
+def _non_black_mask(image: Image.Image, black_threshold: int) -> np.ndarray:
+    """
+    2D mask of the pixels with any color channel above the threshold
+
+    Alpha is ignored, and modes other than RGB(A) and L are converted to RGB.
+    """
+    if image.mode not in ("RGB", "RGBA", "L"):
+        image = image.convert("RGB")
+    pixels = np.asarray(image)
+    if pixels.ndim == 2:  # L
+        return pixels > black_threshold
+    # Elementwise across the color planes is much faster than max(axis=2)
+    r, g, b = (pixels[..., c] for c in range(3))
+    return np.maximum(np.maximum(r, g), b) > black_threshold
+
+
+def _non_black_lines(non_black: np.ndarray, axis: int) -> np.ndarray:
+    """
+    1D mask of the rows (axis=1) or columns (axis=0) with any non-black pixel
+    """
+    return t.cast(np.ndarray, non_black.any(axis=axis))
+
+
+def _leading_black(non_black: np.ndarray) -> int:
+    """
+    Count of leading False entries in a 1D mask of non-black rows or columns
+    """
+    if not non_black.any():
+        return len(non_black)
+    return int(non_black.argmax())
+
+
 def detect_top_border(image: Image.Image, black_threshold: int = 0) -> int:
     """
     Detect the top black border by counting rows with only black pixels.
     Checks each RGB channel of each pixel in each row.
     Returns the first row that is not all black from the top.
     """
-    width, height = image.size
-    for y in range(height):
-        row_pixels = list(image.crop((0, y, width, y + 1)).get_flattened_data())
-        if all(
-            is_pixel_black(t.cast(t.Tuple[t.Any, ...], pixel), black_threshold)
-            for pixel in row_pixels
-        ):
-            continue
-        return y
-    return height
+    rows = _non_black_lines(_non_black_mask(image, black_threshold), 1)
+    return _leading_black(rows)
 
 
 def detect_bottom_border(image: Image.Image, black_threshold: int = 0) -> int:
@@ -38,16 +63,8 @@ def detect_bottom_border(image: Image.Image, black_threshold: int = 0) -> int:
     Checks each RGB channel of each pixel in each row.
     Returns the first row that is not all black from the bottom.
     """
-    width, height = image.size
-    for y in range(height - 1, -1, -1):
-        row_pixels = list(image.crop((0, y, width, y + 1)).get_flattened_data())
-        if all(
-            is_pixel_black(t.cast(t.Tuple[t.Any, ...], pixel), black_threshold)
-            for pixel in row_pixels
-        ):
-            continue
-        return height - y - 1
-    return height
+    rows = _non_black_lines(_non_black_mask(image, black_threshold), 1)
+    return _leading_black(rows[::-1])
 
 
 def detect_left_border(image: Image.Image, black_threshold: int = 0) -> int:
@@ -56,16 +73,8 @@ def detect_left_border(image: Image.Image, black_threshold: int = 0) -> int:
     Checks each RGB channel of each pixel in each column.
     Returns the first column from the left that is not all black.
     """
-    width, height = image.size
-    for x in range(width):
-        col_pixels = list(image.crop((x, 0, x + 1, height)).get_flattened_data())
-        if all(
-            is_pixel_black(t.cast(t.Tuple[t.Any, ...], pixel), black_threshold)
-            for pixel in col_pixels
-        ):
-            continue
-        return x
-    return width
+    cols = _non_black_lines(_non_black_mask(image, black_threshold), 0)
+    return _leading_black(cols)
 
 
 def detect_right_border(image: Image.Image, black_threshold: int = 0) -> int:
@@ -74,13 +83,25 @@ def detect_right_border(image: Image.Image, black_threshold: int = 0) -> int:
     Checks each RGB channel of each pixel in each column.
     Returns the first column from the right that is not all black.
     """
-    width, height = image.size
-    for x in range(width - 1, -1, -1):
-        col_pixels = list(image.crop((x, 0, x + 1, height)).get_flattened_data())
-        if all(
-            is_pixel_black(t.cast(t.Tuple[t.Any, ...], pixel), black_threshold)
-            for pixel in col_pixels
-        ):
-            continue
-        return width - x - 1
-    return width
+    cols = _non_black_lines(_non_black_mask(image, black_threshold), 0)
+    return _leading_black(cols[::-1])
+
+
+def detect_borders(
+    image: Image.Image, black_threshold: int = 0
+) -> t.Tuple[int, int, int, int]:
+    """
+    Detect all four black borders with a single pass over the pixels.
+    Returns (top, bottom, left, right), the same as calling each of
+    detect_top_border, detect_bottom_border, detect_left_border and
+    detect_right_border.
+    """
+    non_black = _non_black_mask(image, black_threshold)
+    rows = _non_black_lines(non_black, 1)
+    cols = _non_black_lines(non_black, 0)
+    return (
+        _leading_black(rows),
+        _leading_black(rows[::-1]),
+        _leading_black(cols),
+        _leading_black(cols[::-1]),
+    )
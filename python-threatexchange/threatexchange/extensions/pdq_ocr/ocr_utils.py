@@ -12,12 +12,18 @@ import warnings
 from PIL import Image
 
 
-def text_from_image_file(path: pathlib.Path):
+def text_from_image_file(path: pathlib.Path) -> str:
     """
     Given a path to a file return predicted OCR text
     Current tested against: jpg
     """
-    img_pil = Image.open(path)
+    return text_from_image(Image.open(path))
+
+
+def text_from_image(img_pil: Image.Image) -> str:
+    """
+    Given an already opened image return predicted OCR text
+    """
     try:
         return pytesseract.image_to_string(img_pil)
     except pytesseract.TesseractNotFoundError as e:
@@ -8,18 +8,26 @@ Requires the installations of Optical character recognition (OCR) tools
 import typing as t
 import pathlib
 
+from PIL import Image
+
+from threatexchange import common
 from threatexchange.content_type.content_base import ContentType
 from threatexchange.content_type.photo import PhotoContent
 
+from threatexchange.signal_type.pdq.pdq_adaptive_index import PDQAdaptiveIndex
 from threatexchange.signal_type.pdq.signal import PdqSignal
 from threatexchange.signal_type.raw_text import RawTextSignal
+from threatexchange.signal_type import index
 from threatexchange.signal_type import signal_base
 from threatexchange.exchanges.impl.fb_threatexchange_signal import (
     HasFbThreatExchangeIndicatorType,
 )
 
-from threatexchange.signal_type.pdq.pdq_hasher import pdq_from_file
-from threatexchange.extensions.pdq_ocr.ocr_utils import text_from_image_file
+from threatexchange.signal_type.pdq.pdq_hasher import pdq_from_file, pdq_from_image
+from threatexchange.extensions.pdq_ocr.ocr_utils import (
+    text_from_image,
+    text_from_image_file,
+)
 
 
 class PdqOcrSignal(
@@ -56,6 +64,32 @@ class PdqOcrSignal(
 
         return f"{pdq_hash},{ocr_text}"
 
+    @classmethod
+    def hash_from_files(
+        cls,
+        files: t.Iterable[pathlib.Path],
+        ocr_cache: t.Optional[t.MutableMapping[str, str]] = None,
+    ) -> t.List[str]:
+        """
+        hash_from_file() for many files, only running OCR once per PDQ hash.
+
+        OCR is much slower than PDQ, so the OCR text of each PDQ hash is kept
+        in ocr_cache, and reused for later images with the same PDQ hash.
+        Pass the same ocr_cache to later calls to reuse it across them.
+        """
+        if ocr_cache is None:
+            ocr_cache = {}
+        ret = []
+        for file in files:
+            with Image.open(file) as image:
+                pdq_hash, _ = pdq_from_image(image)
+                ocr_text = ocr_cache.get(pdq_hash)
+                if ocr_text is None:
+                    ocr_text = text_from_image(image)
+                    ocr_cache[pdq_hash] = ocr_text
+            ret.append(f"{pdq_hash},{ocr_text}")
+        return ret
+
     @classmethod
     def compare_hash(
         cls,
@@ -80,9 +114,98 @@ class PdqOcrSignal(
             text_result.match, pdq_result.distance
         )
 
+    @classmethod
+    def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
+        return PdqOcrIndex
+
     @staticmethod
     def get_examples() -> t.List[str]:
         return [
             "a72dd3eadec2800ba74b59a9532d0b22011fd9e0daa1da3f576e602db999a754,This is a sample text string",
             "b2539a60de78841da72fcdeb5da21bf00185632ddaadb23d174ea1885999cb65,This is a sample text string",
         ]
+
+
+class PdqOcrIndex(index.SignalTypeIndex[index.T]):
+    """
+    Index for PdqOcrSignal, with the same matches as compare_hash().
+
+    The PDQ hashes go into a PDQ index, and the OCR text of each signal is
+    normalized once and kept alongside. Only the signals with a PDQ hash
+    within the threshold of the query's have their text compared.
+    """
+
+    def __init__(
+        self,
+        *,
+        pdq_dist_threshold: int = PdqOcrSignal.PDQ_PLUS_OCR_CONFIDENT_MATCH_THRESHOLD,
+    ) -> None:
+        # Values are positions in the lists below
+        self._pdq_index: PDQAdaptiveIndex[int] = PDQAdaptiveIndex(
+            threshold=pdq_dist_threshold
+        )
+        self._deduper: t.Dict[str, int] = {}
+        self._texts: t.List[str] = []
+        self._entries: t.List[t.List[index.T]] = []
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries)
+
+    @staticmethod
+    def _split(signal_str: str) -> t.Tuple[str, str]:
+        pdq_hash, _, ocr_text = signal_str.partition(",")
+        if not pdq_hash or not ocr_text:
+            raise ValueError("malformed pdq_ocr hash")
+        return pdq_hash, common.normalize_string(ocr_text)
+
+    def query(self, query_hash: str) -> t.List[index.IndexMatch[index.T]]:
+        return self.query_many([query_hash])[0]
+
+    def query_many(
+        self, queries: t.Sequence[str]
+    ) -> t.List[t.List[index.IndexMatch[index.T]]]:
+        """Look up many signals with a single PDQ index search"""
+        split = [self._split(q) for q in queries]
+        pdq_results = self._pdq_index.query_many([pdq_hash for pdq_hash, _ in split])
+        ret = []
+        for (_, query_text), candidates in zip(split, pdq_results):
+            results: t.List[index.IndexMatch[index.T]] = []
+            for candidate in candidates:
+                position = candidate.metadata
+                text_result = RawTextSignal.matches_normalized_str(
+                    self._texts[position],
+                    query_text,
+                    PdqOcrSignal.LEVENSHTEIN_DISTANCE_PERCENT_THRESHOLD,
+                )
+                if text_result.match:
+                    results.extend(
+                        index.IndexMatch(candidate.similarity_info, entry)
+                        for entry in self._entries[position]
+                    )
+            ret.append(results)
+        return ret
+
+    def add(self, signal_str: str, entry: index.T) -> None:
+        self.add_all(((signal_str, entry),))
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, index.T]]) -> None:
+        entries = list(entries)
+        # Split every new signal first, so malformed ones don't add anything
+        new_signals: t.Dict[str, t.Tuple[str, str]] = {}
+        for signal_str, _ in entries:
+            if signal_str not in self._deduper and signal_str not in new_signals:
+                new_signals[signal_str] = self._split(signal_str)
+        start = len(self._texts)
+        self._pdq_index.add_all(
+            (pdq_hash, start + i)
+            for i, (pdq_hash, _) in enumerate(new_signals.values())
+        )
+        for signal_str, (_, text) in new_signals.items():
+            self._deduper[signal_str] = len(self._texts)
+            self._texts.append(text)
+            self._entries.append([])
+        for signal_str, entry in entries:
+            self._entries[self._deduper[signal_str]].append(entry)
+
+    def dispose(self) -> None:
+        self._pdq_index.dispose()
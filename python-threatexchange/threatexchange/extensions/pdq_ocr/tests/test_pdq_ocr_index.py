@@ -0,0 +1,94 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import pathlib
+import pickle
+import random
+import typing as t
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from threatexchange.extensions.pdq_ocr import pdq_ocr
+from threatexchange.extensions.pdq_ocr.pdq_ocr import PdqOcrIndex, PdqOcrSignal
+
+
+def get_signals() -> t.List[str]:
+    """Signals near each other in PDQ distance, text distance, or both"""
+    rng = random.Random(1)
+    signals = []
+    for _ in range(10):
+        bits = [rng.randrange(2) for _ in range(256)]
+        text = [rng.choice("abcdefgh ") for _ in range(rng.choice((10, 40)))]
+        for _ in range(6):
+            pdq_hash = f"{int(''.join(map(str, bits)), 2):064x}"
+            signals.append(f"{pdq_hash},{''.join(text)}")
+            for i in rng.sample(range(256), rng.choice((2, 12))):
+                bits[i] ^= 1
+            for i in rng.sample(range(len(text)), rng.choice((0, 1, 3))):
+                text[i] = rng.choice("abcdefgh")
+    return signals
+
+
+def test_same_as_compare_hash() -> None:
+    signals = get_signals()
+    index: PdqOcrIndex[int] = PdqOcrIndex()
+    index.add_all((s, i) for i, s in enumerate(signals))
+    assert len(index) == len(signals)
+    matched = 0
+    for query, results in zip(signals, index.query_many(signals)):
+        expected = {}
+        for i, signal in enumerate(signals):
+            result = PdqOcrSignal.compare_hash(signal, query)
+            if result.match:
+                expected[i] = result.distance.pretty_str()
+        assert {m.metadata: m.similarity_info.pretty_str() for m in results} == expected
+        matched += len(expected)
+    # Not just exact matches
+    assert matched > len(signals)
+
+
+def test_duplicates_and_pickle() -> None:
+    signals = get_signals()
+    index: PdqOcrIndex[str] = PdqOcrIndex()
+    index.add_all([(signals[0], "a"), (signals[0], "b")])
+    index.add(signals[1], "c")
+    index = pickle.loads(pickle.dumps(index))
+    assert {"a", "b"} <= {m.metadata for m in index.query(signals[0])}
+    assert "c" in {m.metadata for m in index.query(signals[1])}
+    assert PdqOcrSignal.get_index_cls() is PdqOcrIndex
+
+
+@pytest.mark.parametrize("signal", ["", "a" * 64, ",text", "a" * 64 + ","])
+def test_malformed_signal(signal: str) -> None:
+    index: PdqOcrIndex[int] = PdqOcrIndex()
+    with pytest.raises(ValueError):
+        index.add_all([(get_signals()[0], 0), (signal, 1)])
+    assert len(index) == 0
+
+
+def test_hash_from_files_ocr_cache(
+    tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    ocr_calls = []
+
+    def text_from_image(image: Image.Image) -> str:
+        ocr_calls.append(image)
+        return f"text {len(ocr_calls)}"
+
+    monkeypatch.setattr(pdq_ocr, "text_from_image", text_from_image)
+    rng = np.random.default_rng(0)
+    paths = []
+    for name in ("a", "b"):
+        paths.append(tmp_path / f"{name}.png")
+        pixels = rng.integers(0, 256, (64, 64, 3), dtype=np.uint8)
+        Image.fromarray(pixels).save(paths[-1])
+    hashes = PdqOcrSignal.hash_from_files([paths[0], paths[1], paths[0]])
+    assert len(ocr_calls) == 2
+    assert hashes[0] == hashes[2]
+    assert hashes[0].endswith(",text 1") and hashes[1].endswith(",text 2")
+    assert hashes[0].partition(",")[0] == pdq_ocr.pdq_from_file(paths[0])[0]
+
+    cache = {hashes[1].partition(",")[0]: "cached"}
+    assert PdqOcrSignal.hash_from_files([paths[1]], cache)[0].endswith(",cached")
+    assert len(ocr_calls) == 2
@@ -1,4 +1,8 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
+import pickle
+import random
+import string
+import typing as t
 import unittest
 
 try:
@@ -8,7 +12,7 @@ try:
 except ImportError:
     _DISABLED = True
 else:
-    from threatexchange.extensions.tlsh.text_tlsh import TextTLSHSignal
+    from threatexchange.extensions.tlsh.text_tlsh import TextTLSHSignal, TLSHIndex
 
 
 @unittest.skipIf(_DISABLED, "tlsh not installed")
@@ -25,3 +29,51 @@ class TLSHHasherModuleUnitTest(unittest.TestCase):
             hashed = TextTLSHSignal.hash_from_str(input)
 
         assert hashed == expected_hash, f"case: {input}"
+
+
+@unittest.skipIf(_DISABLED, "tlsh not installed")
+class TLSHIndexTest(unittest.TestCase):
+    def get_hashes(self) -> t.List[str]:
+        """Hashes of random texts, and of edits of them at many distances"""
+        rng = random.Random(1)
+        hashes = []
+        for _ in range(20):
+            text = [rng.choice(string.ascii_letters) for _ in range(512)]
+            for _ in range(10):
+                hashes.append(TextTLSHSignal.hash_from_str("".join(text)))
+                for i in rng.sample(range(len(text)), 4):
+                    text[i] = rng.choice(string.ascii_letters)
+        return hashes
+
+    def test_same_as_brute_force(self):
+        hashes = self.get_hashes()
+        index = TLSHIndex.build((h, i) for i, h in enumerate(hashes))
+        assert len(index) == len(hashes)
+        matched = 0
+        for query, results in zip(hashes, index.query_many(hashes)):
+            expected = {}
+            for i, h in enumerate(hashes):
+                result = TextTLSHSignal.compare_hash(h, query)
+                if result.match:
+                    expected[i] = result.distance.distance
+            assert {m.metadata: m.similarity_info.distance for m in results} == (
+                expected
+            )
+            matched += len(expected)
+        # Not just exact matches
+        assert matched > 2 * len(hashes)
+
+    def test_duplicates_and_pickle(self):
+        hashes = self.get_hashes()[:10]
+        index = TLSHIndex.build([(hashes[0], "a"), (hashes[0], "b")])
+        index.add(hashes[1], "c")
+        index = pickle.loads(pickle.dumps(index))
+        assert {m.metadata for m in index.query(hashes[0])} >= {"a", "b"}
+        assert "c" in {m.metadata for m in index.query(hashes[1])}
+
+    def test_invalid_hash(self):
+        index = TLSHIndex()
+        with self.assertRaises(ValueError):
+            index.add_all([(self.get_hashes()[0], 1), ("T1ABC", 2)])
+        assert len(index) == 0
+        assert TextTLSHSignal.get_index_cls() is TLSHIndex
@@ -4,18 +4,39 @@
 Wrapper around the pdf signal type.
 """
 
+import itertools
 import re
 import typing as t
+
+import faiss
+import numpy as np
+
 from threatexchange.content_type.content_base import ContentType
 from threatexchange.content_type.text import TextContent
 
+from threatexchange.signal_type import index
 from threatexchange.signal_type import signal_base
+from threatexchange.signal_type.faiss_binary import (
+    FaissMultiHashIndex,
+    IndexEntries,
+)
 from threatexchange.signal_type.raw_text import RawTextSignal
 
 import tlsh
 
 TLSH_CONFIDENT_MATCH_THRESHOLD = 30
 EXPECT_TLSH_HASH_LENGTH = 72
+# The body is the last 32 bytes of the hash: 128 2-bit buckets
+TLSH_BODY_HEX_LENGTH = 64
+# Each body bucket as 3 bits: 0 -> 000, 1 -> 001, 2 -> 011, 3 -> 111
+BITS_IN_TLSH_CODE = TLSH_BODY_HEX_LENGTH * 2 * 3
+# Number of substrings for multi-index hashing. At
+# TLSH_CONFIDENT_MATCH_THRESHOLD, that probes the buckets within 1 bit of
+# each query substring.
+TLSH_MIH_NHASH = 16
+
+# How many entries add_all() converts and adds to faiss at once
+_ADD_BATCH_SIZE = 65536
 
 
 class TextTLSHSignal(signal_base.SimpleSignalType, signal_base.TextHasher):
@@ -55,6 +76,134 @@ class TextTLSHSignal(signal_base.SimpleSignalType, signal_base.TextHasher):
         dist: int = tlsh.diffxlen(hash1, hash2)
         return signal_base.SignalComparisonResult.from_simple_dist(dist, tlsh_threshold)
 
+    @classmethod
+    def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
+        return TLSHIndex
+
     @staticmethod
     def get_examples() -> t.List[str]:
         return [TextTLSHSignal.hash_from_str(s) for s in RawTextSignal.get_examples()]
+
+
+def tlsh_body_codes(hashes: t.Sequence[str]) -> np.ndarray:
+    """
+    Convert TLSH hashes to a (n, 48) array of packed codes of their bodies.
+
+    The hamming distance between two codes is the sum of the differences
+    between the hashes' body buckets, which is never more than the TLSH
+    distance (where buckets 3 apart count 6, and the header adds more).
+    """
+    if not hashes:
+        return np.empty((0, BITS_IN_TLSH_CODE // 8), dtype=np.uint8)
+    body = np.frombuffer(
+        bytes.fromhex("".join(h[-TLSH_BODY_HEX_LENGTH:] for h in hashes)),
+        dtype=np.uint8,
+    ).reshape(len(hashes), -1)
+    buckets = (body[:, :, np.newaxis] >> np.array([6, 4, 2, 0], np.uint8)) & 3
+    bits = buckets.reshape(len(hashes), -1, 1) > np.arange(3, dtype=np.uint8)
+    return np.packbits(bits.reshape(len(hashes), -1), axis=1)
+
+
+class TLSHIndex(index.SignalTypeIndex[index.T]):
+    """
+    Index for TextTLSHSignal, with the same matches as compare_hash().
+
+    Finds candidates with multi-index hashing over the hash bodies (see
+    tlsh_body_codes()), so only a small part of the index is compared
+    against each query, and then checks each candidate's real TLSH
+    distance. Every hash within the threshold is a candidate, so nothing
+    is missed.
+    """
+
+    def __init__(self, *, threshold: int = TLSH_CONFIDENT_MATCH_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._index = _TLSHFaissIndex(
+            faiss.IndexBinaryMultiHash(
+                BITS_IN_TLSH_CODE, TLSH_MIH_NHASH, BITS_IN_TLSH_CODE // TLSH_MIH_NHASH
+            )
+        )
+        # Hashes by faiss id, and the reverse
+        self._hashes: t.List[str] = []
+        self._deduper: t.Dict[str, int] = {}
+        self._entries: IndexEntries[index.T] = IndexEntries()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def query(
+        self, query_hash: str
+    ) -> t.List[
+        index.IndexMatchUntyped[index.SignalSimilarityInfoWithIntDistance, index.T]
+    ]:
+        return self.query_many([query_hash])[0]
+
+    def query_many(
+        self, queries: t.Sequence[str]
+    ) -> t.List[
+        t.List[
+            index.IndexMatchUntyped[index.SignalSimilarityInfoWithIntDistance, index.T]
+        ]
+    ]:
+        """Look up many hashes with a single faiss search"""
+        if not queries:
+            return []
+        ret = []
+        for query_hash, candidates in zip(
+            queries, self._index.search(queries, self.threshold)
+        ):
+            results: t.List[
+                index.IndexMatchUntyped[
+                    index.SignalSimilarityInfoWithIntDistance, index.T
+                ]
+            ] = []
+            for faiss_id, _ in candidates:
+                dist = tlsh.diffxlen(self._hashes[faiss_id], query_hash)
+                if dist > self.threshold:
+                    continue
+                similarity = index.SignalSimilarityInfoWithIntDistance(dist)
+                results.extend(
+                    index.IndexMatchUntyped(similarity, entry)
+                    for entry in self._entries.get(faiss_id)
+                )
+            ret.append(results)
+        return ret
+
+    def add(self, signal_str: str, entry: index.T) -> None:
+        self.add_all(((signal_str, entry),))
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, index.T]]) -> None:
+        it = iter(entries)
+        while True:
+            batch = list(itertools.islice(it, _ADD_BATCH_SIZE))
+            if not batch:
+                return
+            for signal_str, _ in batch:
+                TextTLSHSignal.validate_signal_str(signal_str)
+            ids: t.List[int] = []
+            new_hashes: t.List[str] = []
+            for signal_str, _ in batch:
+                faiss_id = self._deduper.get(signal_str)
+                if faiss_id is None:
+                    faiss_id = len(self._hashes)
+                    self._deduper[signal_str] = faiss_id
+                    self._hashes.append(signal_str)
+                    new_hashes.append(signal_str)
+                ids.append(faiss_id)
+            if new_hashes:
+                self._index.add_packed(tlsh_body_codes(new_hashes))
+            self._entries.extend(ids, [entry for _, entry in batch])
+
+    def dispose(self) -> None:
+        self._index.dispose()
+
+
+class _TLSHFaissIndex(FaissMultiHashIndex):
+    """
+    A faiss.IndexBinaryMultiHash of TLSH body codes, for pickle serialization
+
+    Search distances are the hamming distances between codes, which are
+    only a lower bound of the TLSH distance.
+    """
+
+    def _to_packed(self, tlsh_strings: t.Sequence[str]) -> np.ndarray:
+        return tlsh_body_codes(tlsh_strings)
@@ -1,5 +1,6 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import base64
 import pytest
 import pickle
 import random
@@ -18,12 +19,30 @@ else:
     from threatexchange.extensions.vpdq.vpdq_index import VPDQIndex, VPDQSimilarityInfo
     from threatexchange.extensions.vpdq.vpdq_util import (
         json_to_vpdq,
+        prepare_vpdq_arrays,
         prepare_vpdq_feature,
         VPDQ_QUALITY_THRESHOLD,
         vpdq_to_json,
         dedupe,
         quality_filter,
+        VPDQ_DISTANCE_THRESHOLD,
+        VPDQ_BINARY_PREFIX,
+        binary_to_vpdq_arrays,
+        signal_str_to_vpdq,
+        vpdq_to_binary,
     )
+    import faiss
+    from threatexchange.extensions.vpdq import vpdq_brute_matcher
+    from threatexchange.extensions.vpdq.vpdq_faiss import (
+        FRAME_INDEX_TYPES,
+        VPDQHashIndex,
+    )
+    from threatexchange.extensions.vpdq.vpdq_brute_matcher import (
+        is_VPDQ_match_brute,
+        match_VPDQ_hash_brute,
+        match_VPDQ_in_another,
+    )
+    from threatexchange.signal_type.pdq.pdq_utils import simple_distance
     from threatexchange.extensions.vpdq.tests.utils import (
         get_random_vpdq_features,
         pdq_hashes_to_vpdq_features,
@@ -89,8 +108,8 @@ def test_utils():
 
 def test_simple():
     index = VPDQIndex.build([[HASH, EXAMPLE_META_DATA]])
-    assert index._entry_idx_to_features_and_entries[0][0] == FEATURES
-    assert len(index._index_idx_to_vpdqHex_and_entry) == len(FEATURES)
+    assert index._entry_idx_to_features_and_entries[0][0].to_features() == FEATURES
+    assert len(index._frame_entry_ids) == len(FEATURES)
     res = index.query(HASH)
     # A complete match to itself
     assert res[0] == IndexMatch(VPDQSimilarityInfo(100.0, 100.0), EXAMPLE_META_DATA)
@@ -296,3 +315,302 @@ def test_duplicate_video_matches():
     res = index.query(vpdq_to_json(video3))
     assert res[0] == IndexMatch(VPDQSimilarityInfo(100.0, 100.0), VIDEO1_META_DATA)
     assert res[1] == IndexMatch(VPDQSimilarityInfo(50.0, 100.0), VIDEO2_META_DATA)
+
+
+def test_query_many():
+    video1 = pdq_hashes_to_vpdq_features(random.sample(G1, 5) + random.sample(G2, 5))
+    video2 = video1[0:5]
+    video3 = pdq_hashes_to_vpdq_features(random.sample(G3, 10))
+
+    index = VPDQIndex.build(
+        [
+            [vpdq_to_json(video1), VIDEO1_META_DATA],
+            [vpdq_to_json(video2), VIDEO2_META_DATA],
+        ],
+        query_match_threshold_pct=0,
+    )
+    queries = [vpdq_to_json(video1), vpdq_to_json(video3), "", vpdq_to_json(video2)]
+    results = index.query_many(queries)
+    assert len(results) == len(queries)
+    for query, res in zip(queries, results):
+        assert res == index.query(query)
+    assert results[1] == []
+    assert results[2] == []
+    assert index.query_many([]) == []
+
+
+def test_matches_brute_force_percentages():
+    groups = [G1, G2, G3]
+    videos = [
+        pdq_hashes_to_vpdq_features(
+            [h for g in groups for h in random.sample(g, random.randint(0, 6))]
+            + [get_random_hash() for _ in range(random.randint(1, 4))]
+        )
+        for _ in range(20)
+    ]
+    index = VPDQIndex.build(
+        [(vpdq_to_json(v), i) for i, v in enumerate(videos)],
+        query_match_threshold_pct=0,
+    )
+
+    for query in videos[:5]:
+        expected = []
+        for i, video in enumerate(videos):
+            result = match_VPDQ_hash_brute(
+                query, video, VPDQ_QUALITY_THRESHOLD, VPDQ_DISTANCE_THRESHOLD
+            )
+            if result.query_match_percent > 0:
+                expected.append(
+                    IndexMatch(
+                        VPDQSimilarityInfo(
+                            result.query_match_percent, result.compared_match_percent
+                        ),
+                        i,
+                    )
+                )
+        assert index.query(vpdq_to_json(query)) == expected
+
+
+def test_unpickle_frame_entry_lists():
+    video1 = pdq_hashes_to_vpdq_features(random.sample(G1, 5) + random.sample(G2, 5))
+    video2 = video1[0:5]
+    index = VPDQIndex.build(
+        [
+            [vpdq_to_json(video1), VIDEO1_META_DATA],
+            [vpdq_to_json(video2), VIDEO2_META_DATA],
+        ],
+        query_match_threshold_pct=0,
+    )
+    expected = index.query(vpdq_to_json(video1))
+    # As pickled before entry ids were stored in arrays
+    state = index.__dict__.copy()
+    state["_index_idx_to_vpdqHex_and_entry"] = [
+        (idx, entry_ids)
+        for idx, entry_ids in enumerate(state.pop("_frame_entry_ids").groups())
+    ]
+    del state["_entry_frame_counts"]
+
+    old_index = VPDQIndex.__new__(VPDQIndex)
+    old_index.__setstate__(state)
+    assert old_index.query(vpdq_to_json(video1)) == expected
+
+
+def test_add_all_same_as_add():
+    videos = [
+        pdq_hashes_to_vpdq_features(random.sample(G1, 5) + random.sample(G2, 5)),
+        pdq_hashes_to_vpdq_features(random.sample(G1, 8)),
+        pdq_hashes_to_vpdq_features(random.sample(G3, 4)),
+    ]
+    videos.append(videos[0][2:7])
+    entries = [(vpdq_to_json(v), i) for i, v in enumerate(videos)]
+
+    bulk_index = VPDQIndex.build(entries, query_match_threshold_pct=0)
+    index = VPDQIndex(query_match_threshold_pct=0)
+    for signal_str, entry in entries:
+        index.add(signal_str, entry)
+
+    assert bulk_index._unique_hash_to_index_idx == index._unique_hash_to_index_idx
+    assert bulk_index._frame_entry_ids.groups() == index._frame_entry_ids.groups()
+    assert bulk_index.index.faiss_index.ntotal == index.index.faiss_index.ntotal
+    for signal_str, _ in entries:
+        assert bulk_index.query(signal_str) == index.query(signal_str)
+
+
+def test_add_all_empty_video_adds_nothing():
+    index = VPDQIndex.build([[HASH, VIDEO1_META_DATA]])
+    video = get_random_vpdq_features(10)
+    with pytest.raises(ValueError):
+        index.add_all([[vpdq_to_json(video), VIDEO2_META_DATA], ["", VIDEO3_META_DATA]])
+
+    assert len(index._entry_idx_to_features_and_entries) == 1
+    assert index.index.faiss_index.ntotal == len(FEATURES)
+    assert index.query(vpdq_to_json(video)) == []
+
+
+def test_binary_encoding():
+    features = get_random_vpdq_features(100, seconds_per_frame=0.123, quality=80)
+    features[3].pdq_hex = features[3].pdq_hex.upper()
+    encoded = vpdq_to_binary(features)
+    assert len(encoded) < len(vpdq_to_json(features))
+
+    decoded = signal_str_to_vpdq(encoded)
+    assert [f.pdq_hex for f in decoded] == [f.pdq_hex.lower() for f in features]
+    assert [f.quality for f in decoded] == [80] * 100
+    assert [f.timestamp for f in decoded] == [round(f.timestamp, 3) for f in features]
+    assert VPDQSignal.validate_signal_str(encoded) == encoded
+    json_str = vpdq_to_json(features)
+    assert signal_str_to_vpdq(json_str) == json_to_vpdq(json_str)
+    assert signal_str_to_vpdq(vpdq_to_binary([])) == []
+
+    arrays = binary_to_vpdq_arrays(encoded)
+    assert arrays.hashes.shape == (100, 32)
+    assert not arrays.hashes.flags.owndata
+    assert arrays.hashes[0].tobytes().hex() == features[0].pdq_hex
+
+
+@pytest.mark.parametrize(
+    "signal_str",
+    [
+        VPDQ_BINARY_PREFIX + "not base64!",
+        VPDQ_BINARY_PREFIX + "AAAA",  # Not a whole feature
+        # Quality of 255
+        VPDQ_BINARY_PREFIX
+        + base64.b64encode(bytes(32) + bytes([255]) + bytes(4)).decode(),
+        # Negative timestamp
+        VPDQ_BINARY_PREFIX
+        + base64.b64encode(bytes(32) + bytes([100]) + b"\x00\x00\x80\xbf").decode(),
+    ],
+)
+def test_invalid_binary_encoding(signal_str):
+    with pytest.raises(ValueError):
+        VPDQSignal.validate_signal_str(signal_str)
+
+
+def test_index_binary_signals():
+    video1 = pdq_hashes_to_vpdq_features(random.sample(G1, 5) + random.sample(G2, 5))
+    video2 = video1[0:5] + [VpdqCompactFeature(F3, 10, 11.0)]
+    index = VPDQIndex.build(
+        [
+            [vpdq_to_json(video1), VIDEO1_META_DATA],
+            [vpdq_to_binary(video2), VIDEO2_META_DATA],
+        ],
+        query_match_threshold_pct=0,
+    )
+    # The low quality frame is filtered out of the binary signal too
+    assert len(index._entry_idx_to_features_and_entries[1][0]) == 5
+    for video in (video1, video2):
+        assert index.query(vpdq_to_binary(video)) == index.query(vpdq_to_json(video))
+    assert VPDQSignal.compare_hash(vpdq_to_binary(video1), vpdq_to_json(video1)).match
+
+
+def test_prepare_vpdq_arrays():
+    features = get_random_vpdq_features(20, quality=80)
+    features[5].quality = 10
+    features += features[:3]
+    for signal_str in (vpdq_to_json(features), vpdq_to_binary(features)):
+        arrays = prepare_vpdq_arrays(signal_str, VPDQ_QUALITY_THRESHOLD)
+        assert arrays.hashes.shape == (19, 32)
+        assert [f.pdq_hex for f in arrays.to_features()] == [
+            f.pdq_hex for f in prepare_vpdq_feature(signal_str, VPDQ_QUALITY_THRESHOLD)
+        ]
+
+
+def test_unpickle_feature_lists():
+    video1 = pdq_hashes_to_vpdq_features(random.sample(G1, 5) + random.sample(G2, 5))
+    video2 = pdq_hashes_to_vpdq_features(random.sample(G2, 6))
+    index = VPDQIndex.build(
+        [
+            [vpdq_to_json(video1), VIDEO1_META_DATA],
+            [vpdq_to_json(video2), VIDEO2_META_DATA],
+        ],
+        query_match_threshold_pct=0,
+    )
+    expected = index.query(vpdq_to_json(video2))
+    # As pickled when frames were kept as VpdqCompactFeatures
+    state = index.__dict__.copy()
+    state["_unique_vpdqHex_to_index_idx"] = {
+        h.hex(): idx for h, idx in state.pop("_unique_hash_to_index_idx").items()
+    }
+    state["_entry_idx_to_features_and_entries"] = [
+        (fs.to_features(), entry)
+        for fs, entry in state["_entry_idx_to_features_and_entries"]
+    ]
+
+    old_index = VPDQIndex.__new__(VPDQIndex)
+    old_index.__setstate__(state)
+    assert old_index.query(vpdq_to_json(video2)) == expected
+    old_index.add(vpdq_to_json(video1), VIDEO3_META_DATA)
+    assert old_index.index.faiss_index.ntotal == index.index.faiss_index.ntotal
+
+
+@pytest.mark.parametrize("block_pairs", [1, 7, 1 << 20])
+def test_brute_matcher(monkeypatch, block_pairs):
+    monkeypatch.setattr(vpdq_brute_matcher, "BLOCK_PAIRS", block_pairs)
+    video1 = pdq_hashes_to_vpdq_features(
+        random.sample(G1, 3) + random.sample(G2, 6) + [get_random_hash()]
+    )
+    video2 = pdq_hashes_to_vpdq_features(random.sample(G2, 4) + random.sample(G3, 4))
+
+    expected = sum(
+        any(simple_distance(a.pdq_hex, b.pdq_hex) <= 31 for b in video2) for a in video1
+    )
+    assert match_VPDQ_in_another(video1, video2, 31) == expected == 6
+    assert match_VPDQ_in_another(video2, video1, 31) == 4
+    assert match_VPDQ_in_another([], video1, 31) == 0
+
+    result = match_VPDQ_hash_brute(video1, video2, VPDQ_QUALITY_THRESHOLD, 31)
+    assert (result.query_match_percent, result.compared_match_percent) == (60, 50)
+
+    for query_pct, compared_pct, is_match in [
+        (60, 50, True),
+        (60, 51, False),
+        (61, 50, False),
+        (0, 0, True),
+        (100, 0, False),
+    ]:
+        assert (
+            is_VPDQ_match_brute(
+                video1,
+                video2,
+                VPDQ_QUALITY_THRESHOLD,
+                31,
+                query_pct,
+                compared_pct,
+            )
+            == is_match
+        )
+    assert not is_VPDQ_match_brute([], video2, VPDQ_QUALITY_THRESHOLD, 31, 0, 0)
+
+
+@pytest.mark.parametrize("frame_index", ["mih", "ivf"])
+def test_frame_index_types(frame_index):
+    videos = [
+        pdq_hashes_to_vpdq_features(
+            [h for g in (G1, G2, G3) for h in random.sample(g, random.randint(0, 6))]
+            + [get_random_hash() for _ in range(random.randint(1, 4))]
+        )
+        for _ in range(20)
+    ]
+    entries = [(vpdq_to_json(v), i) for i, v in enumerate(videos)]
+    flat_index = VPDQIndex.build(entries, query_match_threshold_pct=0)
+    index = VPDQIndex.build(
+        entries, query_match_threshold_pct=0, frame_index=frame_index
+    )
+    assert index.index.index_type == frame_index
+
+    reconstructed = pickle.loads(pickle.dumps(index))
+    assert reconstructed.index.index_type == frame_index
+    assert type(reconstructed.index.faiss_index) is type(index.index.faiss_index)
+    # Few enough frames that nprobe covers every IVF list, so all are exact
+    for signal_str, _ in entries[:5]:
+        expected = flat_index.query(signal_str)
+        assert index.query(signal_str) == expected
+        assert reconstructed.query(signal_str) == expected
+
+
+def test_frame_index_ivf_trains_on_first_add():
+    index = VPDQIndex(frame_index="ivf")
+    assert not isinstance(index.index.faiss_index, faiss.IndexBinaryIVF)
+    index.add(HASH, VIDEO1_META_DATA)
+    assert isinstance(index.index.faiss_index, faiss.IndexBinaryIVF)
+    assert index.query(HASH) == [
+        IndexMatch(VPDQSimilarityInfo(100.0, 100.0), VIDEO1_META_DATA)
+    ]
+
+
+def test_frame_index_unknown_type():
+    assert "flat" in FRAME_INDEX_TYPES
+    with pytest.raises(ValueError):
+        VPDQIndex(frame_index="lsh")
+
+
+def test_unpickle_flat_frame_index():
+    index = VPDQHashIndex()
+    index.add_single_video(FEATURES)
+    # As pickled before the frame index type was recorded
+    old_state = faiss.serialize_index_binary(index.faiss_index)
+    old_index = VPDQHashIndex.__new__(VPDQHashIndex)
+    old_index.__setstate__(old_state)
+
+    assert old_index.index_type == "flat"
+    assert old_index.faiss_index.ntotal == len(FEATURES)
@@ -7,7 +7,7 @@ Wrapper around the vpdq signal type.
 from threatexchange.extensions.vpdq.vpdq_util import (
     VPDQ_INDEX_MATCH_THRESHOLD_PERCENT,
     VpdqCompactFeature,
-    json_to_vpdq,
+    signal_str_to_vpdq,
     vpdq_to_json,
     VPDQ_DISTANCE_THRESHOLD,
     VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
@@ -44,6 +44,8 @@ class VPDQSignal(signal_base.SimpleSignalType, signal_base.FileHasher):
             },
             ...
     }
+    signal_str can instead be the more compact binary encoding from
+    vpdq_util.vpdq_to_binary(), which is quicker to parse.
     Read about VPDQ at https://github.com/facebook/ThreatExchange/tree/main/vpdq
     """
 
@@ -60,7 +62,7 @@ class VPDQSignal(signal_base.SimpleSignalType, signal_base.FileHasher):
         """
         @see VpdqCompactFeature
         """
-        json_to_vpdq(signal_str)  # throws value error on failure
+        signal_str_to_vpdq(signal_str)  # throws value error on failure
         return signal_str
 
     @classmethod
@@ -75,8 +77,8 @@ class VPDQSignal(signal_base.SimpleSignalType, signal_base.FileHasher):
         query_match_pct_thresh: float = VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
         compare_match_pct_thresh: float = VPDQ_INDEX_MATCH_THRESHOLD_PERCENT,
     ) -> signal_base.SignalComparisonResult:
-        vpdq_hash1 = json_to_vpdq(hash1)
-        vpdq_hash2 = json_to_vpdq(hash2)
+        vpdq_hash1 = signal_str_to_vpdq(hash1)
+        vpdq_hash2 = signal_str_to_vpdq(hash2)
         match_percent = match_VPDQ_hash_brute(
             vpdq_hash1,
             vpdq_hash2,
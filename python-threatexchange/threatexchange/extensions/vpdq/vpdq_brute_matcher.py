@@ -3,9 +3,32 @@ import vpdq
 
 import typing as t
 
-from threatexchange.signal_type.pdq.pdq_utils import simple_distance
+import numpy as np
+
+from threatexchange.signal_type.pdq.pdq_utils import (
+    convert_pdq_strings_to_packed_ndarray,
+    pdq_distance_matrix,
+)
 from .vpdq_util import VpdqCompactFeature, dedupe, quality_filter, VPDQMatchResult
 
+# Frame pairs compared at once. Each takes ~64 bytes of temporary memory, and
+# blocks that fit in cache are faster than larger ones
+BLOCK_PAIRS = 1 << 16
+
+
+def _packed(features: t.Sequence[VpdqCompactFeature]) -> np.ndarray:
+    return convert_pdq_strings_to_packed_ndarray([f.pdq_hex for f in features])
+
+
+def _blocks(
+    packed_a: np.ndarray, packed_b: np.ndarray, distance_tolerance: int
+) -> t.Iterator[t.Tuple[slice, np.ndarray]]:
+    """Yields (rows of packed_a, which of those rows x packed_b are within tolerance)"""
+    rows_per_block = max(1, BLOCK_PAIRS // max(1, len(packed_b)))
+    for start in range(0, len(packed_a), rows_per_block):
+        rows = slice(start, start + rows_per_block)
+        yield rows, pdq_distance_matrix(packed_a[rows], packed_b) <= distance_tolerance
+
 
 def match_VPDQ_in_another(
     hash1: t.List[VpdqCompactFeature],
@@ -23,15 +46,20 @@ def match_VPDQ_in_another(
     Returns:
         int: The count of matches of hash1 in hash2
     """
+    if not hash1 or not hash2:
+        return 0
     return sum(
-        any(
-            simple_distance(h1.pdq_hex, h2.pdq_hex) <= distance_tolerance
-            for h2 in hash2
-        )
-        for h1 in hash1
+        int(matched.any(axis=1).sum())
+        for _, matched in _blocks(_packed(hash1), _packed(hash2), distance_tolerance)
     )
 
 
+def _filtered(
+    features: t.List[VpdqCompactFeature], quality_tolerance: int
+) -> t.List[VpdqCompactFeature]:
+    return quality_filter(dedupe(features), quality_tolerance)
+
+
 def match_VPDQ_hash_brute(
     query_hash: t.List[VpdqCompactFeature],
     compared_hash: t.List[VpdqCompactFeature],
@@ -53,17 +81,66 @@ def match_VPDQ_hash_brute(
         float: Percentage matched in total comapred hash
 
     """
-    query_match_cnt = 0
-    compared_match_cnt = 0
-    filtered_query = quality_filter(dedupe(query_hash), quality_tolerance)
-    filtered_compared = quality_filter(dedupe(compared_hash), quality_tolerance)
-    query_match_cnt = match_VPDQ_in_another(
-        filtered_query, filtered_compared, distance_tolerance
-    )
-    compared_match_cnt = match_VPDQ_in_another(
-        filtered_compared, filtered_query, distance_tolerance
-    )
+    filtered_query = _filtered(query_hash, quality_tolerance)
+    filtered_compared = _filtered(compared_hash, quality_tolerance)
+    query_matched = np.zeros(len(filtered_query), dtype=bool)
+    compared_matched = np.zeros(len(filtered_compared), dtype=bool)
+    if filtered_query and filtered_compared:
+        # Both directions come from the same distances
+        for rows, matched in _blocks(
+            _packed(filtered_query), _packed(filtered_compared), distance_tolerance
+        ):
+            query_matched[rows] = matched.any(axis=1)
+            compared_matched |= matched.any(axis=0)
     return VPDQMatchResult(
-        query_match_cnt * 100 / len(filtered_query),
-        compared_match_cnt * 100 / len(filtered_compared),
+        int(query_matched.sum()) * 100 / len(filtered_query),
+        int(compared_matched.sum()) * 100 / len(filtered_compared),
     )
+
+
+def is_VPDQ_match_brute(
+    query_hash: t.List[VpdqCompactFeature],
+    compared_hash: t.List[VpdqCompactFeature],
+    quality_tolerance: int,
+    distance_tolerance: int,
+    query_match_threshold_pct: float,
+    compared_match_threshold_pct: float,
+) -> bool:
+    """
+    Whether match_VPDQ_hash_brute() percentages would both meet the thresholds.
+
+    Compares the query a block of frames at a time, and stops as soon as the
+    answer is known, i.e. once too many query frames have failed to match, or
+    enough frames in both videos have. Quicker for long videos that clearly
+    match or don't. Videos with no frames left after filtering never match.
+    """
+    filtered_query = _filtered(query_hash, quality_tolerance)
+    filtered_compared = _filtered(compared_hash, quality_tolerance)
+    if not filtered_query or not filtered_compared:
+        return False
+
+    def is_enough(count: int, total: int, threshold_pct: float) -> bool:
+        # The same arithmetic as match_VPDQ_hash_brute
+        return count * 100 / total >= threshold_pct
+
+    query_count = 0
+    compared_matched = np.zeros(len(filtered_compared), dtype=bool)
+    for rows, matched in _blocks(
+        _packed(filtered_query), _packed(filtered_compared), distance_tolerance
+    ):
+        query_count += int(matched.any(axis=1).sum())
+        compared_matched |= matched.any(axis=0)
+        unchecked = max(0, len(filtered_query) - rows.stop)
+        if not is_enough(
+            query_count + unchecked, len(filtered_query), query_match_threshold_pct
+        ):
+            return False
+        if is_enough(
+            query_count, len(filtered_query), query_match_threshold_pct
+        ) and is_enough(
+            int(compared_matched.sum()),
+            len(filtered_compared),
+            compared_match_threshold_pct,
+        ):
+            return True
+    return False
@@ -2,24 +2,61 @@
 
 import vpdq
 import faiss
+import numpy as np
 from threatexchange.extensions.vpdq.vpdq_util import VpdqCompactFeature
-from threatexchange.signal_type.pdq.pdq_utils import BITS_IN_PDQ
+from threatexchange.signal_type.pdq.pdq_approximate_index import train_binary_ivf
+from threatexchange.signal_type.pdq.pdq_utils import (
+    BITS_IN_PDQ,
+    convert_pdq_strings_to_packed_ndarray,
+)
 import typing as t
-import numpy
-import binascii
 import weakref
 
+FRAME_INDEX_FLAT = "flat"
+FRAME_INDEX_MIH = "mih"
+FRAME_INDEX_IVF = "ivf"
+FRAME_INDEX_TYPES = (FRAME_INDEX_FLAT, FRAME_INDEX_MIH, FRAME_INDEX_IVF)
+# Number of substrings for multi-index hashing. At VPDQ_DISTANCE_THRESHOLD
+# (31), that probes the buckets within 1 bit of each query substring.
+MIH_NHASH = 16
+
 
 class VPDQHashIndex:
-    """Wrapper around an faiss binary index for use with searching for similar VPDQ features"""
+    """
+    Wrapper around an faiss binary index for use with searching for similar VPDQ features
+
+    The type of frame index is one of:
+      * flat: exact, scans every frame for each query
+      * mih: exact, multi-index hashing - slower to build, but much faster to
+        search with many frames
+      * ivf: approximate, searches only the nprobe closest of the clusters
+        it's trained on with the first frames added, so can miss matches
+    """
 
-    def __init__(self, faiss_index: t.Optional[faiss.Index] = None) -> None:
+    def __init__(
+        self,
+        faiss_index: t.Optional[faiss.IndexBinary] = None,
+        index_type: t.Optional[str] = None,
+        nprobe: int = 32,
+    ) -> None:
         """
-        If none faiss index is provided, will use "brute-force" faiss search
+        If none faiss index is provided, will create one of index_type,
+        by default "brute-force" faiss search
         """
-        self.faiss_index = (
-            faiss.IndexBinaryFlat(BITS_IN_PDQ) if faiss_index is None else faiss_index
-        )
+        if faiss_index is None:
+            index_type = index_type or FRAME_INDEX_FLAT
+            if index_type not in FRAME_INDEX_TYPES:
+                raise ValueError(f"unknown frame index type: {index_type}")
+            if index_type == FRAME_INDEX_MIH:
+                faiss_index = faiss.IndexBinaryMultiHash(
+                    BITS_IN_PDQ, MIH_NHASH, BITS_IN_PDQ // MIH_NHASH
+                )
+            else:
+                # Replaced by a trained index on the first add for IVF
+                faiss_index = faiss.IndexBinaryFlat(BITS_IN_PDQ)
+        self.faiss_index: faiss.IndexBinary = faiss_index
+        self.index_type = index_type or _index_type_of(faiss_index)
+        self.nprobe = nprobe
         self._finalizer = weakref.finalize(
             self, VPDQHashIndex._finalize_faiss, self.faiss_index
         )
@@ -29,9 +66,23 @@ class VPDQHashIndex:
         Args:
             hashes : One video's VPDQ features of to create the index with
         """
-        hash_bytes = [binascii.unhexlify(h.pdq_hex) for h in hashes]
-        vectors = [numpy.frombuffer(h, dtype=numpy.uint8) for h in hash_bytes]
-        self.faiss_index.add(numpy.array(vectors))
+        self.add_features(
+            convert_pdq_strings_to_packed_ndarray([h.pdq_hex for h in hashes])
+        )
+
+    def add_features(self, vectors: np.ndarray) -> None:
+        """
+        Add packed (n, 32) uint8 hashes, which can be from any number of
+        videos, in a single faiss add. Their idxs are assigned in order.
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.uint8)
+        if self.index_type == FRAME_INDEX_IVF and not isinstance(
+            self.faiss_index, faiss.IndexBinaryIVF
+        ):
+            if not len(vectors):
+                return
+            self._replace_faiss_index(train_binary_ivf(vectors))
+        self.faiss_index.add(vectors)
 
     def search_with_distance_in_result(
         self, queries: t.List[VpdqCompactFeature], distance_tolerance: int
@@ -65,13 +116,9 @@ class VPDQHashIndex:
             }
         """
 
-        query_vectors = [
-            numpy.frombuffer(binascii.unhexlify(q.pdq_hex), dtype=numpy.uint8)
-            for q in queries
-        ]
-        qs = numpy.array(query_vectors)
-        limits, similarities, neighbors = self.faiss_index.range_search(
-            qs, distance_tolerance + 1
+        limits, similarities, neighbors = self.range_search(
+            convert_pdq_strings_to_packed_ndarray([q.pdq_hex for q in queries]),
+            distance_tolerance,
         )
 
         result = {}
@@ -81,12 +128,46 @@ class VPDQHashIndex:
             result[query.pdq_hex] = list(zip(matches, distances))
         return result
 
+    def range_search(
+        self, queries: np.ndarray, distance_tolerance: int
+    ) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Same search as search_with_distance_in_result, but of packed (n, 32)
+        uint8 hashes, and returns faiss's arrays.
+
+        Returns:
+            (limits, distances, idxs), where the matches for queries[i] are
+            idxs[limits[i]:limits[i + 1]], at distances[limits[i]:limits[i + 1]]
+        """
+        qs = np.ascontiguousarray(queries, dtype=np.uint8)
+        if isinstance(self.faiss_index, faiss.IndexBinaryMultiHash):
+            nhash = self.faiss_index.nhash  # type: ignore[attr-defined]
+            self.faiss_index.nflip = distance_tolerance // nhash
+        elif isinstance(self.faiss_index, faiss.IndexBinaryIVF):
+            self.faiss_index.nprobe = self.nprobe
+        return self.faiss_index.range_search(qs, distance_tolerance + 1)
+
+    def _replace_faiss_index(self, faiss_index: faiss.IndexBinary) -> None:
+        self._finalizer()
+        self.faiss_index = faiss_index
+        self._finalizer = weakref.finalize(
+            self, VPDQHashIndex._finalize_faiss, self.faiss_index
+        )
+
     def __getstate__(self):
-        data = faiss.serialize_index_binary(self.faiss_index)
-        return data
+        return {
+            "faiss_index": faiss.serialize_index_binary(self.faiss_index),
+            "index_type": self.index_type,
+            "nprobe": self.nprobe,
+        }
 
-    def __setstate__(self, data):
-        self.faiss_index = faiss.deserialize_index_binary(data)
+    def __setstate__(self, state):
+        if not isinstance(state, dict):
+            # From before the index type could be chosen, always flat
+            state = {"faiss_index": state, "index_type": FRAME_INDEX_FLAT, "nprobe": 32}
+        self.faiss_index = faiss.deserialize_index_binary(state["faiss_index"])
+        self.index_type = state["index_type"]
+        self.nprobe = state["nprobe"]
         # Re-register finalizer after unpickling
         self._finalizer = weakref.finalize(
             self, VPDQHashIndex._finalize_faiss, self.faiss_index
@@ -108,3 +189,11 @@ class VPDQHashIndex:
                 reset_fn()
         except Exception:
             pass
+
+
+def _index_type_of(faiss_index: faiss.IndexBinary) -> str:
+    if isinstance(faiss_index, faiss.IndexBinaryMultiHash):
+        return FRAME_INDEX_MIH
+    if isinstance(faiss_index, faiss.IndexBinaryIVF):
+        return FRAME_INDEX_IVF
+    return FRAME_INDEX_FLAT
@@ -5,19 +5,26 @@ Implementation of SignalTypeIndex abstraction for VPDQ by wrapping
 vpdq_faiss.
 """
 
+from array import array
 from dataclasses import dataclass
 import typing as t
 
+import numpy as np
+
 from threatexchange.signal_type.index import (
     SignalSimilarityInfo,
     SignalTypeIndex,
     IndexMatch,
     T as IndexT,
 )
-from threatexchange.extensions.vpdq.vpdq_faiss import VPDQHashIndex
+from threatexchange.signal_type.faiss_binary import IndexEntries
+from threatexchange.extensions.vpdq.vpdq_faiss import (
+    FRAME_INDEX_FLAT,
+    VPDQHashIndex,
+)
 from threatexchange.extensions.vpdq.vpdq_util import (
-    VpdqCompactFeature,
-    prepare_vpdq_feature,
+    VpdqFeatureArrays,
+    prepare_vpdq_arrays,
     VPDQ_QUALITY_THRESHOLD,
     VPDQ_DISTANCE_THRESHOLD,
     VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
@@ -39,6 +46,10 @@ class VPDQSimilarityInfo(SignalSimilarityInfo):
 class VPDQIndex(SignalTypeIndex[IndexT]):
     """
     Wrapper around the vpdq faiss index lib using VPDQHashIndex
+
+    Each unique frame hash is added to the faiss index once. The ids of the
+    entries (videos) containing each frame are kept CSR-style, so matches
+    can be counted per entry with numpy rather than per frame in python.
     """
 
     def __init__(
@@ -46,14 +57,24 @@ class VPDQIndex(SignalTypeIndex[IndexT]):
         quality_threshold: int = VPDQ_QUALITY_THRESHOLD,
         query_match_threshold_pct: float = VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
         index_match_threshold_pct: float = VPDQ_INDEX_MATCH_THRESHOLD_PERCENT,
+        frame_index: str = FRAME_INDEX_FLAT,
     ) -> None:
+        """
+        Args:
+            frame_index : the type of faiss index to search frames with, one
+              of FRAME_INDEX_TYPES - see VPDQHashIndex
+        """
         super().__init__()
-        self.index: VPDQHashIndex = VPDQHashIndex()
+        self.index: VPDQHashIndex = VPDQHashIndex(index_type=frame_index)
         self._entry_idx_to_features_and_entries: t.List[
-            t.Tuple[t.List[VpdqCompactFeature], IndexT]
+            t.Tuple[VpdqFeatureArrays, IndexT]
         ] = []
-        self._index_idx_to_vpdqHex_and_entry: t.List[t.Tuple[int, t.List[int]]] = []
-        self._unique_vpdqHex_to_index_idx: t.Dict[str, int] = {}
+        # Number of (unique, filtered) frames for each entry id
+        self._entry_frame_counts: "array[int]" = array("q")
+        # faiss id => entry ids with that frame
+        self._frame_entry_ids: IndexEntries[int] = IndexEntries()
+        # packed hash => faiss id
+        self._unique_hash_to_index_idx: t.Dict[bytes, int] = {}
         self.quality_threshold = quality_threshold
         self.query_match_threshold_pct = query_match_threshold_pct
         self.index_match_threshold_pct = index_match_threshold_pct
@@ -65,33 +86,59 @@ class VPDQIndex(SignalTypeIndex[IndexT]):
         quality_threshold: int = VPDQ_QUALITY_THRESHOLD,
         query_match_threshold_pct: float = VPDQ_QUERY_MATCH_THRESHOLD_PERCENT,
         index_match_threshold_pct: float = VPDQ_INDEX_MATCH_THRESHOLD_PERCENT,
+        frame_index: str = FRAME_INDEX_FLAT,
     ) -> Self:
         ret = cls(
-            quality_threshold, query_match_threshold_pct, index_match_threshold_pct
+            quality_threshold,
+            query_match_threshold_pct,
+            index_match_threshold_pct,
+            frame_index,
         )
         ret.add_all(entries)
         return ret
 
     def add(self, signal_str: str, entry: IndexT) -> None:
-        entry_id = len(self._entry_idx_to_features_and_entries)
-        features = prepare_vpdq_feature(signal_str, self.quality_threshold)
-        if not features:
-            raise ValueError(
-                "Empty video after deduping/filtering should not be indexed"
+        self.add_all(((signal_str, entry),))
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
+        """
+        Parses every video first, then adds all of their new frames to faiss
+        at once.
+
+        Raises ValueError without adding anything if any video is empty
+        after deduping/filtering.
+        """
+        videos: t.List[t.Tuple[VpdqFeatureArrays, IndexT]] = []
+        for signal_str, entry in entries:
+            features = prepare_vpdq_arrays(signal_str, self.quality_threshold)
+            if not len(features):
+                raise ValueError(
+                    "Empty video after deduping/filtering should not be indexed"
+                )
+            videos.append((features, entry))
+
+        unique_hashes = []
+        frame_ids = []
+        entry_ids = []
+        first_entry_id = len(self._entry_idx_to_features_and_entries)
+        for entry_id, (features, _) in enumerate(videos, first_entry_id):
+            for h in _packed_rows(features.hashes):
+                idx = self._unique_hash_to_index_idx.get(h)
+                if idx is None:
+                    idx = len(self._unique_hash_to_index_idx)
+                    self._unique_hash_to_index_idx[h] = idx
+                    unique_hashes.append(h)
+                frame_ids.append(idx)
+            entry_ids.extend([entry_id] * len(features))
+        self._entry_idx_to_features_and_entries.extend(videos)
+        self._entry_frame_counts.extend(len(features) for features, _ in videos)
+        self._frame_entry_ids.extend(frame_ids, entry_ids)
+        if unique_hashes:
+            self.index.add_features(
+                np.frombuffer(b"".join(unique_hashes), dtype=np.uint8).reshape(
+                    len(unique_hashes), -1
+                )
             )
-        self._entry_idx_to_features_and_entries.append((features, entry))
-        # Use hex to represent the feature because it saves the space
-        unique_features = []
-        for f in features:
-            idx = self._unique_vpdqHex_to_index_idx.get(f.pdq_hex)
-            if idx is None:
-                idx = len(self._unique_vpdqHex_to_index_idx)
-                self._unique_vpdqHex_to_index_idx[f.pdq_hex] = idx
-                self._index_idx_to_vpdqHex_and_entry.append((idx, list()))
-                unique_features.append(f)
-            self._index_idx_to_vpdqHex_and_entry[idx][1].append(entry_id)
-        if unique_features:
-            self.index.add_single_video(unique_features)
 
     def query(self, query_hash: str) -> t.List[IndexMatch[IndexT]]:
         """Searches this VPDQ index for query hashes within the index that are no more than the threshold away
@@ -101,46 +148,152 @@ class VPDQIndex(SignalTypeIndex[IndexT]):
             query_hash : Query VPDQ hash
 
         Returns:
-            List of VPDQIndexMatch
+            List of VPDQIndexMatch, in the order the entries were added
         """
-        features = prepare_vpdq_feature(query_hash, self.quality_threshold)
-        if not features:
+        return self.query_many([query_hash])[0]
+
+    def query_many(
+        self, query_hashes: t.Sequence[str]
+    ) -> t.List[t.List[IndexMatch[IndexT]]]:
+        """Same as query, but searches the frames of every query video with a single faiss search.
+
+        Args:
+            query_hashes : Query VPDQ hashes
+
+        Returns:
+            List of VPDQIndexMatch for each query hash
+        """
+        if not query_hashes:
             return []
-        results = self.index.search_with_distance_in_result(
-            features, VPDQ_DISTANCE_THRESHOLD
+        hashes_per_query = [
+            prepare_vpdq_arrays(query_hash, self.quality_threshold).hashes
+            for query_hash in query_hashes
+        ]
+        all_hashes = np.concatenate(hashes_per_query)
+        if not len(all_hashes):
+            return [[] for _ in query_hashes]
+        # Frames shared between the queries are only searched once
+        unique_hashes, rows = np.unique(
+            all_hashes.view(f"V{all_hashes.shape[1]}").ravel(), return_inverse=True
+        )
+        limits, _, frame_ids = self.index.range_search(
+            unique_hashes.view(np.uint8).reshape(len(unique_hashes), -1),
+            VPDQ_DISTANCE_THRESHOLD,
         )
-        query_matched: t.Dict[int, t.Set[str]] = {}
-        index_matched: t.Dict[int, t.Set[int]] = {}
-        matches: t.List[IndexMatch[IndexT]] = []
-        for hash in results:
-            for match in results[hash]:
-                # query_str =>  (matched_idx, distance)
-                vpdq_match, entry_list = self._index_idx_to_vpdqHex_and_entry[match[0]]
-                for entry_id in entry_list:
-                    if entry_id not in query_matched:
-                        query_matched[entry_id] = set()
-                    query_matched[entry_id].add(hash)
-
-                    if entry_id not in index_matched:
-                        index_matched[entry_id] = set()
-                    index_matched[entry_id].add(vpdq_match)
-        for entry_id in query_matched.keys():
-            query_matched_percent = len(query_matched[entry_id]) * 100 / len(features)
-            index_matched_percent = (
-                len(index_matched[entry_id])
-                * 100
-                / len(self._entry_idx_to_features_and_entries[entry_id][0])
+        limits = limits.astype(np.int64)  # size_t from faiss
+        split_at = np.cumsum([len(hashes) for hashes in hashes_per_query])[:-1]
+        return [
+            self._matches_from_search_results(
+                query_rows.astype(np.int64), limits, frame_ids
             )
-            if (
-                query_matched_percent >= self.query_match_threshold_pct
-                and index_matched_percent >= self.index_match_threshold_pct
-            ):
-                matches.append(
-                    IndexMatch(
-                        VPDQSimilarityInfo(
-                            query_matched_percent, index_matched_percent
-                        ),
-                        self._entry_idx_to_features_and_entries[entry_id][1],
-                    )
-                )
-        return matches
+            for query_rows in np.split(rows.ravel(), split_at)
+        ]
+
+    def _matches_from_search_results(
+        self, rows: np.ndarray, limits: np.ndarray, frame_ids: np.ndarray
+    ) -> t.List[IndexMatch[IndexT]]:
+        """
+        Count the query and index frames matched for each entry.
+
+        Args:
+            rows : for each (deduped) frame of the query video, its row in the
+              range_search() results
+            limits, frame_ids : VPDQHashIndex.range_search() results
+        """
+        num_query_frames = len(rows)
+        if not num_query_frames:
+            return []
+        # Every (query frame, index frame) pair that matched...
+        match_counts = limits[rows + 1] - limits[rows]
+        query_frames = np.repeat(np.arange(num_query_frames), match_counts)
+        index_frames = frame_ids[_concat_ranges(limits[rows], match_counts)]
+        # ...expanded to every entry containing the index frame
+        offsets, entry_ids = self._frame_entry_ids.as_arrays()
+        entry_counts = offsets[index_frames + 1] - offsets[index_frames]
+        entries = entry_ids[_concat_ranges(offsets[index_frames], entry_counts)]
+        query_frames = np.repeat(query_frames, entry_counts)
+        index_frames = np.repeat(index_frames, entry_counts)
+
+        # A frame can match several frames of the same entry, so count each
+        # unique (entry, frame) pair once
+        matched_entries, query_matched = _count_unique_pairs(
+            entries, query_frames, num_query_frames
+        )
+        _, index_matched = _count_unique_pairs(entries, index_frames, len(offsets) - 1)
+        frame_counts = np.frombuffer(self._entry_frame_counts, dtype=np.int64)
+        query_matched_percent = query_matched * 100 / num_query_frames
+        index_matched_percent = index_matched * 100 / frame_counts[matched_entries]
+        is_match = (query_matched_percent >= self.query_match_threshold_pct) & (
+            index_matched_percent >= self.index_match_threshold_pct
+        )
+        return [
+            IndexMatch(
+                VPDQSimilarityInfo(query_pct, index_pct),
+                self._entry_idx_to_features_and_entries[entry_id][1],
+            )
+            for entry_id, query_pct, index_pct in zip(
+                matched_entries[is_match].tolist(),
+                query_matched_percent[is_match].tolist(),
+                index_matched_percent[is_match].tolist(),
+            )
+        ]
+
+    def __setstate__(self, state: t.Dict[str, t.Any]) -> None:
+        # Upgrade from when frames were kept as VpdqCompactFeatures
+        old_hex_to_idx = state.pop("_unique_vpdqHex_to_index_idx", None)
+        if old_hex_to_idx is not None:
+            state["_unique_hash_to_index_idx"] = {
+                bytes.fromhex(h): idx for h, idx in old_hex_to_idx.items()
+            }
+            state["_entry_idx_to_features_and_entries"] = [
+                (VpdqFeatureArrays.from_features(fs), entry)
+                for fs, entry in state["_entry_idx_to_features_and_entries"]
+            ]
+        # Upgrade from when the entry ids for each frame were lists
+        old_frame_entries = state.pop("_index_idx_to_vpdqHex_and_entry", None)
+        if old_frame_entries is not None:
+            state["_frame_entry_ids"] = IndexEntries.from_groups(
+                entry_ids for _, entry_ids in old_frame_entries
+            )
+            state["_entry_frame_counts"] = array(
+                "q", (len(fs) for fs, _ in state["_entry_idx_to_features_and_entries"])
+            )
+        self.__dict__.update(state)
+
+
+def _packed_rows(hashes: np.ndarray) -> t.List[bytes]:
+    """The bytes of each row of a 2-D uint8 array"""
+    data = hashes.tobytes()
+    width = hashes.shape[1]
+    return [data[i : i + width] for i in range(0, len(data), width)]
+
+
+def _concat_ranges(starts: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """The concatenation of arange(start, start + count) for each start, count"""
+    ends = np.cumsum(counts)
+    return np.repeat(starts - (ends - counts), counts) + np.arange(
+        ends[-1] if len(ends) else 0
+    )
+
+
+def _count_unique_pairs(
+    groups: np.ndarray, members: np.ndarray, num_members: int
+) -> t.Tuple[np.ndarray, np.ndarray]:
+    """
+    Count the unique members of each group, from (group, member) pairs.
+
+    Returns:
+        (groups, counts), sorted by group
+    """
+    # Sorting is much faster than np.unique()'s hashing for large arrays
+    keys = np.sort(groups * num_members + members)
+    keys = keys[_is_first_of_run(keys)]
+    groups = keys // num_members
+    starts = np.flatnonzero(_is_first_of_run(groups))
+    return groups[starts], np.diff(starts, append=len(groups))
+
+
+def _is_first_of_run(sorted_values: np.ndarray) -> np.ndarray:
+    ret = np.ones(len(sorted_values), dtype=bool)
+    np.not_equal(sorted_values[1:], sorted_values[:-1], out=ret[1:])
+    return ret
@@ -1,12 +1,16 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
 import vpdq
+import base64
+import binascii
 import json
 import typing as t
 import pathlib
 from dataclasses import dataclass
 
-from threatexchange.signal_type.pdq.pdq_utils import PDQ_HEX_STR_LEN
+import numpy as np
+
+from threatexchange.signal_type.pdq.pdq_utils import BITS_IN_PDQ, PDQ_HEX_STR_LEN
 
 QUALITY = "quality"
 HASH = "hash"
@@ -16,6 +20,11 @@ VPDQ_QUALITY_THRESHOLD = 50
 VPDQ_DISTANCE_THRESHOLD = 31
 VPDQ_QUERY_MATCH_THRESHOLD_PERCENT = 80.0
 VPDQ_INDEX_MATCH_THRESHOLD_PERCENT = 0.0
+# Marks the compact encoding, vs JSON - see vpdq_to_binary()
+VPDQ_BINARY_PREFIX = "vpdq:b64:"
+_PDQ_BYTES = BITS_IN_PDQ // 8
+# hash + quality + timestamp
+_BINARY_BYTES_PER_FEATURE = _PDQ_BYTES + 1 + 4
 
 
 @dataclass
@@ -83,6 +92,125 @@ def json_to_vpdq(json_str: str) -> t.List[VpdqCompactFeature]:
     return [VpdqCompactFeature.from_str(s) for s in json.loads(json_str or "[]")]
 
 
+@dataclass
+class VpdqFeatureArrays:
+    """
+    The features of a video as numpy arrays, i.e. from binary_to_vpdq_arrays()
+
+    hashes: (n, 32) uint8 - packed PDQ hashes, as used by faiss binary indices
+    qualities: (n,) uint8
+    timestamps: (n,) float32
+    """
+
+    hashes: np.ndarray
+    qualities: np.ndarray
+    timestamps: np.ndarray
+
+    @classmethod
+    def from_features(
+        cls, features: t.Sequence[VpdqCompactFeature]
+    ) -> "VpdqFeatureArrays":
+        hashes = np.frombuffer(
+            bytes.fromhex("".join(f.pdq_hex for f in features)), dtype=np.uint8
+        )
+        return cls(
+            hashes.reshape(len(features), _PDQ_BYTES),
+            np.array([f.quality for f in features], dtype=np.uint8),
+            np.array([f.timestamp for f in features], dtype=np.float32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.qualities)
+
+    def to_features(self) -> t.List[VpdqCompactFeature]:
+        hexes = self.hashes.tobytes().hex()
+        timestamps = np.round(
+            self.timestamps.astype(np.float64), VPDQ_TIMESTAMP_PRECISION
+        )
+        return list(
+            map(
+                VpdqCompactFeature,
+                [
+                    hexes[i : i + PDQ_HEX_STR_LEN]
+                    for i in range(0, len(hexes), PDQ_HEX_STR_LEN)
+                ],
+                self.qualities.tolist(),
+                timestamps.tolist(),
+            )
+        )
+
+    def __getitem__(self, key: np.ndarray) -> "VpdqFeatureArrays":
+        return VpdqFeatureArrays(
+            self.hashes[key], self.qualities[key], self.timestamps[key]
+        )
+
+    def prepare(self, quality_tolerance: int) -> "VpdqFeatureArrays":
+        """The same as dedupe(quality_filter(...)) on features"""
+        filtered = self[self.qualities >= quality_tolerance]
+        _, first_idxs = np.unique(
+            filtered.hashes.view(f"V{_PDQ_BYTES}").ravel(), return_index=True
+        )
+        return filtered[np.sort(first_idxs)]
+
+
+def vpdq_to_binary(vpdq_features: t.Sequence[VpdqCompactFeature]) -> str:
+    """
+    Convert from VPDQ features to the compact signal_str encoding.
+
+    That is VPDQ_BINARY_PREFIX followed by the base64 of every packed 32 byte
+    hash, then every uint8 quality, then every float32 (little-endian)
+    timestamp. Each column is contiguous, so decoding to numpy is zero-copy.
+    Timestamps are only kept to float32 precision.
+    """
+    for f in vpdq_features:
+        f.assert_valid()
+    hashes = bytes.fromhex("".join(f.pdq_hex for f in vpdq_features))
+    qualities = np.array([f.quality for f in vpdq_features], dtype=np.uint8)
+    timestamps = np.array([f.timestamp for f in vpdq_features], dtype="<f4")
+    data = hashes + qualities.tobytes() + timestamps.tobytes()
+    return VPDQ_BINARY_PREFIX + base64.b64encode(data).decode("ascii")
+
+
+def binary_to_vpdq_arrays(signal_str: str) -> VpdqFeatureArrays:
+    """
+    Decode vpdq_to_binary() into arrays, which are views on the decoded bytes.
+
+    Raises ValueError if signal_str isn't a valid encoding.
+    """
+    if not signal_str.startswith(VPDQ_BINARY_PREFIX):
+        raise ValueError("missing vpdq binary prefix")
+    try:
+        data = base64.b64decode(signal_str[len(VPDQ_BINARY_PREFIX) :], validate=True)
+    except binascii.Error:
+        raise ValueError("invalid base64 in vpdq binary signal")
+    n, remainder = divmod(len(data), _BINARY_BYTES_PER_FEATURE)
+    if remainder:
+        raise ValueError("truncated vpdq binary signal")
+    hashes = np.frombuffer(data, dtype=np.uint8, count=n * _PDQ_BYTES)
+    qualities = np.frombuffer(data, dtype=np.uint8, count=n, offset=n * _PDQ_BYTES)
+    timestamps = np.frombuffer(data, dtype="<f4", count=n, offset=n * (_PDQ_BYTES + 1))
+    if np.any(qualities > 100):
+        raise ValueError("invalid VPDQ quality")
+    if not np.all(timestamps >= 0):  # Also catches NaN
+        raise ValueError("invalid timestamp")
+    return VpdqFeatureArrays(hashes.reshape(n, _PDQ_BYTES), qualities, timestamps)
+
+
+def is_vpdq_binary(signal_str: str) -> bool:
+    return signal_str.startswith(VPDQ_BINARY_PREFIX)
+
+
+def signal_str_to_vpdq(signal_str: str) -> t.List[VpdqCompactFeature]:
+    """
+    Convert either VPDQ signal_str encoding (JSON or binary) to VPDQ features.
+
+    Raises ValueError if signal_str is invalid.
+    """
+    if is_vpdq_binary(signal_str):
+        return binary_to_vpdq_arrays(signal_str).to_features()
+    return json_to_vpdq(signal_str)
+
+
 def dedupe(features: t.List[VpdqCompactFeature]) -> t.List[VpdqCompactFeature]:
     """Filter out the VPDQ feature with exact same hash in a list of VPDQ features
 
@@ -171,5 +299,23 @@ def prepare_vpdq_feature(
     quality_tolerance : The quality tolerance of VPDQ Feature.
     If VPDQ Feature is below this quality level then it will not be added
     """
+    if is_vpdq_binary(signal_str):
+        arrays = binary_to_vpdq_arrays(signal_str)
+        return arrays.prepare(quality_tolerance).to_features()
     features = json_to_vpdq(signal_str)
     return dedupe(quality_filter(features, quality_tolerance))
+
+
+def prepare_vpdq_arrays(signal_str: str, quality_tolerance: int) -> VpdqFeatureArrays:
+    """
+    The same as prepare_vpdq_feature(), but as arrays.
+
+    Binary signals are deduped and filtered without ever building
+    VpdqCompactFeatures - only JSON signals need them.
+    """
+    if is_vpdq_binary(signal_str):
+        return binary_to_vpdq_arrays(signal_str).prepare(quality_tolerance)
+    features = json_to_vpdq(signal_str)
+    return VpdqFeatureArrays.from_features(
+        dedupe(quality_filter(features, quality_tolerance))
+    )
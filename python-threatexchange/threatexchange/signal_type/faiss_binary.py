@@ -0,0 +1,329 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Building blocks for indices of binary hash codes searched with faiss.
+
+Hashes that are (or can be turned into) fixed size bit strings, like PDQ,
+can be searched by hamming distance with a faiss binary index. The wrappers
+here handle pickling and freeing the faiss index, and searching up to a
+threshold. Subclasses convert their signal strings with _to_packed().
+
+Indices hand out a dense id to each hash they store (i.e. the faiss id), and
+keep the entries (metadata) for each id in IndexEntries. In HMA, entries are
+always an int bank_content_id, so by default they are kept CSR-style in
+numpy arrays:
+
+    values      (num_entries,) int64 - entries, grouped by id
+    offsets     (num_ids + 1,) int64 - values[offsets[i]:offsets[i + 1]] are
+                                       the entries for id i
+
+which costs 8 bytes an entry rather than a list and an int object each. The
+first entry that isn't an int switches the storage to a list per id.
+"""
+
+from array import array
+import typing as t
+import weakref
+
+import faiss
+import numpy as np
+
+from threatexchange.signal_type.index import T as IndexT
+
+_INT64_MIN = np.iinfo(np.int64).min
+_INT64_MAX = np.iinfo(np.int64).max
+
+
+class IndexEntries(t.Generic[IndexT]):
+    """
+    The entries for each id of an index, in the order they were added.
+
+    Appends go to an unsorted tail, which is merged into the arrays on the
+    next lookup. That's cheap when building and then querying, or when new
+    entries are for new ids, but means interleaving adds of duplicate hashes
+    with queries re-sorts the arrays each time.
+    """
+
+    def __init__(self) -> None:
+        self._num_ids = 0
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._values: np.ndarray = np.empty(0, dtype=np.int64)
+        self._tail_ids: "array[int]" = array("q")
+        self._tail_values: "array[int]" = array("q")
+        # Set instead of the arrays once there are entries that aren't ints
+        self._lists: t.Optional[t.List[t.List[IndexT]]] = None
+
+    @classmethod
+    def from_groups(
+        cls, groups: t.Iterable[t.Iterable[IndexT]]
+    ) -> "IndexEntries[IndexT]":
+        """The same as extend()ing with the entries of each id in order"""
+        ret: IndexEntries[IndexT] = cls()
+        for idx, group in enumerate(groups):
+            group = list(group)
+            ret.extend([idx] * len(group), group)
+        return ret
+
+    def __len__(self) -> int:
+        """The number of ids"""
+        return self._num_ids
+
+    def append(self, idx: int, entry: IndexT) -> None:
+        self.extend((idx,), (entry,))
+
+    def extend(self, ids: t.Sequence[int], entries: t.Sequence[IndexT]) -> None:
+        """
+        Add entries to ids, which must be existing ids or the next new one.
+        """
+        if self._lists is None and not all(is_int64(e) for e in entries):
+            self._lists = self.groups()
+            self._clear_arrays()
+        if self._lists is not None:
+            for idx, entry in zip(ids, entries):
+                if idx == len(self._lists):
+                    self._lists.append([entry])
+                else:
+                    self._lists[idx].append(entry)
+            self._num_ids = len(self._lists)
+            return
+        self._tail_ids.extend(ids)
+        self._tail_values.extend(t.cast(t.Sequence[int], entries))
+        if ids:
+            self._num_ids = max(self._num_ids, max(ids) + 1)
+
+    def get(self, idx: int) -> t.List[IndexT]:
+        if self._lists is not None:
+            return self._lists[idx]
+        offsets, values = self.as_arrays()
+        return values[offsets[idx] : offsets[idx + 1]].tolist()
+
+    def groups(self) -> t.List[t.List[IndexT]]:
+        """The entries for every id, as lists"""
+        if self._lists is not None:
+            return [list(es) for es in self._lists]
+        offsets, values = self.as_arrays()
+        return [
+            values[start:end].tolist()
+            for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())
+        ]
+
+    def is_int(self) -> bool:
+        """Whether all entries are ints, and stored as arrays"""
+        return self._lists is None
+
+    def as_arrays(self) -> t.Tuple[np.ndarray, np.ndarray]:
+        """
+        Get (offsets, values) for int entries.
+
+        Raises ValueError if any entry isn't an int.
+        """
+        if self._lists is not None:
+            raise ValueError("entries are not all ints")
+        self._compact()
+        return self._offsets, self._values
+
+    def _compact(self) -> None:
+        if not self._tail_ids:
+            return
+        tail_ids = np.frombuffer(self._tail_ids, dtype=np.int64)
+        tail_values = np.frombuffer(self._tail_values, dtype=np.int64)
+        num_compacted = len(self._offsets) - 1
+        values = np.concatenate((self._values, tail_values))
+        if tail_ids[0] >= num_compacted and np.all(tail_ids[1:] >= tail_ids[:-1]):
+            # Only new ids, in order - no need to re-sort
+            counts = np.bincount(
+                tail_ids - num_compacted, minlength=self._num_ids - num_compacted
+            )
+            offsets = np.concatenate(
+                (self._offsets, self._offsets[-1] + np.cumsum(counts))
+            )
+        else:
+            all_ids = np.concatenate(
+                (np.repeat(np.arange(num_compacted), np.diff(self._offsets)), tail_ids)
+            )
+            # Stable, to keep entries for an id in the order they were added
+            values = values[np.argsort(all_ids, kind="stable")]
+            offsets = np.zeros(self._num_ids + 1, dtype=np.int64)
+            np.cumsum(np.bincount(all_ids, minlength=self._num_ids), out=offsets[1:])
+        self._offsets = offsets
+        self._values = values
+        self._tail_ids = array("q")
+        self._tail_values = array("q")
+
+    def _clear_arrays(self) -> None:
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._values = np.empty(0, dtype=np.int64)
+        self._tail_ids = array("q")
+        self._tail_values = array("q")
+
+    def __getstate__(self):
+        if self._lists is None:
+            self._compact()
+        state = self.__dict__.copy()
+        if self._lists is None and len(self._values) == self._num_ids:
+            # Every id has a single entry, the usual case, so skip offsets
+            state["_offsets"] = None
+        return state
+
+    def __setstate__(self, state: t.Dict[str, t.Any]) -> None:
+        self.__dict__.update(state)
+        if self._offsets is None:
+            self._offsets = np.arange(self._num_ids + 1, dtype=np.int64)
+
+
+def is_int64(entry: t.Any) -> bool:
+    """Whether the entry can be stored as an int64 and come back the same"""
+    return type(entry) is int and _INT64_MIN <= entry <= _INT64_MAX
+
+
+class FaissIndex:
+    """
+    A wrapper around a faiss index for pickle serialization
+
+    Codes are unpacked to one float dimension per bit, for i.e. IndexFlatL2,
+    whose (squared L2) distances are then hamming distances.
+    """
+
+    def __init__(self, faiss_index: t.Union[faiss.Index, faiss.IndexBinary]) -> None:
+        self.faiss_index = faiss_index
+        self._finalizer = weakref.finalize(
+            self, FaissIndex._finalize_faiss, self.faiss_index
+        )
+
+    def _to_packed(self, signal_strs: t.Sequence[str]) -> np.ndarray:
+        """Convert hashes to a (n, code bytes) array of packed bits"""
+        raise NotImplementedError
+
+    def _to_vectors(self, signal_strs: t.Sequence[str]) -> np.ndarray:
+        return self._packed_to_vectors(self._to_packed(signal_strs))
+
+    def _packed_to_vectors(self, packed: np.ndarray) -> np.ndarray:
+        return np.unpackbits(packed, axis=1)
+
+    def _searcher(self, threshold: int) -> t.Union[faiss.Index, faiss.IndexBinary]:
+        """The faiss index to search with the given threshold"""
+        return self.faiss_index
+
+    def add(self, signal_strs: t.Sequence[str]) -> None:
+        """
+        Add hashes to the FAISS index.
+        """
+        self.add_packed(self._to_packed(signal_strs))
+
+    def add_packed(self, packed: np.ndarray) -> None:
+        """
+        Add hashes already converted to a (n, code bytes) array of packed bits.
+        """
+        self.faiss_index.add(self._packed_to_vectors(packed))
+
+    def search(
+        self, queries: t.Sequence[str], threshold: int
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        """
+        Search the FAISS index for matches to the given queries.
+
+        Returns a list of (faiss id, distance) matches for each query.
+        """
+        query_array: np.ndarray = self._to_vectors(queries)
+        limits, distances, indices = self._searcher(threshold).range_search(
+            query_array, threshold + 1
+        )
+
+        return [
+            list(
+                zip(
+                    indices[limits[i] : limits[i + 1]].tolist(),
+                    distances[limits[i] : limits[i + 1]].astype(int).tolist(),
+                )
+            )
+            for i in range(len(queries))
+        ]
+
+    def search_topk(
+        self, queries: t.Sequence[str], k: int, threshold: int
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        """
+        Search the FAISS index for the k closest matches to the given queries.
+
+        Returns a list of up to k (faiss id, distance) matches for each query,
+        closest first.
+        """
+        query_array: np.ndarray = self._to_vectors(queries)
+        distances, indices = self._searcher(threshold).search(query_array, k)
+        return [
+            [
+                (idx, int(dist))
+                for idx, dist in zip(ids.tolist(), dists.tolist())
+                # faiss pads with -1 if there are fewer than k results
+                if idx != -1 and dist <= threshold
+            ]
+            for ids, dists in zip(indices, distances)
+        ]
+
+    def __getstate__(self):
+        return faiss.serialize_index(self.faiss_index)
+
+    def __setstate__(self, data):
+        self.faiss_index = faiss.deserialize_index(data)
+        self._finalizer = weakref.finalize(
+            self, FaissIndex._finalize_faiss, self.faiss_index
+        )
+
+    def dispose(self) -> None:
+        try:
+            reset_fn = getattr(self.faiss_index, "reset", None)
+            if callable(reset_fn):
+                reset_fn()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _finalize_faiss(faiss_index: t.Union[faiss.Index, faiss.IndexBinary]) -> None:
+        try:
+            reset_fn = getattr(faiss_index, "reset", None)
+            if callable(reset_fn):
+                reset_fn()
+        except Exception:
+            pass
+
+
+class FaissBinaryIndex(FaissIndex):
+    """
+    A wrapper around a faiss binary index for pickle serialization
+
+    Hashes are stored packed and compared by hamming distance.
+    """
+
+    def _packed_to_vectors(self, packed: np.ndarray) -> np.ndarray:
+        return packed
+
+    def __getstate__(self):
+        return faiss.serialize_index_binary(self.faiss_index)
+
+    def __setstate__(self, data):
+        self.faiss_index = faiss.deserialize_index_binary(data)
+        self._finalizer = weakref.finalize(
+            self, FaissIndex._finalize_faiss, self.faiss_index
+        )
+
+
+class FaissMultiHashIndex(FaissBinaryIndex):
+    """
+    A wrapper around a faiss.IndexBinaryMultiHash for pickle serialization
+
+    Sets how many bits to flip per substring from the threshold of each
+    search, so every hash within the threshold is found.
+    """
+
+    # Past this many flips, there are so many buckets to probe that scanning
+    # every hash is faster, whatever the size of the index
+    MAX_NFLIP = 1
+
+    def _searcher(self, threshold: int) -> faiss.IndexBinary:
+        mih = t.cast(faiss.IndexBinaryMultiHash, self.faiss_index)
+        nflip = threshold // mih.nhash  # type: ignore[attr-defined]
+        if nflip > self.MAX_NFLIP:
+            # MIH ids are positions in its flat storage, so they stay the same
+            return faiss.downcast_IndexBinary(mih.storage)  # type: ignore[attr-defined]
+        mih.nflip = nflip
+        return mih
@@ -197,6 +197,18 @@ class SignalTypeIndex(t.Generic[T]):
         """
         raise NotImplementedError
 
+    def query_many(
+        self, queries: t.Sequence[str]
+    ) -> t.Sequence[t.Sequence[IndexMatch[T]]]:
+        """
+        Look up multiple entries against the index at once.
+
+        The nth item in the result is the same as query(queries[n]). The default
+        implementation just calls query() for each, but indices that can
+        batch lookups (i.e. faiss-backed ones) should override this.
+        """
+        return [self.query(q) for q in queries]
+
     @classmethod
     def build(cls: t.Type[Self], entries: t.Iterable[t.Tuple[str, T]]) -> Self:
         """
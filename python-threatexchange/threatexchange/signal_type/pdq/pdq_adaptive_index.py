@@ -0,0 +1,117 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+A PDQ index that picks its faiss engine from the corpus size and threshold.
+
+Which engine is fastest flips with both (see
+benchmarks/benchmark_pdq_faiss_matchers.py):
+
+  * A flat binary index scans every hash. It costs nothing to build, and
+    query time grows with the number of hashes but not with the threshold.
+  * Multi-index hashing (MIH, what PDQIndex uses) splits hashes into 16
+    substrings and probes every bucket within threshold // 16 bits of each
+    of the query's substrings. That is a fixed number of lookups, so it
+    scales to huge corpora, but is slower to build, and the buckets to probe
+    grow exponentially with threshold // 16.
+"""
+
+from dataclasses import dataclass
+import time
+import typing as t
+
+import faiss
+
+from threatexchange.signal_type.index import T as IndexT
+from threatexchange.signal_type.pdq.pdq_index2 import PDQIndex2
+from threatexchange.signal_type.pdq.pdq_utils import (
+    BITS_IN_PDQ,
+    PDQ_CONFIDENT_MATCH_THRESHOLD,
+)
+
+Self = t.TypeVar("Self", bound="PDQAdaptiveIndex")
+
+ENGINE_FLAT = "flat"
+ENGINE_MIH = "mih"
+
+
+@dataclass
+class PDQIndexBuildStats:
+    """Which engine PDQAdaptiveIndex picked, and what it cost to build"""
+
+    engine: str
+    num_hashes: int
+    threshold: int
+    build_seconds: float
+
+
+class PDQAdaptiveIndex(PDQIndex2[IndexT]):
+    """
+    PDQIndex2 over binary hashes, which picks between a flat and an MIH index.
+
+    The choice is made when entries are added (i.e. build()), from the number
+    of unique hashes and the threshold, and the index is converted to MIH
+    once it grows large enough. build_stats records the current engine and
+    size, and the time spent in every add so far, and is serialized with the
+    index.
+    """
+
+    MIH_NHASH = 16
+    # For each threshold // MIH_NHASH, the number of unique hashes from which
+    # MIH is faster than a flat scan. Measured with random hashes; for larger
+    # thresholds, flat is always faster.
+    MIH_MIN_HASHES_BY_NFLIP: t.ClassVar[t.Dict[int, int]] = {0: 10_000, 1: 500_000}
+
+    def __init__(
+        self,
+        entries: t.Iterable[t.Tuple[str, IndexT]] = (),
+        *,
+        threshold: int = PDQ_CONFIDENT_MATCH_THRESHOLD,
+    ) -> None:
+        super().__init__(faiss.IndexBinaryFlat(BITS_IN_PDQ), threshold=threshold)
+        self.engine = ENGINE_FLAT
+        self.build_stats: t.Optional[PDQIndexBuildStats] = None
+        self.add_all(entries)
+
+    @classmethod
+    def build(
+        cls: t.Type[Self],
+        entries: t.Iterable[t.Tuple[str, IndexT]],
+        *,
+        threshold: int = PDQ_CONFIDENT_MATCH_THRESHOLD,
+    ) -> Self:
+        return cls(entries, threshold=threshold)
+
+    @classmethod
+    def choose_engine(cls, num_hashes: int, threshold: int) -> str:
+        min_hashes = cls.MIH_MIN_HASHES_BY_NFLIP.get(threshold // cls.MIH_NHASH)
+        if min_hashes is not None and num_hashes >= min_hashes:
+            return ENGINE_MIH
+        return ENGINE_FLAT
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
+        start = time.perf_counter()
+        super().add_all(entries)
+        if not len(self):
+            return
+        engine = self.choose_engine(len(self), self.threshold)
+        if engine != self.engine:
+            self._rebuild_as(engine)
+        previous_seconds = self.build_stats.build_seconds if self.build_stats else 0.0
+        self.build_stats = PDQIndexBuildStats(
+            engine=engine,
+            num_hashes=len(self),
+            threshold=self.threshold,
+            build_seconds=previous_seconds + time.perf_counter() - start,
+        )
+
+    def _rebuild_as(self, engine: str) -> None:
+        assert engine == ENGINE_MIH, "indices only grow"
+        index = faiss.IndexBinaryMultiHash(
+            BITS_IN_PDQ, self.MIH_NHASH, BITS_IN_PDQ // self.MIH_NHASH
+        )
+        flat = self._index.faiss_index
+        # Same order as the flat index, so faiss ids don't change
+        index.add(flat.reconstruct_n(0, flat.ntotal))
+        self._index.dispose()
+        self._index = self._wrap_faiss_index(index)
+        self.engine = engine
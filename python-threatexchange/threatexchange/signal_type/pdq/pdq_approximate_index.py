@@ -0,0 +1,147 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+An approximate PDQ index, for corpora too large for exact search.
+
+Past ~100M hashes, neither a flat scan nor multi-index hashing is fast
+enough. faiss's binary IVF and HNSW indices only look at part of the corpus
+for each query, trading recall for latency:
+
+  * IVF clusters the hashes (k-means, so it needs training), and searches
+    only the `nprobe` clusters closest to the query.
+  * HNSW walks a proximity graph, keeping `ef_search` candidates. It can't
+    do range searches, so it returns up to `max_results` nearest hashes
+    within the threshold.
+
+Measure recall for your data before relying on either, i.e. with
+benchmarks/benchmark_pdq_approximate_index.py.
+"""
+
+import math
+import typing as t
+
+import faiss
+import numpy as np
+
+from threatexchange.signal_type.index import T as IndexT
+from threatexchange.signal_type.pdq.pdq_index2 import PDQIndex2
+from threatexchange.signal_type.pdq.pdq_utils import (
+    BITS_IN_PDQ,
+    PDQ_CONFIDENT_MATCH_THRESHOLD,
+    convert_pdq_strings_to_packed_ndarray,
+)
+
+Self = t.TypeVar("Self", bound="PDQApproximateIndex")
+
+METHOD_IVF = "ivf"
+METHOD_HNSW = "hnsw"
+
+# faiss warns about k-means with fewer training points than this per cluster
+_MIN_TRAINING_POINTS_PER_LIST = 39
+_TRAINING_POINTS_PER_LIST = 64
+
+
+class PDQApproximateIndex(PDQIndex2[IndexT]):
+    """
+    PDQIndex2 backed by a faiss binary IVF or HNSW index.
+
+    Matches are always within the threshold, but some hashes within it may
+    be missed. Raise nprobe (IVF) or ef_search (HNSW) for better recall at
+    the cost of slower queries. Both can be changed at any time.
+
+    IVF is trained on the entries of the first add_all() (i.e. build()), so
+    that should be representative of the whole corpus. If nlist isn't given,
+    it's picked from the size of that first batch.
+    """
+
+    def __init__(
+        self,
+        entries: t.Iterable[t.Tuple[str, IndexT]] = (),
+        *,
+        threshold: int = PDQ_CONFIDENT_MATCH_THRESHOLD,
+        method: str = METHOD_IVF,
+        nlist: t.Optional[int] = None,
+        nprobe: int = 32,
+        hnsw_m: int = 32,
+        ef_search: int = 128,
+        max_results: int = 100,
+    ) -> None:
+        if method not in (METHOD_IVF, METHOD_HNSW):
+            raise ValueError(f"unknown approximate index method: {method}")
+        self.method = method
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.max_results = max_results
+        index: faiss.IndexBinary
+        if method == METHOD_HNSW:
+            index = faiss.IndexBinaryHNSW(BITS_IN_PDQ, hnsw_m)
+        else:
+            # Replaced by a trained IVF index on the first add
+            index = faiss.IndexBinaryFlat(BITS_IN_PDQ)
+        super().__init__(index, threshold=threshold)
+        self.add_all(entries)
+
+    @classmethod
+    def build(
+        cls: t.Type[Self], entries: t.Iterable[t.Tuple[str, IndexT]], **kwargs: t.Any
+    ) -> Self:
+        return cls(entries, **kwargs)
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
+        if self.method == METHOD_IVF and not isinstance(
+            self._index.faiss_index, faiss.IndexBinaryIVF
+        ):
+            entries = list(entries)
+            if not entries:
+                return
+            self._train([h for h, _ in entries])
+        super().add_all(entries)
+
+    def _train(self, hashes: t.Sequence[str]) -> None:
+        index = train_binary_ivf(
+            convert_pdq_strings_to_packed_ndarray(hashes), self.nlist
+        )
+        self.nlist = index.nlist
+        self._index.dispose()
+        self._index = self._wrap_faiss_index(index)
+
+    def _apply_search_params(self) -> None:
+        faiss_index = self._index.faiss_index
+        if isinstance(faiss_index, faiss.IndexBinaryIVF):
+            faiss_index.nprobe = self.nprobe
+        elif isinstance(faiss_index, faiss.IndexBinaryHNSW):
+            faiss_index.hnsw.efSearch = self.ef_search
+
+    def _search(
+        self, hashes: t.Sequence[str], threshold: int
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        self._apply_search_params()
+        if self.method == METHOD_HNSW:
+            return self._index.search_topk(hashes, self.max_results, threshold)
+        return super()._search(hashes, threshold)
+
+    def _search_topk(
+        self, hashes: t.Sequence[str], k: int, threshold: int
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        self._apply_search_params()
+        return super()._search_topk(hashes, k, threshold)
+
+
+def train_binary_ivf(
+    packed: np.ndarray, nlist: t.Optional[int] = None
+) -> faiss.IndexBinaryIVF:
+    """
+    Create an (empty) binary IVF index, trained on a sample of packed hashes.
+
+    If nlist isn't given, it's picked from the number of hashes.
+    """
+    n = len(packed)
+    if nlist is None:
+        nlist = max(1, min(4 * math.isqrt(n), n // _MIN_TRAINING_POINTS_PER_LIST))
+    sample_size = min(n, nlist * _TRAINING_POINTS_PER_LIST)
+    sample = np.random.default_rng(0).choice(n, sample_size, replace=False)
+    quantizer = faiss.IndexBinaryFlat(BITS_IN_PDQ)
+    index = faiss.IndexBinaryIVF(quantizer, BITS_IN_PDQ, nlist)
+    index.train(packed[np.sort(sample)])
+    return index
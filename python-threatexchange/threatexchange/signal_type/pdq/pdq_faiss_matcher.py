@@ -7,9 +7,13 @@ import binascii
 import numpy
 from abc import ABC, abstractmethod
 
-from threatexchange.signal_type.pdq.pdq_utils import BITS_IN_PDQ
+from threatexchange.signal_type.pdq.pdq_utils import (
+    BITS_IN_PDQ,
+    PDQHashLike,
+    convert_pdq_strings_to_packed_ndarray,
+)
 
-PDQ_HASH_TYPE = t.Union[str, bytes]
+PDQ_HASH_TYPE = PDQHashLike
 
 
 def uint64_to_int64(as_uint64: int):
@@ -28,6 +32,13 @@ def int64_to_uint64(as_int64: int):
     return numpy.int64(as_int64).astype(numpy.uint64).item()
 
 
+def uint64s_to_int64_ndarray(as_uint64s: t.Iterable[int]) -> numpy.ndarray:
+    """
+    Vectorized uint64_to_int64, returning a numpy array of int64 ids.
+    """
+    return numpy.fromiter(as_uint64s, dtype=numpy.uint64).view(numpy.int64)
+
+
 class PDQHashIndex(ABC):
     @abstractmethod
     def __init__(self, faiss_index: faiss.IndexBinary) -> None:
@@ -88,10 +99,7 @@ class PDQHashIndex(ABC):
             "0000000000000000000000000000000000000000000000000000000000000000" for a threshold of 16. Thus it would appear in
             the entry for both the hashes if they were both in the queries list.
         """
-        query_vectors = [
-            numpy.frombuffer(binascii.unhexlify(q), dtype=numpy.uint8) for q in queries
-        ]
-        qs = numpy.array(query_vectors)
+        qs = convert_pdq_strings_to_packed_ndarray(queries)
         limits, _, I = self.faiss_index.range_search(qs, threshhold + 1)
 
         if return_as_ids:
@@ -104,7 +112,7 @@ class PDQHashIndex(ABC):
 
         return [
             [output_fn(idx.item()) for idx in I[limits[i] : limits[i + 1]]]
-            for i in range(len(query_vectors))
+            for i in range(len(queries))
         ]
 
     def search_with_distance_in_result(
@@ -126,10 +134,7 @@ class PDQHashIndex(ABC):
         }
         """
 
-        query_vectors = [
-            numpy.frombuffer(binascii.unhexlify(q), dtype=numpy.uint8) for q in queries
-        ]
-        qs = numpy.array(query_vectors)
+        qs = convert_pdq_strings_to_packed_ndarray(queries)
         limits, similarities, I = self.faiss_index.range_search(qs, threshhold + 1)
 
         # for custom ids, we understood them initially as uint64 numbers and then coerced them internally to be signed
@@ -148,6 +153,37 @@ class PDQHashIndex(ABC):
             result[query] = match_tuples
         return result
 
+    def search_topk(
+        self,
+        queries: t.Sequence[PDQ_HASH_TYPE],
+        k: int,
+        threshhold: int,
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        """
+        Searches this index for the k closest PDQ hashes to each query that are also no more than the threshold away
+        by hamming distance.
+
+        Unlike `search`, this uses a faiss knn search, so the number of results per query is bounded by k, even for
+        dense clusters of near-duplicate hashes.
+
+        Returns
+        -------
+        sequence of matches per query
+            For each query, up to k (id, distance) tuples in order of increasing distance. The ids are the custom ids
+            the hashes were added with.
+        """
+        qs = convert_pdq_strings_to_packed_ndarray(queries)
+        distances, I = self.faiss_index.search(qs, k)
+        return [
+            [
+                (int64_to_uint64(idx), dist)
+                for idx, dist in zip(ids.tolist(), dists.tolist())
+                # faiss pads with -1 if there are fewer than k results
+                if idx != -1 and dist <= threshhold
+            ]
+            for ids, dists in zip(I, distances)
+        ]
+
     def __getstate__(self):
         data = faiss.serialize_index_binary(self.faiss_index)
         return data
@@ -204,12 +240,9 @@ class PDQFlatHashIndex(PDQHashIndex):
             then the ids for the hashes will be assumed to be their respective index
             in hashes (i.e., the nth hash would have id n, starting from 0).
         """
-        hash_bytes = [binascii.unhexlify(hash) for hash in hashes]
-        vectors = list(
-            map(lambda h: numpy.frombuffer(h, dtype=numpy.uint8), hash_bytes)
-        )
-        i64_ids = list(map(uint64_to_int64, custom_ids))
-        self.faiss_index.add_with_ids(numpy.array(vectors), numpy.array(i64_ids))
+        vectors = convert_pdq_strings_to_packed_ndarray(hashes)
+        i64_ids = uint64s_to_int64_ndarray(custom_ids)
+        self.faiss_index.add_with_ids(vectors, i64_ids)
 
     def hash_at(self, idx: int) -> str:
         i64_id = uint64_to_int64(idx)
@@ -236,6 +269,7 @@ class PDQMultiHashIndex(PDQHashIndex):
             faiss.IndexBinaryMultiHash(BITS_IN_PDQ, nhash, bits_per_hashmap)
         )
         super().__init__(faiss_index)
+        self._index_rev_map_stale = False
         self.__construct_index_rev_map()
 
     def add(
@@ -259,13 +293,15 @@ class PDQMultiHashIndex(PDQHashIndex):
         -------
         a PDQMultiHashIndex of these hashes
         """
-        hash_bytes = [binascii.unhexlify(hash) for hash in hashes]
-        vectors = list(
-            map(lambda h: numpy.frombuffer(h, dtype=numpy.uint8), hash_bytes)
-        )
-        i64_ids = list(map(uint64_to_int64, custom_ids))
-        self.faiss_index.add_with_ids(numpy.array(vectors), numpy.array(i64_ids))
-        self.__construct_index_rev_map()
+        vectors = convert_pdq_strings_to_packed_ndarray(hashes)
+        i64_ids = uint64s_to_int64_ndarray(custom_ids)
+        start = self.faiss_index.ntotal
+        self.faiss_index.add_with_ids(vectors, i64_ids)
+        # Extend rather than rebuild, or repeated adds become quadratic
+        if self.index_rev_map is not None and not self._index_rev_map_stale:
+            self.index_rev_map.update(
+                zip(i64_ids.tolist(), range(start, start + len(i64_ids)))
+            )
 
     @property
     def mih_index(self):
@@ -294,8 +330,19 @@ class PDQMultiHashIndex(PDQHashIndex):
         self.mih_index.nflip = threshhold // self.mih_index.nhash
         return super().search_with_distance_in_result(queries, threshhold)
 
+    def search_topk(
+        self,
+        queries: t.Sequence[PDQ_HASH_TYPE],
+        k: int,
+        threshhold: int,
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        self.mih_index.nflip = threshhold // self.mih_index.nhash
+        return super().search_topk(queries, k, threshhold)
+
     def hash_at(self, idx: int) -> str:
         i64_id = uint64_to_int64(idx)
+        if self._index_rev_map_stale:
+            self.__construct_index_rev_map()
         if self.index_rev_map:
             index_id = self.index_rev_map[i64_id]
         else:
@@ -313,14 +360,17 @@ class PDQMultiHashIndex(PDQHashIndex):
         supports `reconstruct` calls.
         """
         if hasattr(self.faiss_index, "id_map"):
-            id_map = self.faiss_index.id_map
-            self.index_rev_map = {id_map.at(i): i for i in range(id_map.size())}
+            ids = faiss.vector_to_array(self.faiss_index.id_map)
+            self.index_rev_map = dict(zip(ids.tolist(), range(len(ids))))
         else:
             self.index_rev_map = None
+        self._index_rev_map_stale = False
 
     def __setstate__(self, data):
         super().__setstate__(data)
-        self.__construct_index_rev_map()
+        # Built on first hash_at, since not every caller needs it
+        self.index_rev_map = None
+        self._index_rev_map_stale = True
 
     def dispose(self) -> None:
         try:
@@ -328,5 +378,6 @@ class PDQMultiHashIndex(PDQHashIndex):
         finally:
             try:
                 self.index_rev_map = None
+                self._index_rev_map_stale = False
             except Exception:
                 pass
@@ -17,31 +17,48 @@ def pdq_from_file(path: pathlib.Path) -> PDQOutput:
     Given a path to a file return the PDQ Hash string in hex.
     Current tested against: jpg
     """
-    np_array = _convert_image_to_correct_array_dimension(Image.open(path))
-    return _pdq_from_numpy_array(np_array)
+    return pdq_from_image(Image.open(path))
 
 
 def pdq_from_bytes(file_bytes: bytes) -> PDQOutput:
     """
     For the bytestream from an image file, compute PDQ Hash and quality.
     """
-    np_array = _convert_image_to_correct_array_dimension(
-        Image.open(io.BytesIO(file_bytes))
-    )
+    return pdq_from_image(Image.open(io.BytesIO(file_bytes)))
+
+
+def pdq_from_image(image: Image.Image) -> PDQOutput:
+    """
+    For an already opened image, compute PDQ Hash and quality.
+    """
+    np_array = _convert_image_to_correct_array_dimension(image)
     return _pdq_from_numpy_array(np_array)
 
 
-def _pdq_from_numpy_array(array: np.ndarray) -> PDQOutput:
-    hash_vector, quality = pdqhash.compute(array)
+def pdq_from_arrays(arrays: t.Iterable[np.ndarray]) -> t.List[PDQOutput]:
+    """
+    Compute PDQ Hash and quality for many already decoded images.
 
-    bin_str = "".join([str(x) for x in hash_vector])
+    Each array is (height, width, 3), or (height, width) for grayscale, as
+    from numpy.asarray() of an image. The hashes are converted to hex together.
+    """
+    vectors = []
+    qualities = []
+    for array in arrays:
+        hash_vector, quality = pdqhash.compute(_convert_array_to_3d(array))
+        vectors.append(hash_vector)
+        qualities.append(quality)
+    if not vectors:
+        return []
+    # The first element of the hash vector is the most significant bit
+    packed = np.packbits(np.asarray(vectors, dtype=np.uint8), axis=1)
+    return [(row.tobytes().hex(), quality) for row, quality in zip(packed, qualities)]
 
-    # binary to hex using format string
-    # '%0*' is for padding up to ceil(num_bits/4),
-    # '%X' create a hex representation from the binary string's integer value
-    hex_str = "%0*X" % ((len(bin_str) + 3) // 4, int(bin_str, 2))
-    hex_str = hex_str.lower()
 
+def _pdq_from_numpy_array(array: np.ndarray) -> PDQOutput:
+    hash_vector, quality = pdqhash.compute(array)
+    # The first element of the hash vector is the most significant bit
+    hex_str = np.packbits(hash_vector.astype(np.uint8)).tobytes().hex()
     return hex_str, quality
 
 
@@ -54,8 +71,10 @@ def _convert_image_to_correct_array_dimension(image: Image.Image) -> np.ndarray:
         # which is incompatible with pdqhash
         image = image.convert("RGB")
 
-    array = np.asarray(image)
+    return _convert_array_to_3d(np.asarray(image))
+
 
+def _convert_array_to_3d(array: np.ndarray) -> np.ndarray:
     # Convert possible 2D array to 3D array
     # This is more efficient than converting to RGB for mode L images.
     if array.ndim == 2:
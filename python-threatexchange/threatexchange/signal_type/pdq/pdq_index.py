@@ -5,6 +5,7 @@ Implementation of SignalTypeIndex abstraction for PDQ by wrapping
 hashing.pdq_faiss_matcher.
 """
 
+import itertools
 import typing as t
 
 from threatexchange.signal_type.index import (
@@ -18,13 +19,20 @@ from threatexchange.signal_type.pdq.pdq_faiss_matcher import (
     PDQFlatHashIndex,
     PDQHashIndex,
 )
+from threatexchange.signal_type.faiss_binary import IndexEntries
 
 PDQIndexMatch = IndexMatchUntyped[SignalSimilarityInfoWithIntDistance, IndexT]
 
+# How many entries add_all() adds to faiss at once
+_ADD_BATCH_SIZE = 65536
+
 
 class PDQIndex(SignalTypeIndex[IndexT]):
     """
     Wrapper around the pdq faiss index lib using PDQMultiHashIndex
+
+    Every entry gets its own faiss id, and the entries themselves are stored
+    by id in IndexEntries.
     """
 
     @classmethod
@@ -37,45 +45,89 @@ class PDQIndex(SignalTypeIndex[IndexT]):
 
     def __init__(self, entries: t.Iterable[t.Tuple[str, IndexT]] = ()) -> None:
         super().__init__()
-        self.local_id_to_entry: t.List[t.Tuple[str, IndexT]] = []
+        self._entries: IndexEntries[IndexT] = IndexEntries()
         self.index: PDQHashIndex = self._get_empty_index()
         self.add_all(entries=entries)
 
     def __len__(self) -> int:
-        return len(self.local_id_to_entry)
+        return len(self._entries)
 
-    def query(self, hash: str) -> t.Sequence[PDQIndexMatch[IndexT]]:
+    def query(
+        self, hash: str, threshold: t.Optional[int] = None
+    ) -> t.Sequence[PDQIndexMatch[IndexT]]:
         """
         Look up entries against the index, up to the max supported distance.
-        """
 
-        # query takes a signal hash but index supports batch queries hence [hash]
-        results = self.index.search_with_distance_in_result(
-            [hash], self.get_match_threshold()
-        )
+        threshold overrides get_match_threshold() for just this query, and is
+        used as the search radius in faiss, so raising it costs more than
+        lowering it.
+        """
+        return self.query_many([hash], threshold)[0]
 
-        matches = []
-        for id, _, distance in results[hash]:
-            matches.append(
+    def query_many(
+        self, hashes: t.Sequence[str], threshold: t.Optional[int] = None
+    ) -> t.List[t.List[PDQIndexMatch[IndexT]]]:
+        """
+        Look up many entries against the index with a single faiss search.
+        """
+        if not hashes:
+            return []
+        if threshold is None:
+            threshold = self.get_match_threshold()
+        results = self.index.search_with_distance_in_result(hashes, threshold)
+        return [
+            [
                 IndexMatchUntyped(
-                    SignalSimilarityInfoWithIntDistance(int(distance)),
-                    self.local_id_to_entry[id][1],
+                    SignalSimilarityInfoWithIntDistance(int(distance)), entry
                 )
-            )
-        return matches
+                for id, _, distance in results[hash]
+                for entry in self._entries.get(id)
+            ]
+            for hash in hashes
+        ]
+
+    def query_topk(
+        self, hash: str, k: int, max_distance: t.Optional[int] = None
+    ) -> t.List[PDQIndexMatch[IndexT]]:
+        """
+        Look up the k closest entries to the hash, closest first.
+
+        Only entries within max_distance (default: the match threshold) are
+        returned, but unlike query(), there are never more than k of them.
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+        if max_distance is None:
+            max_distance = self.get_match_threshold()
+        results = self.index.search_topk([hash], k, max_distance)[0]
+        return [
+            IndexMatchUntyped(SignalSimilarityInfoWithIntDistance(distance), entry)
+            for id, distance in results
+            for entry in self._entries.get(id)
+        ]
 
     def add(self, signal_str: str, entry: IndexT) -> None:
         self.add_all(((signal_str, entry),))
 
     def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
-        start = len(self.local_id_to_entry)
-        self.local_id_to_entry.extend(entries)
-        if start != len(self.local_id_to_entry):
+        it = iter(entries)
+        while True:
+            batch = list(itertools.islice(it, _ADD_BATCH_SIZE))
+            if not batch:
+                return
+            start = len(self._entries)
+            ids = range(start, start + len(batch))
             # This function signature is very silly
-            self.index.add(
-                (e[0] for e in self.local_id_to_entry[start:]),
-                range(start, len(self.local_id_to_entry)),
+            self.index.add((h for h, _ in batch), ids)
+            self._entries.extend(ids, [entry for _, entry in batch])
+
+    def __setstate__(self, state: t.Dict[str, t.Any]) -> None:
+        if "local_id_to_entry" in state:
+            # Pickled before entries were stored in IndexEntries
+            state["_entries"] = IndexEntries.from_groups(
+                [entry] for _, entry in state.pop("local_id_to_entry")
             )
+        self.__dict__.update(state)
 
 
 class PDQFlatIndex(PDQIndex):
@@ -4,10 +4,10 @@
 Implementation of SignalTypeIndex abstraction for PDQ
 """
 
+import itertools
 import typing as t
 import faiss
 import numpy as np
-import weakref
 
 
 from threatexchange.signal_type.index import (
@@ -16,14 +16,24 @@ from threatexchange.signal_type.index import (
     SignalTypeIndex,
     T as IndexT,
 )
+from threatexchange.signal_type.faiss_binary import (
+    FaissBinaryIndex,
+    FaissIndex,
+    FaissMultiHashIndex,
+    IndexEntries,
+)
 from threatexchange.signal_type.pdq.pdq_utils import (
     BITS_IN_PDQ,
+    BYTES_IN_PDQ,
     PDQ_CONFIDENT_MATCH_THRESHOLD,
-    convert_pdq_strings_to_ndarray,
+    convert_pdq_strings_to_packed_ndarray,
 )
 
 PDQIndexMatch = IndexMatchUntyped[SignalSimilarityInfoWithIntDistance, IndexT]
 
+# How many entries add_all() converts and adds to faiss at once
+_ADD_BATCH_SIZE = 65536
+
 
 class PDQIndex2(SignalTypeIndex[IndexT]):
     """
@@ -32,11 +42,21 @@ class PDQIndex2(SignalTypeIndex[IndexT]):
     This is a redo of the existing PDQ index,
     designed to be simpler and fix hard-to-squash bugs in the existing implementation.
     Purpose of this class: to replace the original index in pytx 2.0
+
+    By default hashes are unpacked into 256 float dimensions and searched with
+    an L2 index. Passing a faiss binary index (i.e. faiss.IndexBinaryFlat(256))
+    instead stores each hash as 32 packed bytes and searches by hamming
+    distance directly, which is ~32x smaller and faster to scan. A
+    faiss.IndexBinaryMultiHash uses multi-index hashing, which is exact up
+    to the search threshold, like PDQIndex.
+
+    Entries are stored in IndexEntries, which keeps int entries (i.e. HMA
+    bank content ids) in flat arrays rather than as python objects.
     """
 
     def __init__(
         self,
-        index: t.Optional[faiss.Index] = None,
+        index: t.Union[faiss.Index, faiss.IndexBinary, None] = None,
         entries: t.Iterable[t.Tuple[str, IndexT]] = (),
         *,
         threshold: int = PDQ_CONFIDENT_MATCH_THRESHOLD,
@@ -46,114 +66,157 @@ class PDQIndex2(SignalTypeIndex[IndexT]):
 
         if index is None:
             index = faiss.IndexFlatL2(BITS_IN_PDQ)
-        self._index = _PDQFaissIndex(index)
+        self._index = self._wrap_faiss_index(index)
 
-        # Matches hash to Faiss index
-        self._deduper: t.Dict[str, int] = {}
-        # Entry mapping: Each list[entries]'s index is its hash's index
-        self._idx_to_entries: t.List[t.List[IndexT]] = []
+        # Matches packed hash bytes to Faiss index
+        self._deduper: t.Dict[bytes, int] = {}
+        # Entry mapping: the entries for each hash, by its Faiss index
+        self._entries: IndexEntries[IndexT] = IndexEntries()
 
         self.add_all(entries=entries)
 
     def __len__(self) -> int:
-        return len(self._idx_to_entries)
+        return len(self._entries)
 
-    def query(self, hash: str) -> t.Sequence[PDQIndexMatch[IndexT]]:
+    @staticmethod
+    def _wrap_faiss_index(
+        index: t.Union[faiss.Index, faiss.IndexBinary],
+    ) -> "_PDQFaissIndex":
+        if isinstance(index, faiss.IndexBinaryMultiHash):
+            return _PDQFaissMultiHashIndex(index)
+        if isinstance(index, faiss.IndexBinary):
+            return _PDQFaissBinaryIndex(index)
+        return _PDQFaissIndex(index)
+
+    def query(
+        self, hash: str, threshold: t.Optional[int] = None
+    ) -> t.Sequence[PDQIndexMatch[IndexT]]:
         """
         Look up entries against the index, up to the threshold.
+
+        threshold overrides self.threshold for just this query.
         """
-        results: t.List[PDQIndexMatch[IndexT]] = []
-        matches_list: t.List[t.Tuple[int, int]] = self._index.search(
-            queries=[hash], threshold=self.threshold
-        )
+        return self.query_many([hash], threshold)[0]
 
-        for match, distance in matches_list:
-            entries = self._idx_to_entries[match]
-            # Create match objects for each entry
-            results.extend(
-                PDQIndexMatch(
-                    SignalSimilarityInfoWithIntDistance(distance=distance),
-                    entry,
+    def query_many(
+        self, hashes: t.Sequence[str], threshold: t.Optional[int] = None
+    ) -> t.List[t.List[PDQIndexMatch[IndexT]]]:
+        """
+        Look up many entries against the index with a single faiss search.
+        """
+        if not hashes:
+            return []
+        if threshold is None:
+            threshold = self.threshold
+        matches_per_query = self._search(hashes, threshold)
+
+        ret: t.List[t.List[PDQIndexMatch[IndexT]]] = []
+        for matches_list in matches_per_query:
+            results: t.List[PDQIndexMatch[IndexT]] = []
+            for match, distance in matches_list:
+                entries = self._entries.get(match)
+                # Create match objects for each entry
+                results.extend(
+                    PDQIndexMatch(
+                        SignalSimilarityInfoWithIntDistance(distance=distance),
+                        entry,
+                    )
+                    for entry in entries
                 )
-                for entry in entries
-            )
+            ret.append(results)
+        return ret
+
+    def query_topk(
+        self, hash: str, k: int, max_distance: t.Optional[int] = None
+    ) -> t.List[PDQIndexMatch[IndexT]]:
+        """
+        Look up the k closest entries to the hash, closest first.
+
+        Only entries within max_distance (default: the threshold) are
+        returned, but unlike query(), there are never more than k of them.
+        """
+        if k < 1:
+            raise ValueError("k must be positive")
+        if max_distance is None:
+            max_distance = self.threshold
+        # Every faiss id has at least one entry, so k ids is always enough
+        matches_list = self._search_topk([hash], k, max_distance)[0]
+        results: t.List[PDQIndexMatch[IndexT]] = []
+        for match, distance in matches_list:
+            similarity = SignalSimilarityInfoWithIntDistance(distance=distance)
+            for entry in self._entries.get(match):
+                if len(results) == k:
+                    return results
+                results.append(PDQIndexMatch(similarity, entry))
         return results
 
+    def _search(
+        self, hashes: t.Sequence[str], threshold: int
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        """(faiss id, distance) for every hash within the threshold of each query"""
+        return self._index.search(queries=hashes, threshold=threshold)
+
+    def _search_topk(
+        self, hashes: t.Sequence[str], k: int, threshold: int
+    ) -> t.List[t.List[t.Tuple[int, int]]]:
+        """(faiss id, distance) for the k closest hashes to each query"""
+        return self._index.search_topk(hashes, k, threshold)
+
     def add(self, signal_str: str, entry: IndexT) -> None:
         self.add_all(((signal_str, entry),))
 
     def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
-        for h, i in entries:
-            existing_faiss_id = self._deduper.get(h)
-            if existing_faiss_id is None:
-                self._index.add([h])
-                self._idx_to_entries.append([i])
-                next_id = len(self._deduper)  # Because faiss index starts from 0 up
-                self._deduper[h] = next_id
-            else:
-                # Since this already exists, we don't add it to Faiss because Faiss cannot handle duplication
-                self._idx_to_entries[existing_faiss_id].append(i)
-
-
-class _PDQFaissIndex:
+        it = iter(entries)
+        while True:
+            batch = list(itertools.islice(it, _ADD_BATCH_SIZE))
+            if not batch:
+                return
+            packed = convert_pdq_strings_to_packed_ndarray([h for h, _ in batch])
+            raw = packed.tobytes()
+            ids: t.List[int] = []
+            new_rows: t.List[int] = []
+            for row in range(len(batch)):
+                key = raw[row * BYTES_IN_PDQ : (row + 1) * BYTES_IN_PDQ]
+                faiss_id = self._deduper.get(key)
+                if faiss_id is None:
+                    # Because faiss index starts from 0 up
+                    faiss_id = len(self._deduper)
+                    self._deduper[key] = faiss_id
+                    new_rows.append(row)
+                # Duplicates aren't added to Faiss because Faiss cannot handle duplication
+                ids.append(faiss_id)
+            if new_rows:
+                self._index.add_packed(packed[new_rows])
+            self._entries.extend(ids, [entry for _, entry in batch])
+
+    def __setstate__(self, state: t.Dict[str, t.Any]) -> None:
+        if "_idx_to_entries" in state:
+            # Pickled before entries were stored in IndexEntries
+            state["_entries"] = IndexEntries.from_groups(state.pop("_idx_to_entries"))
+            state["_deduper"] = {
+                bytes.fromhex(h): i for h, i in state["_deduper"].items()
+            }
+        self.__dict__.update(state)
+
+
+class _PDQFaissIndex(FaissIndex):
     """
     A wrapper around the faiss index for pickle serialization
     """
 
-    def __init__(self, faiss_index: faiss.Index) -> None:
-        self.faiss_index = faiss_index
-        self._finalizer = weakref.finalize(
-            self, _PDQFaissIndex._finalize_faiss, self.faiss_index
-        )
+    def _to_packed(self, pdq_strings: t.Sequence[str]) -> np.ndarray:
+        return convert_pdq_strings_to_packed_ndarray(pdq_strings)
 
-    def add(self, pdq_strings: t.Sequence[str]) -> None:
-        """
-        Add PDQ hashes to the FAISS index.
-        """
-        vectors = convert_pdq_strings_to_ndarray(pdq_strings)
-        self.faiss_index.add(vectors)
-
-    def search(
-        self, queries: t.Sequence[str], threshold: int
-    ) -> t.List[t.Tuple[int, int]]:
-        """
-        Search the FAISS index for matches to the given PDQ queries.
-        """
-        query_array: np.ndarray = convert_pdq_strings_to_ndarray(queries)
-        limits, distances, indices = self.faiss_index.range_search(
-            query_array, threshold + 1
-        )
-
-        results: t.List[t.Tuple[int, int]] = []
-        for i in range(len(queries)):
-            matches = [idx.item() for idx in indices[limits[i] : limits[i + 1]]]
-            dists = [dist for dist in distances[limits[i] : limits[i + 1]]]
-            for j in range(len(matches)):
-                results.append((matches[j], dists[j]))
-        return results
 
-    def __getstate__(self):
-        return faiss.serialize_index(self.faiss_index)
+class _PDQFaissBinaryIndex(_PDQFaissIndex, FaissBinaryIndex):
+    """
+    A wrapper around a faiss binary index for pickle serialization
 
-    def __setstate__(self, data):
-        self.faiss_index = faiss.deserialize_index(data)
-        self._finalizer = weakref.finalize(
-            self, _PDQFaissIndex._finalize_faiss, self.faiss_index
-        )
+    Hashes are stored packed (32 bytes each) and compared by hamming distance.
+    """
 
-    def dispose(self) -> None:
-        try:
-            reset_fn = getattr(self.faiss_index, "reset", None)
-            if callable(reset_fn):
-                reset_fn()
-        except Exception:
-            pass
 
-    @staticmethod
-    def _finalize_faiss(faiss_index: faiss.Index) -> None:
-        try:
-            reset_fn = getattr(faiss_index, "reset", None)
-            if callable(reset_fn):
-                reset_fn()
-        except Exception:
-            pass
+class _PDQFaissMultiHashIndex(_PDQFaissIndex, FaissMultiHashIndex):
+    """
+    A wrapper around a faiss.IndexBinaryMultiHash for pickle serialization
+    """
@@ -0,0 +1,376 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+A PDQ index with an on-disk layout that can be memory mapped.
+
+Pickling an index (SignalTypeIndex.serialize) means loading it needs about
+2x the index size in memory, and a full copy. Instead, this index writes its
+data as separate aligned sections that can be used directly from a mmap:
+
+    header (128 bytes, little endian)
+        magic           8s   b"TXPDQIDX"
+        version         u32
+        flags           u32  FLAG_INT_ENTRIES if entries are int64 values
+        threshold       u32
+        <reserved>      u32
+        num_hashes      u64
+        num_entries     u64
+        3x section      (offset u64, length u64)
+    hashes section          (num_hashes, 32) uint8 - packed unique hashes
+    entry offsets section   (num_hashes + 1,) int64 - CSR offsets into entries
+    entries section         (num_entries,) int64 ids, or a pickled list of
+                            entries if they are not all ints
+
+Every section starts on a SECTION_ALIGNMENT byte boundary. Searches run
+against the mapped hash matrix with faiss's hamming range search, so loading
+is constant time and several processes can share the same pages. Adding to
+a loaded index copies the sections into memory first.
+"""
+
+import mmap
+import pickle
+import struct
+import typing as t
+
+import faiss
+import numpy as np
+
+from threatexchange.signal_type.index import (
+    IndexMatchUntyped,
+    SignalSimilarityInfoWithIntDistance,
+    SignalTypeIndex,
+    T as IndexT,
+)
+from threatexchange.signal_type.faiss_binary import is_int64
+from threatexchange.signal_type.pdq.pdq_index2 import PDQIndex2
+from threatexchange.signal_type.pdq.pdq_utils import (
+    BYTES_IN_PDQ,
+    PDQ_CONFIDENT_MATCH_THRESHOLD,
+    PDQHashLike,
+    convert_pdq_strings_to_packed_ndarray,
+)
+
+PDQIndexMatch = IndexMatchUntyped[SignalSimilarityInfoWithIntDistance, IndexT]
+
+Self = t.TypeVar("Self", bound="PDQMmapIndex")
+
+MAGIC = b"TXPDQIDX"
+VERSION = 1
+FLAG_INT_ENTRIES = 1
+SECTION_ALIGNMENT = 64
+
+_HEADER = struct.Struct("<8sIIIIQQ6Q")
+_HEADER_SIZE = 128
+
+
+class PDQMmapIndex(SignalTypeIndex[IndexT]):
+    """
+    PDQ index which deserializes by mapping its file into memory.
+
+    Build it from entries (or convert an existing PDQIndex2 with
+    from_pdq_index2), serialize() it to a file, and deserialize() that file
+    to get an index backed by the page cache instead of a private copy.
+
+    It is meant to be built once and then loaded many times. add() and
+    add_all() work, but rebuild every array (and drop the mapping), so
+    batch additions into a single add_all().
+
+    Entries that are all ints (i.e. bank content ids) are stored as an array
+    and also mapped. Any other metadata is pickled into the entries section,
+    and so is copied into memory on load.
+    """
+
+    def __init__(
+        self,
+        hashes: t.Optional[np.ndarray] = None,
+        entry_offsets: t.Optional[np.ndarray] = None,
+        entries: t.Union[np.ndarray, t.List[IndexT], None] = None,
+        *,
+        threshold: int = PDQ_CONFIDENT_MATCH_THRESHOLD,
+    ) -> None:
+        super().__init__()
+        self.threshold = threshold
+        self._hashes: np.ndarray = (
+            np.empty((0, BYTES_IN_PDQ), dtype=np.uint8) if hashes is None else hashes
+        )
+        self._entry_offsets: np.ndarray = (
+            np.zeros(1, dtype=np.int64) if entry_offsets is None else entry_offsets
+        )
+        self._entries: t.Union[np.ndarray, t.List[IndexT]] = (
+            [] if entries is None else entries
+        )
+        self._mmap: t.Optional[mmap.mmap] = None
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    @classmethod
+    def build(
+        cls: t.Type[Self],
+        entries: t.Iterable[t.Tuple[str, IndexT]],
+        *,
+        threshold: int = PDQ_CONFIDENT_MATCH_THRESHOLD,
+    ) -> Self:
+        grouped: t.Dict[str, t.List[IndexT]] = {}
+        for h, entry in entries:
+            grouped.setdefault(h, []).append(entry)
+        return cls._from_grouped(grouped, grouped.values(), threshold)
+
+    @classmethod
+    def from_pdq_index2(cls: t.Type[Self], index: PDQIndex2[IndexT]) -> Self:
+        """Convert a PDQIndex2, keeping its threshold"""
+        # _deduper is in faiss id order, same as _entries
+        if not index._entries.is_int():
+            return cls._from_grouped(
+                index._deduper, index._entries.groups(), index.threshold
+            )
+        offsets, values = index._entries.as_arrays()
+        return cls(
+            convert_pdq_strings_to_packed_ndarray(index._deduper),
+            offsets.copy(),
+            values.copy(),
+            threshold=index.threshold,
+        )
+
+    @classmethod
+    def _from_grouped(
+        cls: t.Type[Self],
+        hashes: t.Iterable[PDQHashLike],
+        entries_per_hash: t.Collection[t.List[IndexT]],
+        threshold: int,
+    ) -> Self:
+        lengths = [len(es) for es in entries_per_hash]
+        offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        flat = [e for es in entries_per_hash for e in es]
+        entries: t.Union[np.ndarray, t.List[IndexT]] = flat
+        if all(is_int64(e) for e in flat):
+            entries = np.array(flat, dtype=np.int64)
+        return cls(
+            convert_pdq_strings_to_packed_ndarray(hashes),
+            offsets,
+            entries,
+            threshold=threshold,
+        )
+
+    def add(self, signal_str: str, entry: IndexT) -> None:
+        self.add_all(((signal_str, entry),))
+
+    def add_all(self, entries: t.Iterable[t.Tuple[str, IndexT]]) -> None:
+        new_entries = [(h.lower(), entry) for h, entry in entries]
+        if not new_entries:
+            return
+        offsets = self._entry_offsets.tolist()
+        grouped: t.Dict[str, t.List[IndexT]] = {}
+        for i, packed in enumerate(self._hashes):
+            existing = self._entries[offsets[i] : offsets[i + 1]]
+            if isinstance(existing, np.ndarray):
+                existing = existing.tolist()
+            grouped[packed.tobytes().hex()] = list(existing)
+        for h, entry in new_entries:
+            grouped.setdefault(h, []).append(entry)
+        # Raises on invalid hashes before anything is replaced
+        rebuilt = self._from_grouped(grouped, grouped.values(), self.threshold)
+        mm = self._mmap
+        self._hashes = rebuilt._hashes
+        self._entry_offsets = rebuilt._entry_offsets
+        self._entries = rebuilt._entries
+        self._mmap = None
+        _close_mmap(mm)
+
+    def query(
+        self, hash: str, threshold: t.Optional[int] = None
+    ) -> t.Sequence[PDQIndexMatch[IndexT]]:
+        """
+        Look up entries against the index, up to the threshold.
+
+        threshold overrides the one the index was built with for just this
+        query.
+        """
+        return self.query_many([hash], threshold)[0]
+
+    def query_many(
+        self, hashes: t.Sequence[str], threshold: t.Optional[int] = None
+    ) -> t.List[t.List[PDQIndexMatch[IndexT]]]:
+        queries = convert_pdq_strings_to_packed_ndarray(hashes)
+        if not len(self._hashes):
+            return [[] for _ in hashes]
+        if threshold is None:
+            threshold = self.threshold
+        limits, distances, ids = _hamming_range_search(
+            queries, self._hashes, threshold + 1
+        )
+        offsets = self._entry_offsets
+        ret: t.List[t.List[PDQIndexMatch[IndexT]]] = []
+        for i in range(len(hashes)):
+            results: t.List[PDQIndexMatch[IndexT]] = []
+            for idx, distance in zip(
+                ids[limits[i] : limits[i + 1]].tolist(),
+                distances[limits[i] : limits[i + 1]].tolist(),
+            ):
+                similarity = SignalSimilarityInfoWithIntDistance(distance)
+                entries = self._entries[offsets[idx] : offsets[idx + 1]]
+                if isinstance(entries, np.ndarray):
+                    entries = entries.tolist()
+                results.extend(PDQIndexMatch(similarity, e) for e in entries)
+            ret.append(results)
+        return ret
+
+    def serialize(self, fout: t.BinaryIO) -> None:
+        flags = 0
+        if isinstance(self._entries, np.ndarray):
+            flags |= FLAG_INT_ENTRIES
+            entries_bytes: t.Union[bytes, memoryview] = _as_bytes(self._entries, "<i8")
+        else:
+            entries_bytes = pickle.dumps(
+                list(self._entries), protocol=pickle.HIGHEST_PROTOCOL
+            )
+        sections = [
+            _as_bytes(self._hashes, np.uint8),
+            _as_bytes(self._entry_offsets, "<i8"),
+            entries_bytes,
+        ]
+        table: t.List[int] = []
+        offset = _HEADER_SIZE
+        for section in sections:
+            table.extend((offset, len(section)))
+            offset = _align(offset + len(section))
+        header = _HEADER.pack(
+            MAGIC,
+            VERSION,
+            flags,
+            self.threshold,
+            0,
+            len(self._hashes),
+            len(self._entries),
+            *table,
+        )
+        fout.write(header.ljust(_HEADER_SIZE, b"\0"))
+        written = _HEADER_SIZE
+        for section, section_offset in zip(sections, table[::2]):
+            fout.write(b"\0" * (section_offset - written))
+            fout.write(section)
+            written = section_offset + len(section)
+
+    @classmethod
+    def deserialize(cls: t.Type[Self], fin: t.BinaryIO) -> Self:
+        """
+        Load an index written by serialize().
+
+        If fin is a real file, it is memory mapped rather than read, and the
+        file object can be closed afterwards.
+        """
+        try:
+            fileno = fin.fileno()
+        except (AttributeError, OSError):
+            # i.e. io.BytesIO - fall back to a single in-memory copy
+            return cls._from_buffer(fin.read(), 0)
+        base = fin.tell()
+        mm = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+        ret = cls._from_buffer(mm, base)
+        ret._mmap = mm
+        return ret
+
+    @classmethod
+    def _from_buffer(
+        cls: t.Type[Self], buf: t.Union[bytes, mmap.mmap], base: int
+    ) -> Self:
+        if len(buf) - base < _HEADER_SIZE:
+            raise ValueError("truncated PDQ index file")
+        (
+            magic,
+            version,
+            flags,
+            threshold,
+            _reserved,
+            num_hashes,
+            num_entries,
+            *table,
+        ) = _HEADER.unpack_from(buf, base)
+        if magic != MAGIC:
+            raise ValueError("not a PDQ index file")
+        if version != VERSION:
+            raise ValueError(f"unsupported PDQ index file version {version}")
+        hashes_off, hashes_len, offsets_off, offsets_len, entries_off, entries_len = (
+            table
+        )
+        if base + entries_off + entries_len > len(buf):
+            raise ValueError("truncated PDQ index file")
+        hashes = np.frombuffer(
+            buf, dtype=np.uint8, count=hashes_len, offset=base + hashes_off
+        ).reshape(num_hashes, BYTES_IN_PDQ)
+        entry_offsets = np.frombuffer(
+            buf, dtype="<i8", count=num_hashes + 1, offset=base + offsets_off
+        )
+        entries: t.Union[np.ndarray, t.List[t.Any]]
+        if flags & FLAG_INT_ENTRIES:
+            entries = np.frombuffer(
+                buf, dtype="<i8", count=num_entries, offset=base + entries_off
+            )
+        else:
+            entries = pickle.loads(
+                memoryview(buf)[base + entries_off : base + entries_off + entries_len]
+            )
+        return cls(hashes, entry_offsets, entries, threshold=threshold)
+
+    def dispose(self) -> None:
+        mm = self._mmap
+        self._hashes = np.empty((0, BYTES_IN_PDQ), dtype=np.uint8)
+        self._entry_offsets = np.zeros(1, dtype=np.int64)
+        self._entries = []
+        self._mmap = None
+        _close_mmap(mm)
+
+    def __getstate__(self):
+        # Pickle as plain arrays rather than the mmap
+        state = self.__dict__.copy()
+        state["_hashes"] = np.array(self._hashes)
+        state["_entry_offsets"] = np.array(self._entry_offsets)
+        if isinstance(self._entries, np.ndarray):
+            state["_entries"] = np.array(self._entries)
+        state["_mmap"] = None
+        return state
+
+
+def _close_mmap(mm: t.Optional[mmap.mmap]) -> None:
+    if mm is not None:
+        try:
+            mm.close()
+        except BufferError:
+            pass  # Arrays still exported elsewhere, closed on GC instead
+
+
+def _as_bytes(arr: np.ndarray, dtype: t.Any) -> memoryview:
+    return np.ascontiguousarray(arr, dtype=dtype).reshape(-1).view(np.uint8).data
+
+
+def _align(offset: int) -> int:
+    return -(-offset // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+
+def _hamming_range_search(
+    queries: np.ndarray, database: np.ndarray, radius: int
+) -> t.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The same as IndexBinaryFlat.range_search, but over an array we don't own.
+
+    Returns (limits, distances, ids), where the matches for query i are
+    [limits[i]:limits[i + 1]] and have distance < radius.
+    """
+    queries = np.ascontiguousarray(queries)
+    n = len(queries)
+    res = faiss.RangeSearchResult(n)
+    faiss.hamming_range_search(  # type: ignore[attr-defined]
+        faiss.swig_ptr(queries),
+        faiss.swig_ptr(database),
+        n,
+        len(database),
+        radius,
+        BYTES_IN_PDQ,
+        res,
+    )
+    limits = faiss.rev_swig_ptr(res.lims, n + 1).copy()
+    nd = int(limits[-1])
+    distances = faiss.rev_swig_ptr(res.distances, nd).astype(np.int32)
+    ids = faiss.rev_swig_ptr(res.labels, nd).copy()
+    return limits, distances, ids
@@ -1,14 +1,19 @@
 #!/usr/bin/env python
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import binascii
 import numpy as np
 import typing as t
 
 BITS_IN_PDQ = 256
+BYTES_IN_PDQ = BITS_IN_PDQ // 8
 PDQ_HEX_STR_LEN = int(BITS_IN_PDQ / 4)
 # Hashes of distance less than or equal to this threshold are considered a 'match'
 PDQ_CONFIDENT_MATCH_THRESHOLD = 31
 
+# A PDQ hash as a hex str, hex ascii bytes, or 32 raw bytes
+PDQHashLike = t.Union[str, bytes]
+
 
 def simple_distance_binary(bin_a: str, bin_b: str) -> int:
     """
@@ -56,16 +61,85 @@ def pdq_match(pdq_hex_a: str, pdq_hex_b: str, threshold: int) -> bool:
     return distance <= threshold
 
 
-def convert_pdq_strings_to_ndarray(pdq_strings: t.Iterable[str]) -> np.ndarray:
+def convert_pdq_strings_to_ndarray(
+    pdq_strings: t.Iterable[PDQHashLike],
+) -> np.ndarray:
     """
-    Convert multiple PDQ hash strings to a numpy array.
+    Convert multiple PDQ hash strings to a (n, 256) numpy array of bits.
     """
-    binary_arrays = []
-    for pdq_str in pdq_strings:
-        if len(pdq_str) != PDQ_HEX_STR_LEN:
+    return np.unpackbits(convert_pdq_strings_to_packed_ndarray(pdq_strings), axis=1)
+
+
+def convert_pdq_strings_to_packed_ndarray(
+    pdq_strings: t.Iterable[PDQHashLike],
+) -> np.ndarray:
+    """
+    Convert multiple PDQ hashes to a contiguous (n, 32) numpy array of packed bytes.
+
+    This is the layout faiss binary indices (IndexBinary*) expect. Hashes may
+    be 64 character hex strings (as str or ascii bytes) or raw 32 byte
+    buffers. The common case of all str hashes is validated and decoded with
+    a single bytes.fromhex call for the whole batch.
+    """
+    if isinstance(pdq_strings, np.ndarray):
+        if pdq_strings.dtype != np.uint8 or pdq_strings.shape[-1:] != (BYTES_IN_PDQ,):
+            raise ValueError("PDQ hash array must be uint8 of shape (n, 32)")
+        return np.ascontiguousarray(pdq_strings.reshape(-1, BYTES_IN_PDQ))
+    hashes = (
+        pdq_strings if isinstance(pdq_strings, (list, tuple)) else list(pdq_strings)
+    )
+    try:
+        hex_str = "".join(hashes)  # type: ignore[arg-type]
+    except TypeError:  # Not all str
+        raw = b"".join(_pdq_hash_to_bytes(h) for h in hashes)
+    else:
+        if any(len(h) != PDQ_HEX_STR_LEN for h in hashes):
+            raise ValueError("PDQ hash string must be 64 hex characters long")
+        try:
+            raw = bytes.fromhex(hex_str)
+        except ValueError:
             raise ValueError("PDQ hash string must be 64 hex characters long")
-        hash_bytes = bytes.fromhex(pdq_str)
-        binary_array = np.unpackbits(np.frombuffer(hash_bytes, dtype=np.uint8))
-        binary_arrays.append(binary_array)
+        # fromhex() skips whitespace, which would otherwise go unnoticed
+        if len(raw) != len(hashes) * BYTES_IN_PDQ:
+            raise ValueError("PDQ hash string must be 64 hex characters long")
+    return np.frombuffer(raw, dtype=np.uint8).reshape(-1, BYTES_IN_PDQ)
+
 
-    return np.array(binary_arrays, dtype=np.uint8)
+def _pdq_hash_to_bytes(pdq_hash: PDQHashLike) -> bytes:
+    if len(pdq_hash) == BYTES_IN_PDQ and not isinstance(pdq_hash, str):
+        return bytes(pdq_hash)
+    if len(pdq_hash) != PDQ_HEX_STR_LEN:
+        raise ValueError("PDQ hash string must be 64 hex characters long")
+    try:
+        ret = binascii.unhexlify(pdq_hash)
+    except (binascii.Error, ValueError):
+        raise ValueError("PDQ hash string must be 64 hex characters long")
+    return ret
+
+
+# Bits set in each byte value, for numpy without bitwise_count (< 2.0)
+_POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(
+    axis=1, dtype=np.uint8
+)
+
+
+def pdq_distance_matrix(packed_a: np.ndarray, packed_b: np.ndarray) -> np.ndarray:
+    """
+    The hamming distance between every pair of hashes from two packed arrays.
+
+    Args:
+        packed_a, packed_b: (n, 32) and (m, 32) uint8 arrays, i.e. from
+          convert_pdq_strings_to_packed_ndarray()
+
+    Returns:
+        (n, m) array, where [i, j] is the distance from packed_a[i] to
+        packed_b[j]. This takes n * m * 32 bytes of temporary memory, so
+        split up large inputs.
+    """
+    # XOR 64 bits at a time
+    a = np.ascontiguousarray(packed_a).view(np.uint64)
+    b = np.ascontiguousarray(packed_b).view(np.uint64)
+    xored = a[:, None, :] ^ b[None, :, :]
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(xored).sum(axis=2, dtype=np.uint16)
+    return _POPCOUNT_TABLE[xored.view(np.uint8)].sum(axis=2, dtype=np.uint16)
@@ -4,12 +4,15 @@
 Wrapper around the Photo PDQ signal type.
 """
 
+import io
 import typing as t
 import re
 import random
 
-from threatexchange.signal_type.pdq.pdq_hasher import pdq_from_bytes
-from threatexchange.content_type.content_base import ContentType
+from PIL import Image
+
+from threatexchange.signal_type.pdq.pdq_hasher import pdq_from_bytes, pdq_from_image
+from threatexchange.content_type.content_base import ContentType, RotationType
 from threatexchange.content_type.photo import PhotoContent
 from threatexchange.signal_type import signal_base
 from threatexchange.signal_type.pdq.pdq_utils import (
@@ -19,7 +22,7 @@ from threatexchange.signal_type.pdq.pdq_utils import (
 from threatexchange.exchanges.impl.fb_threatexchange_signal import (
     HasFbThreatExchangeIndicatorType,
 )
-from threatexchange.signal_type.pdq.pdq_index import PDQIndex
+from threatexchange.signal_type.pdq.pdq_adaptive_index import PDQAdaptiveIndex
 
 
 class PdqSignal(
@@ -53,8 +56,8 @@ class PdqSignal(
         return [PhotoContent]
 
     @classmethod
-    def get_index_cls(cls) -> t.Type[PDQIndex]:
-        return PDQIndex
+    def get_index_cls(cls) -> t.Type[PDQAdaptiveIndex]:
+        return PDQAdaptiveIndex
 
     @classmethod
     def validate_signal_str(cls, signal_str: str) -> str:
@@ -82,6 +85,26 @@ class PdqSignal(
             return ""
         return pdq_hash
 
+    @classmethod
+    def hash_all_rotations_from_bytes(cls, bytes_: bytes) -> t.Dict[RotationType, str]:
+        """
+        Hash all 8 simple rotations of an image, decoding it only once.
+
+        Gives the same hashes as hashing each of
+        PhotoContent.all_simple_rotations() (exactly for lossless formats),
+        without re-encoding every variant. As with hash_from_bytes(),
+        low quality variants hash to empty string.
+        """
+        with Image.open(io.BytesIO(bytes_)) as image:
+            rotations = PhotoContent.all_simple_rotations_of_image(image)
+            ret = {}
+            for rotation_type, rotated in rotations.items():
+                pdq_hash, quality = pdq_from_image(rotated)
+                ret[rotation_type] = (
+                    pdq_hash if quality >= cls.QUALITY_THRESHOLD else ""
+                )
+            return ret
+
     @classmethod
     def get_random_signal(cls) -> str:
         # Generate a random hexadecimal string of length 64
@@ -5,7 +5,10 @@
 Wrapper around the raw text signal type.
 """
 
+import bisect
+from collections import Counter
 from dataclasses import dataclass
+import math
 import typing as t
 
 from weighted_levenshtein import lev
@@ -72,10 +75,19 @@ class RawTextSignal(
     def matches_str(
         cls, signal: str, haystack: str, pct_diff_threshold: float = 5.0
     ) -> signal_base.SignalComparisonResult:
+        return cls.matches_normalized_str(
+            common.normalize_string(signal),
+            common.normalize_string(haystack),
+            pct_diff_threshold,
+        )
+
+    @classmethod
+    def matches_normalized_str(
+        cls, a: str, b: str, pct_diff_threshold: float = 5.0
+    ) -> signal_base.SignalComparisonResult:
+        """matches_str(), for strings already through common.normalize_string()"""
         assert 0 < pct_diff_threshold <= 100
-        a = common.normalize_string(signal)
-        b = common.normalize_string(haystack)
-        max_match_distance = len(a) - len(a) * (100 - pct_diff_threshold) / 100
+        max_match_distance = cls.max_match_distance(len(a), pct_diff_threshold)
 
         ldiff = abs(len(a) - len(b))
 
@@ -91,9 +103,14 @@ class RawTextSignal(
             RawTextDistance.from_levenshtein(a, distance),
         )
 
+    @staticmethod
+    def max_match_distance(signal_len: int, pct_diff_threshold: float) -> float:
+        """The furthest a normalized signal of this length can be from a match"""
+        return signal_len - signal_len * (100 - pct_diff_threshold) / 100
+
     @classmethod
     def get_index_cls(cls) -> t.Type[index.SignalTypeIndex]:
-        return LevenshteinLinearSearch
+        return RawTextIndex
 
     @staticmethod
     def get_examples() -> t.List[str]:
@@ -111,6 +128,119 @@ class RawTextSignal(
         ]
 
 
+class RawTextIndex(index.SignalTypeIndex[index.T]):
+    """
+    Index for RawTextSignal, with the same matches as matches_str().
+
+    Signals are normalized once when added, and grouped by their normalized
+    length, so only the lengths close enough to the query's are searched.
+    Within those, a q-gram count filter prunes most candidates before
+    computing their Levenshtein distance: strings within k edits of each
+    other share at least max(len) - Q + 1 - k * Q of their Q-grams.
+    """
+
+    Q = 3
+
+    def __init__(self, *, pct_diff_threshold: float = 5.0) -> None:
+        assert 0 < pct_diff_threshold <= 100
+        self.pct_diff_threshold = pct_diff_threshold
+        # Normalized signals by id, and the reverse
+        self._texts: t.List[str] = []
+        self._deduper: t.Dict[str, int] = {}
+        self._entries: t.List[t.List[index.T]] = []
+        # Ids of each normalized length, and the lengths in order
+        self._ids_by_length: t.Dict[int, t.List[int]] = {}
+        self._lengths: t.List[int] = []
+        # By length, then q-gram: (id, count of the q-gram in the text)
+        self._postings: t.Dict[int, t.Dict[str, t.List[t.Tuple[int, int]]]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries)
+
+    @classmethod
+    def _qgrams(cls, text: str) -> t.Counter[str]:
+        return Counter(text[i : i + cls.Q] for i in range(len(text) - cls.Q + 1))
+
+    def _min_shared_qgrams(self, signal_len: int, query_len: int) -> int:
+        max_distance = math.floor(
+            RawTextSignal.max_match_distance(signal_len, self.pct_diff_threshold)
+        )
+        return max(signal_len, query_len) - self.Q + 1 - max_distance * self.Q
+
+    def _candidate_lengths(self, query_len: int) -> t.List[int]:
+        """Signal lengths that aren't too different from the query's to match"""
+        # len(signal) * (1 -/+ pct) must reach the query length, with slack
+        # for rounding, and then exactly as matches_str() does it
+        pct = self.pct_diff_threshold / 100
+        lo = bisect.bisect_left(self._lengths, math.floor(query_len / (1 + pct)) - 1)
+        hi = bisect.bisect_right(
+            self._lengths,
+            math.ceil(query_len / (1 - pct)) + 1 if pct < 1 else math.inf,
+        )
+        return [
+            length
+            for length in self._lengths[lo:hi]
+            if abs(length - query_len)
+            <= RawTextSignal.max_match_distance(length, self.pct_diff_threshold)
+        ]
+
+    def _candidates(self, query: str) -> t.Iterator[int]:
+        query_qgrams: t.Optional[t.Counter[str]] = None
+        for length in self._candidate_lengths(len(query)):
+            min_shared = self._min_shared_qgrams(length, len(query))
+            if min_shared <= 0:
+                # Too short for the filter to rule anything out
+                yield from self._ids_by_length[length]
+                continue
+            if query_qgrams is None:
+                query_qgrams = self._qgrams(query)
+            postings = self._postings[length]
+            shared: t.Counter[int] = Counter()
+            for qgram, query_count in query_qgrams.items():
+                for text_id, count in postings.get(qgram, ()):
+                    shared[text_id] += min(count, query_count)
+            yield from (
+                text_id for text_id, count in shared.items() if count >= min_shared
+            )
+
+    def query(self, query: str) -> t.List[index.IndexMatch[index.T]]:
+        normalized = common.normalize_string(query)
+        ret: t.List[index.IndexMatch[index.T]] = []
+        for text_id in self._candidates(normalized):
+            text = self._texts[text_id]
+            distance: float = lev(text, normalized)
+            if distance <= RawTextSignal.max_match_distance(
+                len(text), self.pct_diff_threshold
+            ):
+                similarity = RawTextDistance.from_levenshtein(text, distance)
+                ret.extend(
+                    index.IndexMatch(similarity, entry)
+                    for entry in self._entries[text_id]
+                )
+        return ret
+
+    def add(self, signal_str: str, entry: index.T) -> None:
+        text = common.normalize_string(signal_str)
+        text_id = self._deduper.get(text)
+        if text_id is None:
+            text_id = len(self._texts)
+            self._deduper[text] = text_id
+            self._texts.append(text)
+            self._entries.append([])
+            length = len(text)
+            if length not in self._ids_by_length:
+                self._ids_by_length[length] = []
+                self._postings[length] = {}
+                bisect.insort(self._lengths, length)
+            self._ids_by_length[length].append(text_id)
+            postings = self._postings[length]
+            for qgram, count in self._qgrams(text).items():
+                postings.setdefault(qgram, []).append((text_id, count))
+        self._entries[text_id].append(entry)
+
+
 class LevenshteinLinearSearch(signal_base.TrivialLinearSearchMatchIndex):
+    """Compares the query against every signal - see RawTextIndex instead"""
+
     _SIGNAL_TYPE = RawTextSignal
     # Could also convert these on ingestion
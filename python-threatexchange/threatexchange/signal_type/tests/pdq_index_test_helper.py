@@ -0,0 +1,37 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+"""
+Helpers shared by the PDQ index tests
+"""
+
+import random
+import typing as t
+
+from threatexchange.signal_type.index import IndexMatchUntyped
+from threatexchange.signal_type.pdq.pdq_utils import simple_distance
+from threatexchange.signal_type.pdq.signal import PdqSignal
+
+
+def get_hashes(n: int, seed: int = 42) -> t.List[str]:
+    """n random PDQ hashes, the same for the same seed"""
+    random.seed(seed)
+    return [PdqSignal.get_random_signal() for _ in range(n)]
+
+
+def result_set(
+    results: t.Iterable[IndexMatchUntyped[t.Any, t.Any]],
+) -> t.Set[t.Tuple[t.Any, int]]:
+    """Index query results as (metadata, distance), for comparing"""
+    return {(r.metadata, r.similarity_info.distance) for r in results}
+
+
+def brute_force_match(
+    base: t.List[str], query: str, threshold: int = 31
+) -> t.Set[t.Tuple[int, int]]:
+    """(position in base, distance) of every hash within threshold of query"""
+    ret = set()
+    for i, base_hash in enumerate(base):
+        distance = simple_distance(base_hash, query)
+        if distance <= threshold:
+            ret.add((i, distance))
+    return ret
@@ -0,0 +1,76 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import pickle
+
+import numpy as np
+
+from threatexchange.signal_type.faiss_binary import IndexEntries, is_int64
+
+
+def test_int_entries_stored_as_arrays():
+    entries: IndexEntries[int] = IndexEntries()
+    entries.extend([0, 1, 1, 2], [10, 11, 12, 13])
+    entries.append(3, 14)
+
+    assert entries.is_int()
+    assert len(entries) == 4
+    offsets, values = entries.as_arrays()
+    assert offsets.tolist() == [0, 1, 3, 4, 5]
+    assert values.tolist() == [10, 11, 12, 13, 14]
+    assert entries.get(1) == [11, 12]
+
+
+def test_duplicates_of_earlier_ids_keep_order():
+    entries: IndexEntries[int] = IndexEntries()
+    entries.extend([0, 1, 2], [1, 2, 3])
+    assert entries.get(0) == [1]
+    entries.extend([0, 2, 3, 0], [4, 5, 6, 7])
+
+    assert entries.groups() == [[1, 4, 7], [2], [3, 5], [6]]
+    assert entries.get(0) == [1, 4, 7]
+
+
+def test_switches_to_lists_for_non_ints():
+    entries: IndexEntries[object] = IndexEntries()
+    entries.extend([0, 1], [1, 2])
+    entries.append(0, "a")
+    entries.append(2, None)
+    entries.append(1, 2**64)
+
+    assert not entries.is_int()
+    assert entries.groups() == [[1, "a"], [2, 2**64], [None]]
+    assert entries.get(0) == [1, "a"]
+
+
+def test_from_groups():
+    groups = [[1], [2, 3], [4]]
+    assert IndexEntries.from_groups(groups).groups() == groups
+    assert IndexEntries.from_groups([]).groups() == []
+
+
+def test_pickle_compacts():
+    entries: IndexEntries[int] = IndexEntries()
+    entries.extend(range(1000), range(1000))
+    entries.append(0, 5)
+
+    unpickled = pickle.loads(pickle.dumps(entries))
+
+    assert len(unpickled._tail_ids) == 0
+    assert isinstance(unpickled._values, np.ndarray)
+    assert unpickled.groups() == entries.groups()
+
+
+def test_is_int64():
+    assert is_int64(0)
+    assert is_int64(-(2**63))
+    assert not is_int64(2**63)
+    assert not is_int64(True)
+    assert not is_int64("1")
+
+
+def test_pickle_single_entry_ids():
+    entries: IndexEntries[int] = IndexEntries()
+    entries.extend(range(10), range(10, 20))
+    unpickled = pickle.loads(pickle.dumps(entries))
+    assert unpickled.as_arrays()[0].tolist() == list(range(11))
+    assert unpickled.get(3) == [13]
@@ -0,0 +1,115 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import io
+import typing as t
+
+import faiss
+
+from threatexchange.signal_type.pdq.pdq_adaptive_index import (
+    ENGINE_FLAT,
+    ENGINE_MIH,
+    PDQAdaptiveIndex,
+)
+from threatexchange.signal_type.pdq.signal import PdqSignal
+from threatexchange.signal_type.tests.pdq_index_test_helper import (
+    brute_force_match,
+    get_hashes,
+    result_set,
+)
+from threatexchange.tests.hashing.utils import get_similar_hash
+
+
+class _SmallMIHIndex(PDQAdaptiveIndex):
+    MIH_MIN_HASHES_BY_NFLIP = {0: 10, 1: 50}
+
+
+def _assert_matches_brute_force(
+    index: PDQAdaptiveIndex, base_hashes: t.List[str], threshold: int = 31
+) -> None:
+    queries = base_hashes[:5] + [
+        get_similar_hash(h, d) for h in base_hashes[5:10] for d in (10, 31, 40)
+    ]
+    for query, results in zip(queries, index.query_many(queries, threshold)):
+        assert result_set(results) == brute_force_match(base_hashes, query, threshold)
+
+
+def test_choose_engine():
+    assert PDQAdaptiveIndex.choose_engine(100, 31) == ENGINE_FLAT
+    assert PDQAdaptiveIndex.choose_engine(100_000, 15) == ENGINE_MIH
+    assert PDQAdaptiveIndex.choose_engine(100_000, 31) == ENGINE_FLAT
+    assert PDQAdaptiveIndex.choose_engine(10_000_000, 31) == ENGINE_MIH
+    assert PDQAdaptiveIndex.choose_engine(10_000_000, 52) == ENGINE_FLAT
+
+
+def test_small_index_is_flat():
+    base_hashes = get_hashes(100)
+    index = PDQAdaptiveIndex.build((h, i) for i, h in enumerate(base_hashes))
+
+    assert index.engine == ENGINE_FLAT
+    assert isinstance(index._index.faiss_index, faiss.IndexBinaryFlat)
+    assert index.build_stats is not None
+    assert index.build_stats.engine == ENGINE_FLAT
+    assert index.build_stats.num_hashes == 100
+    assert index.build_stats.threshold == 31
+    _assert_matches_brute_force(index, base_hashes)
+
+
+def test_large_index_is_mih():
+    base_hashes = get_hashes(100)
+    index = _SmallMIHIndex.build((h, i) for i, h in enumerate(base_hashes))
+
+    assert index.engine == ENGINE_MIH
+    assert isinstance(index._index.faiss_index, faiss.IndexBinaryMultiHash)
+    assert index.build_stats is not None
+    assert index.build_stats.engine == ENGINE_MIH
+    _assert_matches_brute_force(index, base_hashes)
+    # Past MAX_NFLIP, searches scan the MIH storage instead
+    _assert_matches_brute_force(index, base_hashes, threshold=40)
+    assert [r.metadata for r in index.query_topk(base_hashes[3], 1)] == [3]
+
+
+def test_switches_engine_as_it_grows():
+    base_hashes = get_hashes(100)
+    index: _SmallMIHIndex = _SmallMIHIndex(threshold=20)
+    assert index.build_stats is None
+
+    index.add_all((h, i) for i, h in enumerate(base_hashes[:40]))
+    assert index.engine == ENGINE_FLAT
+    index.add_all((h, i) for i, h in enumerate(base_hashes[40:], 40))
+    assert index.engine == ENGINE_MIH
+    assert index.build_stats is not None
+    assert index.build_stats.num_hashes == 100
+    _assert_matches_brute_force(index, base_hashes, threshold=20)
+
+
+def test_build_stats_cover_every_add():
+    base_hashes = get_hashes(3)
+    index: PDQAdaptiveIndex[int] = PDQAdaptiveIndex([(base_hashes[0], 1)])
+    assert index.build_stats is not None
+    first_seconds = index.build_stats.build_seconds
+
+    index.add_all([(base_hashes[1], 2)])
+    index.add_all([(base_hashes[2], 3), (base_hashes[0], 4)])
+    assert index.engine == ENGINE_FLAT
+    assert index.build_stats.engine == ENGINE_FLAT
+    assert index.build_stats.num_hashes == 3
+    assert index.build_stats.build_seconds > first_seconds
+
+
+def test_serialize_keeps_engine_and_stats():
+    base_hashes = get_hashes(100)
+    index = _SmallMIHIndex.build((h, i) for i, h in enumerate(base_hashes))
+
+    buffer = io.BytesIO()
+    index.serialize(buffer)
+    buffer.seek(0)
+    deserialized = _SmallMIHIndex.deserialize(buffer)
+
+    assert deserialized.engine == ENGINE_MIH
+    assert isinstance(deserialized._index.faiss_index, faiss.IndexBinaryMultiHash)
+    assert deserialized.build_stats == index.build_stats
+    _assert_matches_brute_force(deserialized, base_hashes)
+
+
+def test_pdq_signal_index():
+    assert PdqSignal.get_index_cls() is PDQAdaptiveIndex
@@ -0,0 +1,103 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import io
+import typing as t
+
+import faiss
+import pytest
+
+from threatexchange.signal_type.pdq.pdq_approximate_index import (
+    METHOD_HNSW,
+    METHOD_IVF,
+    PDQApproximateIndex,
+)
+from threatexchange.signal_type.pdq.signal import PdqSignal
+from threatexchange.signal_type.tests.pdq_index_test_helper import (
+    brute_force_match,
+    get_hashes,
+    result_set,
+)
+from threatexchange.tests.hashing.utils import get_similar_hash
+
+
+def _queries(base_hashes: t.List[str]) -> t.List[str]:
+    return base_hashes[:10] + [
+        get_similar_hash(h, d) for h in base_hashes[10:20] for d in (5, 20, 31)
+    ]
+
+
+@pytest.mark.parametrize("method", [METHOD_IVF, METHOD_HNSW])
+def test_results_within_threshold(method):
+    base_hashes = get_hashes(500)
+    index = PDQApproximateIndex.build(
+        [(h, i) for i, h in enumerate(base_hashes)], method=method
+    )
+
+    for h in base_hashes[:10]:
+        assert (base_hashes.index(h), 0) in result_set(index.query(h))
+    queries = _queries(base_hashes)
+    for query, results in zip(queries, index.query_many(queries)):
+        assert result_set(results) <= brute_force_match(base_hashes, query)
+
+
+def test_ivf_exhaustive_probe_is_exact():
+    base_hashes = get_hashes(500)
+    index = PDQApproximateIndex.build([(h, i) for i, h in enumerate(base_hashes)])
+
+    assert isinstance(index._index.faiss_index, faiss.IndexBinaryIVF)
+    assert index.nlist is not None
+    index.nprobe = index.nlist
+    queries = _queries(base_hashes)
+    for query, results in zip(queries, index.query_many(queries)):
+        assert result_set(results) == brute_force_match(base_hashes, query)
+
+
+def test_hnsw_large_ef_search_is_exact():
+    base_hashes = get_hashes(500)
+    index = PDQApproximateIndex.build(
+        [(h, i) for i, h in enumerate(base_hashes)],
+        method=METHOD_HNSW,
+        ef_search=500,
+    )
+
+    queries = _queries(base_hashes)
+    for query, results in zip(queries, index.query_many(queries)):
+        assert result_set(results) == brute_force_match(base_hashes, query)
+
+
+@pytest.mark.parametrize("method", [METHOD_IVF, METHOD_HNSW])
+def test_serialize_keeps_search_params(method):
+    base_hashes = get_hashes(200)
+    index = PDQApproximateIndex.build(
+        [(h, i) for i, h in enumerate(base_hashes)],
+        method=method,
+        nprobe=7,
+        ef_search=300,
+    )
+    index.add(base_hashes[0], 1000)
+
+    buffer = io.BytesIO()
+    index.serialize(buffer)
+    buffer.seek(0)
+    deserialized = PDQApproximateIndex.deserialize(buffer)
+
+    assert deserialized.method == method
+    assert deserialized.nprobe == 7
+    assert deserialized.ef_search == 300
+    assert {r.metadata for r in deserialized.query(base_hashes[0])} == {0, 1000}
+
+
+def test_empty_ivf_index():
+    index: PDQApproximateIndex = PDQApproximateIndex()
+    query = PdqSignal.get_random_signal()
+    assert index.query(query) == []
+
+    index.add(query, 1)
+    assert isinstance(index._index.faiss_index, faiss.IndexBinaryIVF)
+    assert index.nlist == 1
+    assert [r.metadata for r in index.query(query)] == [1]
+
+
+def test_invalid_method():
+    with pytest.raises(ValueError):
+        PDQApproximateIndex(method="lsh")
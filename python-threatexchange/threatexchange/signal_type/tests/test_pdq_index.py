@@ -8,7 +8,11 @@ import functools
 from threatexchange.signal_type.index import (
     SignalSimilarityInfoWithIntDistance,
 )
-from threatexchange.signal_type.pdq.pdq_index import PDQIndex, PDQIndexMatch
+from threatexchange.signal_type.pdq.pdq_index import (
+    PDQFlatIndex,
+    PDQIndex,
+    PDQIndexMatch,
+)
 
 test_entries = [
     (
@@ -130,3 +134,65 @@ def test_supports_pickling(index):
             PDQIndexMatch(SignalSimilarityInfoWithIntDistance(16), test_entries[0][1]),
         ],
     )
+
+
+def test_query_many(index):
+    queries = [entry[0] for entry in test_entries] + ["a" * 64]
+    results = index.query_many(queries)
+    assert len(results) == len(queries)
+    for query, result in zip(queries, results):
+        assert_equal_pdq_index_match_results(result, index.query(query))
+    assert index.query_many([]) == []
+
+
+@pytest.mark.parametrize("index_cls", [PDQIndex, PDQFlatIndex])
+def test_query_topk(index_cls):
+    index = index_cls.build(test_entries)
+    query = test_entries[0][0]
+
+    assert [
+        (r.metadata, r.similarity_info.distance) for r in index.query_topk(query, 1)
+    ] == [(test_entries[0][1], 0)]
+    assert [
+        (r.metadata, r.similarity_info.distance) for r in index.query_topk(query, 5)
+    ] == [(test_entries[0][1], 0), (test_entries[1][1], 16)]
+    assert [r.metadata for r in index.query_topk(query, 5, max_distance=15)] == [
+        test_entries[0][1]
+    ]
+    assert len(index.query_topk(query, 5, max_distance=256)) == len(test_entries)
+    with pytest.raises(ValueError):
+        index.query_topk(query, 0)
+
+
+def test_unpickle_local_id_to_entry(index):
+    # The state of an index pickled before IndexEntries
+    state = index.__dict__.copy()
+    del state["_entries"]
+    state["local_id_to_entry"] = test_entries
+
+    unpickled = PDQIndex.__new__(PDQIndex)
+    unpickled.__setstate__(state)
+
+    assert len(unpickled) == len(test_entries)
+    assert [r.metadata for r in unpickled.query(test_entries[4][0])] == [
+        test_entries[4][1]
+    ]
+
+
+def test_int_entries():
+    index = PDQIndex.build((h, i) for i, (h, _) in enumerate(test_entries))
+    assert index._entries.is_int()
+    assert [r.metadata for r in index.query(test_entries[2][0])] == [2]
+
+
+@pytest.mark.parametrize("index_cls", [PDQIndex, PDQFlatIndex])
+def test_query_threshold_override(index_cls):
+    index = index_cls.build(test_entries)
+    query = test_entries[0][0]
+
+    assert len(index.query(query)) == 2
+    assert [r.metadata for r in index.query(query, threshold=15)] == [
+        test_entries[0][1]
+    ]
+    assert len(index.query(query, threshold=128)) == 4
+    assert [len(r) for r in index.query_many([query, query], threshold=0)] == [1, 1]
@@ -5,10 +5,11 @@ import random
 import typing as t
 
 import faiss
+import pytest
 
 from threatexchange.signal_type.pdq.pdq_index2 import PDQIndex2
-from threatexchange.signal_type.pdq.pdq_utils import simple_distance
 from threatexchange.signal_type.pdq.signal import PdqSignal
+from threatexchange.signal_type.tests.pdq_index_test_helper import brute_force_match
 
 
 def _get_hash_generator(seed: int = 42):
@@ -20,18 +21,6 @@ def _get_hash_generator(seed: int = 42):
     return get_n_hashes
 
 
-def _brute_force_match(
-    base: t.List[str], query: str, threshold: int = 32
-) -> t.Set[t.Tuple[int, int]]:
-    matches = set()
-
-    for i, base_hash in enumerate(base):
-        distance = simple_distance(base_hash, query)
-        if distance <= threshold:
-            matches.add((i, distance))
-    return matches
-
-
 def _generate_random_hash_with_distance(hash: str, distance: int) -> str:
     if not (0 <= distance <= 256):
         raise ValueError("Distance must be between 0 and 256")
@@ -55,7 +44,7 @@ def test_pdq_index():
     query_hashes = base_hashes[:10] + get_random_hashes(1000)
 
     brute_force_matches = {
-        query_hash: _brute_force_match(base_hashes, query_hash)
+        query_hash: brute_force_match(base_hashes, query_hash, threshold=32)
         for query_hash in query_hashes
     }
 
@@ -120,7 +109,7 @@ def test_serialize_deserialize_index():
     assert isinstance(deserialized_index._index.faiss_index, faiss.IndexFlatL2)
     assert deserialized_index.threshold == index.threshold
     assert deserialized_index._deduper == index._deduper
-    assert deserialized_index._idx_to_entries == index._idx_to_entries
+    assert deserialized_index._entries.groups() == index._entries.groups()
 
 
 def test_empty_index_query():
@@ -178,3 +167,174 @@ def test_one_entry_sample_index():
 
     results = index.query(unmatching_test_hash)
     assert len(results) == 0
+
+
+def test_binary_index_matches_brute_force():
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(100)
+    query_hashes = base_hashes[:10] + [
+        _generate_random_hash_with_distance(h, d)
+        for h in base_hashes[10:20]
+        for d in (1, 16, 31, 32, 60)
+    ]
+
+    index = PDQIndex2(
+        index=faiss.IndexBinaryFlat(256),
+        entries=[(h, i) for i, h in enumerate(base_hashes)],
+    )
+
+    for query_hash in query_hashes:
+        result_indices = {
+            (result.metadata, result.similarity_info.distance)
+            for result in index.query(query_hash)
+        }
+        assert result_indices == brute_force_match(
+            base_hashes, query_hash, threshold=index.threshold
+        )
+
+
+def test_binary_index_serialize_deserialize():
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(100)
+    index: PDQIndex2 = PDQIndex2(
+        index=faiss.IndexBinaryFlat(256),
+        entries=[(h, i) for i, h in enumerate(base_hashes)],
+    )
+    index.add(base_hashes[0], 100)
+
+    buffer = io.BytesIO()
+    index.serialize(buffer)
+    buffer.seek(0)
+    deserialized_index: PDQIndex2 = PDQIndex2.deserialize(buffer)
+
+    assert isinstance(deserialized_index._index.faiss_index, faiss.IndexBinaryFlat)
+    assert deserialized_index._deduper == index._deduper
+    assert deserialized_index._entries.groups() == index._entries.groups()
+    results = deserialized_index.query(base_hashes[0])
+    assert {r.metadata for r in results} == {0, 100}
+
+
+@pytest.mark.parametrize(
+    "faiss_index", [None, faiss.IndexBinaryFlat(256)], ids=["float", "binary"]
+)
+def test_query_many(faiss_index):
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(100)
+    query_hashes = (
+        base_hashes[:10]
+        + get_random_hashes(10)
+        + [_generate_random_hash_with_distance(h, 20) for h in base_hashes[:10]]
+    )
+    index = PDQIndex2(
+        index=faiss_index, entries=[(h, i) for i, h in enumerate(base_hashes)]
+    )
+
+    results = index.query_many(query_hashes)
+
+    assert len(results) == len(query_hashes)
+    for query_hash, result in zip(query_hashes, results):
+        assert {(r.metadata, r.similarity_info.distance) for r in result} == {
+            (r.metadata, r.similarity_info.distance) for r in index.query(query_hash)
+        }
+    assert index.query_many([]) == []
+
+
+@pytest.mark.parametrize(
+    "faiss_index", [None, faiss.IndexBinaryFlat(256)], ids=["float", "binary"]
+)
+def test_query_topk(faiss_index):
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(100)
+    query_hash = base_hashes[0]
+    # A cluster of near-duplicates, with more matches than k
+    near_hashes = [
+        _generate_random_hash_with_distance(query_hash, d) for d in range(1, 21)
+    ]
+    index = PDQIndex2(
+        index=faiss_index,
+        entries=[(h, i) for i, h in enumerate(base_hashes + near_hashes)],
+    )
+    index.add(query_hash, 1000)
+
+    expected = sorted(
+        brute_force_match(base_hashes + near_hashes, query_hash, threshold=10),
+        key=lambda m: m[1],
+    )
+
+    results = index.query_topk(query_hash, 5, max_distance=10)
+    assert len(results) == 5
+    assert {r.metadata for r in results[:2]} == {0, 1000}
+    assert [r.similarity_info.distance for r in results] == [0, 0, 1, 2, 3]
+    assert [r.metadata for r in results[2:]] == [m[0] for m in expected[1:4]]
+
+    results = index.query_topk(query_hash, 100, max_distance=10)
+    assert len(results) == len(expected) + 1
+    assert all(r.similarity_info.distance <= 10 for r in results)
+    assert len(index.query_topk(query_hash, 100)) == len(index.query(query_hash))
+
+
+def test_int_entries_are_compact():
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(100)
+    index = PDQIndex2(entries=[(h, i) for i, h in enumerate(base_hashes)])
+    index.add(base_hashes[0], 100)
+
+    assert index._entries.is_int()
+    assert {r.metadata for r in index.query(base_hashes[0])} == {0, 100}
+
+    index.add(base_hashes[1], "not an int")
+    assert not index._entries.is_int()
+    assert {r.metadata for r in index.query(base_hashes[0])} == {0, 100}
+    assert {r.metadata for r in index.query(base_hashes[1])} == {1, "not an int"}
+
+
+def test_unpickle_list_entries():
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(3)
+    index: PDQIndex2 = PDQIndex2(entries=[(h, 0) for h in base_hashes])
+    # The state of an index pickled before IndexEntries
+    state = index.__dict__.copy()
+    del state["_entries"]
+    state["_deduper"] = {h: i for i, h in enumerate(base_hashes)}
+    state["_idx_to_entries"] = [[0, 1], [2], ["a"]]
+
+    unpickled: PDQIndex2 = PDQIndex2.__new__(PDQIndex2)
+    unpickled.__setstate__(state)
+
+    assert len(unpickled) == 3
+    assert {r.metadata for r in unpickled.query(base_hashes[0])} == {0, 1}
+    assert [r.metadata for r in unpickled.query(base_hashes[2])] == ["a"]
+    unpickled.add(base_hashes[1], 3)
+    assert {r.metadata for r in unpickled.query(base_hashes[1])} == {2, 3}
+
+
+@pytest.mark.parametrize(
+    "faiss_index",
+    [None, faiss.IndexBinaryFlat(256), faiss.IndexBinaryMultiHash(256, 16, 16)],
+    ids=["float", "binary", "mih"],
+)
+def test_query_threshold_override(faiss_index):
+    get_random_hashes = _get_hash_generator()
+    base_hashes = get_random_hashes(100)
+    query_hashes = [
+        _generate_random_hash_with_distance(h, d)
+        for h in base_hashes[:10]
+        for d in (5, 20, 40)
+    ]
+    index = PDQIndex2(
+        index=faiss_index, entries=[(h, i) for i, h in enumerate(base_hashes)]
+    )
+
+    for threshold in (0, 10, 31, 50):
+        for query_hash, results in zip(
+            query_hashes, index.query_many(query_hashes, threshold=threshold)
+        ):
+            expected = brute_force_match(base_hashes, query_hash, threshold)
+            assert {
+                (r.metadata, r.similarity_info.distance) for r in results
+            } == expected
+            assert {
+                (r.metadata, r.similarity_info.distance)
+                for r in index.query(query_hash, threshold=threshold)
+            } == expected
+    assert index.threshold == 31
@@ -0,0 +1,171 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import io
+import mmap
+import pickle
+import tempfile
+import typing as t
+
+import pytest
+
+from threatexchange.signal_type.pdq.pdq_index2 import PDQIndex2
+from threatexchange.signal_type.pdq.pdq_mmap_index import PDQMmapIndex
+from threatexchange.signal_type.pdq.signal import PdqSignal
+from threatexchange.signal_type.tests.pdq_index_test_helper import (
+    brute_force_match,
+    get_hashes,
+    result_set,
+)
+from threatexchange.tests.hashing.utils import get_similar_hash
+
+
+def _roundtrip_file(index: PDQMmapIndex) -> PDQMmapIndex:
+    with tempfile.TemporaryFile() as f:
+        index.serialize(f)
+        f.seek(0)
+        return PDQMmapIndex.deserialize(f)
+
+
+def test_build_matches_brute_force():
+    base_hashes = get_hashes(200)
+    queries = base_hashes[:10] + [
+        get_similar_hash(h, d) for h in base_hashes[10:20] for d in (1, 16, 31, 32)
+    ]
+    index = PDQMmapIndex.build((h, i) for i, h in enumerate(base_hashes))
+    assert len(index) == len(base_hashes)
+    for query, results in zip(queries, index.query_many(queries)):
+        assert result_set(results) == brute_force_match(base_hashes, query)
+
+
+def test_deserialize_is_memory_mapped():
+    base_hashes = get_hashes(100)
+    index = PDQMmapIndex.build(
+        [(h, i) for i, h in enumerate(base_hashes)] + [(base_hashes[0], 100)],
+        threshold=16,
+    )
+
+    loaded = _roundtrip_file(index)
+
+    assert isinstance(loaded._mmap, mmap.mmap)
+    assert not loaded._hashes.flags.owndata
+    assert not loaded._hashes.flags.writeable
+    assert loaded.threshold == 16
+    assert len(loaded) == len(base_hashes)
+    for h in base_hashes[:10]:
+        assert result_set(loaded.query(h)) == result_set(index.query(h))
+    assert result_set(loaded.query(base_hashes[0])) == {(0, 0), (100, 0)}
+
+    loaded.dispose()
+    assert loaded._mmap is None
+    assert loaded.query(base_hashes[0]) == []
+
+
+def test_deserialize_from_bytes_and_offset():
+    base_hashes = get_hashes(10)
+    index = PDQMmapIndex.build((h, i) for i, h in enumerate(base_hashes))
+
+    buf = io.BytesIO()
+    index.serialize(buf)
+    buf.seek(0)
+    loaded = PDQMmapIndex.deserialize(buf)
+    assert result_set(loaded.query(base_hashes[3])) == {(3, 0)}
+
+    with tempfile.TemporaryFile() as f:
+        f.write(b"some other data")
+        index.serialize(f)
+        f.seek(len(b"some other data"))
+        loaded = PDQMmapIndex.deserialize(f)
+    assert result_set(loaded.query(base_hashes[3])) == {(3, 0)}
+
+
+def test_non_int_entries():
+    base_hashes = get_hashes(10)
+    entries = [(h, {"id": i}) for i, h in enumerate(base_hashes)]
+    loaded = _roundtrip_file(PDQMmapIndex.build(entries))
+    assert [r.metadata for r in loaded.query(base_hashes[5])] == [{"id": 5}]
+
+
+def test_from_pdq_index2():
+    base_hashes = get_hashes(100)
+    index2 = PDQIndex2(
+        entries=[(h, i) for i, h in enumerate(base_hashes)], threshold=40
+    )
+    index2.add(base_hashes[1], 1000)
+
+    loaded = _roundtrip_file(PDQMmapIndex.from_pdq_index2(index2))
+
+    assert loaded.threshold == 40
+    queries = base_hashes[:5] + [get_similar_hash(base_hashes[1], 35)]
+    for query in queries:
+        assert result_set(loaded.query(query)) == result_set(index2.query(query))
+
+
+def test_empty_index():
+    loaded = _roundtrip_file(PDQMmapIndex.build([]))
+    assert len(loaded) == 0
+    assert loaded.query_many([PdqSignal.get_random_signal()]) == [[]]
+
+
+def test_add_to_loaded_index():
+    base_hashes = get_hashes(60)
+    loaded = _roundtrip_file(
+        PDQMmapIndex.build((h, i) for i, h in enumerate(base_hashes[:50]))
+    )
+    loaded.add_all((h, i) for i, h in enumerate(base_hashes[50:], 50))
+    loaded.add(base_hashes[0].upper(), 100)
+
+    assert loaded._mmap is None
+    assert len(loaded) == len(base_hashes)
+    assert result_set(loaded.query(base_hashes[0])) == {(0, 0), (100, 0)}
+    for h in base_hashes[1:]:
+        assert result_set(loaded.query(h)) == brute_force_match(base_hashes, h)
+
+    with pytest.raises(ValueError):
+        loaded.add_all([(base_hashes[1], 1), ("not a hash", 2)])
+    assert len(loaded) == len(base_hashes)
+
+    index = PDQMmapIndex.build([(base_hashes[0], {"id": 0})])
+    index.add(base_hashes[1], {"id": 1})
+    reloaded = _roundtrip_file(index)
+    assert [r.metadata for r in reloaded.query(base_hashes[1])] == [{"id": 1}]
+
+
+def test_add_to_empty_index():
+    # What SignalTypeIndex.build and the CLI index store do
+    base_hashes = get_hashes(10)
+    index: PDQMmapIndex[int] = PDQMmapIndex()
+    index.add_all((h, i) for i, h in enumerate(base_hashes))
+    assert result_set(index.query(base_hashes[4])) == {(4, 0)}
+
+
+def test_invalid_file():
+    with pytest.raises(ValueError):
+        PDQMmapIndex.deserialize(io.BytesIO(b"\x80" * 200))
+    buf = io.BytesIO()
+    PDQMmapIndex.build([(PdqSignal.get_random_signal(), 1)]).serialize(buf)
+    with pytest.raises(ValueError):
+        PDQMmapIndex.deserialize(io.BytesIO(buf.getvalue()[:-8]))
+
+
+def test_pickle():
+    base_hashes = get_hashes(10)
+    loaded = _roundtrip_file(
+        PDQMmapIndex.build((h, i) for i, h in enumerate(base_hashes))
+    )
+    unpickled = pickle.loads(pickle.dumps(loaded))
+    assert unpickled._mmap is None
+    assert result_set(unpickled.query(base_hashes[2])) == {(2, 0)}
+
+
+def test_query_threshold_override():
+    base_hashes = get_hashes(100)
+    loaded = _roundtrip_file(
+        PDQMmapIndex.build((h, i) for i, h in enumerate(base_hashes))
+    )
+    queries = [get_similar_hash(h, d) for h in base_hashes[:10] for d in (5, 20, 40)]
+    for threshold in (0, 10, 50):
+        for query, results in zip(queries, loaded.query_many(queries, threshold)):
+            assert result_set(results) == brute_force_match(
+                base_hashes, query, threshold
+            )
+    assert loaded.threshold == 31
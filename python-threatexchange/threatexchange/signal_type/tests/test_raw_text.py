@@ -1,7 +1,9 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
+import random
+
 import pytest
-from threatexchange.signal_type.raw_text import RawTextSignal
+from threatexchange.signal_type.raw_text import RawTextIndex, RawTextSignal
 from threatexchange.signal_type.tests.signal_type_test_helper import (
     MatchesStrAutoTest,
     THashValidateCase,
@@ -49,3 +51,43 @@ class TestRawTextSignal(MatchesStrAutoTest):
         assert validated == expected_str, (
             f"Expected {expected_str} for input {input_val}, but got " f"{validated}"
         )
+
+
+def get_index_texts() -> t.List[str]:
+    """Random texts of many lengths, and edits of them"""
+    rng = random.Random(1)
+    texts = ["", "a", "ab", "A b!", "abc"]
+    for length in (2, 5, 19, 20, 21, 40, 100):
+        for _ in range(3):
+            text = [rng.choice("abcd ") for _ in range(length)]
+            texts.append("".join(text))
+            for _ in range(4):
+                i = rng.randrange(len(text))
+                op = rng.randrange(3)
+                if op == 0:
+                    text[i] = rng.choice("abcd")
+                elif op == 1:
+                    text.insert(i, rng.choice("abcd"))
+                elif len(text) > 1:
+                    del text[i]
+                texts.append("".join(text))
+    return texts
+
+
+@pytest.mark.parametrize("pct_diff_threshold", [5.0, 30.0, 100.0])
+def test_raw_text_index_same_as_linear_search(pct_diff_threshold: float) -> None:
+    texts = get_index_texts()
+    index: RawTextIndex[int] = RawTextIndex(pct_diff_threshold=pct_diff_threshold)
+    index.add_all((text, i) for i, text in enumerate(texts))
+    assert len(index) == len(texts)
+    for query in texts:
+        expected = {}
+        for i, text in enumerate(texts):
+            result = RawTextSignal.matches_str(text, query, pct_diff_threshold)
+            if result.match:
+                expected[i] = result.distance
+        assert {m.metadata: m.similarity_info for m in index.query(query)} == expected
+
+
+def test_raw_text_index_is_default() -> None:
+    assert RawTextSignal.get_index_cls() is RawTextIndex
@@ -0,0 +1,75 @@
+# Copyright (c) Meta Platforms, Inc. and affiliates.
+
+import json
+import pickle
+import typing as t
+
+import pytest
+
+from threatexchange.signal_type.trend_query import (
+    TrendQuery,
+    TrendQueryIndex,
+    TrendQuerySignal,
+)
+
+QUERIES = [
+    TrendQuerySignal.get_examples()[0],
+    json.dumps({"and": [{"or": ["hoops"]}], "not": []}),
+    json.dumps({"and": [{"or": ["basket-ball", "-ball"]}], "not": ["ball"]}),
+    json.dumps({"and": [{"or": ["regex-/ho+ps/"]}], "not": []}),
+    json.dumps(
+        {"and": [{"or": ["regex-/ho+ps/", "now"]}, {"or": ["ball"]}], "not": []}
+    ),
+    json.dumps({"and": [{"or": ["!!"]}], "not": []}),
+    json.dumps({"and": [], "not": ["hockey"]}),
+    json.dumps({"and": [{"or": []}], "not": []}),
+    json.dumps({"and": [{"or": ["Hoops"]}], "not": []}),
+]
+
+TEXTS = [
+    "",
+    "hoops now",
+    "bball tonight, not tomorrow",
+    "hooooops!!",
+    "Hoops tonight? basket-ball",
+    "basket-ball",
+    "x-ball",
+    "hockey",
+    "ball now",
+    "hoopsball",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_index_same_as_matches(text: str) -> None:
+    index: TrendQueryIndex[int] = TrendQueryIndex()
+    index.add_all((q, i) for i, q in enumerate(QUERIES))
+    expected = [
+        i for i, q in enumerate(QUERIES) if TrendQuery(json.loads(q)).matches(text)
+    ]
+    assert [m.metadata for m in index.query(text)] == expected
+
+
+def test_trigger_words() -> None:
+    def trigger_words(query: str) -> t.Optional[t.FrozenSet[str]]:
+        return TrendQuery(json.loads(query)).trigger_words
+
+    assert trigger_words(QUERIES[0]) == {"basketball", "basket", "bball", "hoops"}
+    assert trigger_words(QUERIES[2]) == {"basket", "ball"}
+    assert trigger_words(QUERIES[3]) is None
+    assert trigger_words(QUERIES[4]) == {"ball"}
+    assert trigger_words(QUERIES[5]) is None
+    assert trigger_words(QUERIES[6]) is None
+    assert trigger_words(QUERIES[7]) == frozenset()
+
+
+def test_unpickle_without_trigger_words() -> None:
+    index: TrendQueryIndex[int] = TrendQueryIndex()
+    index.add_all((q, i) for i, q in enumerate(QUERIES))
+    index.add(QUERIES[1], 100)
+    old = TrendQueryIndex.__new__(TrendQueryIndex)
+    old.__dict__["state"] = index.state
+    unpickled = pickle.loads(pickle.dumps(old))
+    assert [m.metadata for m in unpickled.query("hoops now")] == [
+        m.metadata for m in index.query("hoops now")
+    ]
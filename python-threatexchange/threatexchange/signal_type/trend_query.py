@@ -17,6 +17,8 @@ from threatexchange.exchanges.impl.fb_threatexchange_signal import (
     HasFbThreatExchangeIndicatorType,
 )
 
+WORD_RE = re.compile(r"\w+")
+
 
 class TrendQuery:
     """
@@ -31,6 +33,32 @@ class TrendQuery:
             [self._parse_term(t) for t in and_["or"]] for and_ in query_json["and"]
         ]
         self.not_terms: t.List[t.Any] = [self._parse_term(t) for t in query_json["not"]]
+        self.trigger_words = self._get_trigger_words(query_json)
+
+    def _get_trigger_words(
+        self, query_json: t.Dict[str, t.Any]
+    ) -> t.Optional[t.FrozenSet[str]]:
+        """
+        Words (as in WORD_RE), one of which is in every text the query matches.
+
+        Keyword terms only match whole words, so each word in one is a whole
+        word of any text it matches. An "or" of only keyword terms can't
+        match unless one of them has a word in the text. None if every "or"
+        has a regex term.
+        """
+        ret: t.Optional[t.FrozenSet[str]] = None
+        for and_ in query_json["and"]:
+            words = set()
+            for term in and_["or"]:
+                term_words = WORD_RE.findall(term)
+                if term.startswith(self.REGEX_PREFIX) or not term_words:
+                    break
+                # Longer words are usually rarer
+                words.add(max(term_words, key=len))
+            else:
+                if ret is None or len(words) < len(ret):
+                    ret = frozenset(words)
+        return ret
 
     def _parse_term(self, t) -> t.Any:
         if t.startswith(self.REGEX_PREFIX):
@@ -110,13 +138,30 @@ class TrendQuerySignal(
 
 
 class TrendQueryIndex(index.SignalTypeIndex[index.T]):
+    """
+    Finds the trend queries that match a text.
+
+    The text is split into words once, and only the trend queries that can
+    match with those words (see TrendQuery.trigger_words) are checked.
+    """
+
     def __init__(self) -> None:
         self.state: t.Dict[str, t.Tuple[TrendQuery, t.List[index.T]]] = {}
+        # Trend queries in the order they were added, by position
+        self._hashes: t.List[str] = []
+        # Positions of the trend queries each word can trigger
+        self._by_trigger_word: t.Dict[str, t.List[int]] = {}
+        # Positions of the trend queries to always check
+        self._untriggered: t.List[int] = []
 
     # TODO - Figure out how to properly capture hash vs search
     def query(self, hash: str) -> t.List[index.IndexMatch[index.T]]:
+        positions = set(self._untriggered)
+        for word in set(WORD_RE.findall(hash)):
+            positions.update(self._by_trigger_word.get(word, ()))
         ret: t.List[index.IndexMatch[index.T]] = []
-        for tq, values in self.state.values():
+        for position in sorted(positions):
+            tq, values = self.state[self._hashes[position]]
             if tq.matches(hash):
                 ret.extend(
                     index.IndexMatch(index.SignalSimilarityInfo(), v) for v in values
@@ -128,9 +173,25 @@ class TrendQueryIndex(index.SignalTypeIndex[index.T]):
         query_json = json.loads(hash)
 
         if old_val is None:
-            self.state[hash] = (
-                TrendQuery(query_json),
-                [value],
-            )
+            tq = TrendQuery(query_json)
+            self.state[hash] = (tq, [value])
+            position = len(self._hashes)
+            self._hashes.append(hash)
+            if tq.trigger_words is None:
+                self._untriggered.append(position)
+            for word in tq.trigger_words or ():
+                self._by_trigger_word.setdefault(word, []).append(position)
         else:
             old_val[1].append(value)
+
+    def __setstate__(self, state: t.Dict[str, t.Any]) -> None:
+        if "_hashes" not in state:
+            # Pickled before trend queries were looked up by word
+            rebuilt: TrendQueryIndex[index.T] = TrendQueryIndex()
+            rebuilt.add_all(
+                (hash, value)
+                for hash, (_, values) in state["state"].items()
+                for value in values
+            )
+            state = rebuilt.__dict__
+        self.__dict__.update(state)
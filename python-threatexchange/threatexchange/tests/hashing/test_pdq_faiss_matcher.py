@@ -74,6 +74,16 @@ class MixinTests:
             result = self.index.search(query, 0)
             self.assertEqualPDQHashSearchResults(result, [[], [], [test_hashes[-1]]])
 
+        def test_search_topk(self):
+            query = test_hashes[:1]
+            result = self.index.search_topk(query, 3, 128)
+            self.assertEqual([[d for _, d in r] for r in result], [[0, 16, 128]])
+            self.assertEqual(
+                [self.index.hash_at(idx) for idx, _ in result[0][:2]], test_hashes[:2]
+            )
+            result = self.index.search_topk(query, 3, 16)
+            self.assertEqual([[d for _, d in r] for r in result], [[0, 16]])
+
         def test_supports_pickling(self):
             pickled_data = pickle.dumps(self.index)
             assert (
@@ -188,6 +198,19 @@ class TestPDQMultiHashIndexWithCustomIds(
             results, [self.custom_ids[:2], self.custom_ids[:2]]
         )
 
+    def test_incremental_adds(self):
+        index = PDQMultiHashIndex()
+        for h, custom_id in zip(test_hashes, self.custom_ids):
+            index.add([h], [custom_id])
+        for h, custom_id in zip(test_hashes, self.custom_ids):
+            assert index.hash_at(custom_id) == h
+
+        reconstructed_index = pickle.loads(pickle.dumps(index))
+        reconstructed_index.add(test_hashes[:1], [1])
+        assert reconstructed_index.hash_at(1) == test_hashes[0]
+        for h, custom_id in zip(test_hashes, self.custom_ids):
+            assert reconstructed_index.hash_at(custom_id) == h
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,11 +1,17 @@
 # Copyright (c) Meta Platforms, Inc. and affiliates.
 
 import base64
+import io
 import pathlib
 import tempfile
 import unittest
 
+import numpy as np
+from PIL import Image
+
+from threatexchange.content_type.photo import PhotoContent
 from threatexchange.signal_type.pdq import pdq_hasher
+from threatexchange.signal_type.pdq.signal import PdqSignal
 
 RANDOM_IMAGE_BASE64 = """iVBORw0KGgoAAAANSUhEUgAAABoAAAAcCAYAAAB/E6/TAAABQGlDQ1BJQ0MgUHJvZmlsZQAAKJFj
 YGASSCwoyGFhYGDIzSspCnJ3UoiIjFJgf8rAzMDDwMGgziCUmFxc4BgQ4ANUwgCjUcG3awyMIPqy
@@ -108,3 +114,41 @@ class PDQHasherModuleUnitTest(unittest.TestCase):
         bytes_ = base64.b64decode(RANDOM_IMAGE_BASE64)
         pdq_hash = pdq_hasher.pdq_from_bytes(bytes_)[0]
         assert pdq_hash == RANDOM_IMAGE_PDQ
+
+    def test_pdq_from_arrays(self):
+        """Hashes many decoded images at once"""
+        images = [Image.open(io.BytesIO(base64.b64decode(RANDOM_IMAGE_BASE64)))]
+        expected = [(RANDOM_IMAGE_PDQ, pdq_hasher.pdq_from_image(images[0])[1])]
+        for test_data in self.test_files.values():
+            file_path = pathlib.Path(test_data["path"])
+            if file_path.exists():
+                images.append(Image.open(file_path))
+                expected.append(
+                    (test_data["expected_pdq"], test_data["expected_quality"])
+                )
+        arrays = [
+            pdq_hasher._convert_image_to_correct_array_dimension(image)
+            for image in images
+        ]
+        # Grayscale arrays are 2D
+        arrays.append(np.asarray(images[0].convert("L")))
+        expected.append(pdq_hasher.pdq_from_image(images[0].convert("L")))
+
+        assert pdq_hasher.pdq_from_arrays(arrays) == expected
+        assert pdq_hasher.pdq_from_arrays([]) == []
+
+    def test_hash_all_rotations_from_bytes(self):
+        """Matches hashing each re-encoded rotation, for lossless formats"""
+        for format_name in ("la", "i16"):
+            with self.subTest(format=format_name):
+                file_path = pathlib.Path(self.test_files[format_name]["path"])
+                if not file_path.exists():
+                    continue
+                bytes_ = file_path.read_bytes()
+                expected = {
+                    rotation_type: PdqSignal.hash_from_bytes(rotated)
+                    for rotation_type, rotated in PhotoContent.all_simple_rotations(
+                        bytes_
+                    ).items()
+                }
+                assert PdqSignal.hash_all_rotations_from_bytes(bytes_) == expected
@@ -90,6 +90,54 @@ class TestPDQUtils(unittest.TestCase):
             pdq_match(test_hashes[1], test_hashes[3], BITS_IN_PDQ // 2 - 1)
         )
 
+    def test_convert_to_packed_ndarray(self):
+        packed = convert_pdq_strings_to_packed_ndarray(test_hashes)
+        self.assertEqual(packed.shape, (len(test_hashes), BYTES_IN_PDQ))
+        for row, test_hash in zip(packed, test_hashes):
+            self.assertEqual(row.tobytes(), binascii.unhexlify(test_hash))
+        # hex ascii bytes, raw bytes, and arrays are accepted too
+        mixed = [test_hashes[1].encode(), binascii.unhexlify(test_hashes[2])]
+        self.assertEqual(
+            convert_pdq_strings_to_packed_ndarray(mixed).tolist(),
+            packed[1:3].tolist(),
+        )
+        self.assertEqual(
+            convert_pdq_strings_to_packed_ndarray(packed).tolist(), packed.tolist()
+        )
+        self.assertEqual(
+            convert_pdq_strings_to_packed_ndarray(iter([])).shape, (0, BYTES_IN_PDQ)
+        )
+
+    def test_convert_to_bits_ndarray(self):
+        bits = convert_pdq_strings_to_ndarray(test_hashes)
+        self.assertEqual(bits.shape, (len(test_hashes), BITS_IN_PDQ))
+        for row, test_hash in zip(bits, test_hashes):
+            self.assertEqual("".join(str(b) for b in row), hex_to_binary_str(test_hash))
+
+    def test_convert_invalid_hashes(self):
+        for invalid in (
+            [test_hashes[0][:-1]],
+            [test_hashes[0][:-1], test_hashes[0] + "0"],
+            ["g" * PDQ_HEX_STR_LEN],
+            [" 0" * (PDQ_HEX_STR_LEN // 2)],
+            [b"0" * 31],
+        ):
+            with self.assertRaises(ValueError, msg=repr(invalid)):
+                convert_pdq_strings_to_packed_ndarray(invalid)
+
+    def test_distance_matrix(self):
+        random_hashes = [get_random_hash() for _ in range(5)]
+        matrix = pdq_distance_matrix(
+            convert_pdq_strings_to_packed_ndarray(test_hashes),
+            convert_pdq_strings_to_packed_ndarray(random_hashes),
+        )
+        self.assertEqual(matrix.shape, (len(test_hashes), len(random_hashes)))
+        for i, a in enumerate(test_hashes):
+            for j, b in enumerate(random_hashes):
+                self.assertEqual(matrix[i, j], simple_distance(a, b))
+        empty = convert_pdq_strings_to_packed_ndarray([])
+        self.assertEqual(pdq_distance_matrix(empty, empty).shape, (0, 0))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -10,8 +10,16 @@ import time
 from enum import Enum
 from contextlib import contextmanager, nullcontext
 from threatexchange.extensions.vpdq.vpdq_brute_matcher import match_VPDQ_hash_brute
-from threatexchange.extensions.vpdq.tests.utils import get_random_vpdq_features
-from threatexchange.extensions.vpdq.vpdq_faiss import VPDQHashIndex
+from threatexchange.extensions.vpdq.tests.utils import (
+    get_random_vpdq_features,
+    pdq_hashes_to_vpdq_features,
+)
+from threatexchange.extensions.vpdq.vpdq_faiss import (
+    FRAME_INDEX_FLAT,
+    FRAME_INDEX_IVF,
+    FRAME_INDEX_MIH,
+    VPDQHashIndex,
+)
 from threatexchange.extensions.vpdq.vpdq_util import (
     vpdq_to_json,
     VPDQ_QUALITY_THRESHOLD,
@@ -21,17 +29,28 @@ from threatexchange.extensions.vpdq.vpdq_util import (
 import typing as t
 import random
 from threatexchange.extensions.vpdq.vpdq_index import VPDQIndex
+from threatexchange.tests.hashing.utils import get_similar_hash
 
 
 class IndexType(Enum):
     BRUTE_FORCE = "brute_force"
     FLAT = "flat"
+    MIH = "mih"
+    IVF = "ivf"
     SIGNAL_TYPE = "signal_type"
 
     def __str__(self) -> str:
         return self.value
 
 
+# Test types that search frames with only a VPDQHashIndex
+FRAME_INDEX_TESTS = {
+    IndexType.FLAT: FRAME_INDEX_FLAT,
+    IndexType.MIH: FRAME_INDEX_MIH,
+    IndexType.IVF: FRAME_INDEX_IVF,
+}
+
+
 @contextmanager
 def timer(context: str, print_on_enter: bool = False):
     if print_on_enter:
@@ -49,11 +68,16 @@ def run_benchmark(
     jitter_noise: int,
     dataset_size: int,
     query_size: int,
+    copies: int,
+    matching_query: bool,
+    frame_index: str,
+    nprobe: int,
 ):
     assert jitter_noise <= average_frames
     assert average_frames > 0
     assert dataset_size > 0
     assert query_size > 0
+    assert copies > 0
 
     data_generation_timer = nullcontext()
     if average_frames * dataset_size > 10000:
@@ -65,12 +89,14 @@ def run_benchmark(
             )
             for _ in range(dataset_size)
         ]
+        # Popular videos are in the dataset many times
+        hashes = [h for h in hashes for _ in range(copies)]
     if test_type == IndexType.SIGNAL_TYPE:
-        build = lambda: build_signal(hashes)
+        build = lambda: build_signal(hashes, frame_index, nprobe)
     elif test_type == IndexType.BRUTE_FORCE:
         build = lambda: hashes
-    elif test_type == IndexType.FLAT:
-        build = lambda: build_flat(hashes)
+    elif test_type in FRAME_INDEX_TESTS:
+        build = lambda: build_frame_index(hashes, FRAME_INDEX_TESTS[test_type], nprobe)
     else:
         raise ValueError("Invalid test type")
 
@@ -81,33 +107,60 @@ def run_benchmark(
     if query_size > 10000:
         query_generation_timer = timer("Generating queries", True)
     with query_generation_timer:
-        hq = get_random_vpdq_features(query_size)
+        if matching_query:
+            # Each frame matches a frame of a random video (and its copies)
+            hq = pdq_hashes_to_vpdq_features(
+                [
+                    get_similar_hash(random.choice(random.choice(hashes)).pdq_hex, 8)
+                    for _ in range(query_size)
+                ]
+            )
+        else:
+            hq = get_random_vpdq_features(query_size)
     if test_type == IndexType.SIGNAL_TYPE:
         query = lambda: signal_match(hq, index)
     elif test_type == IndexType.BRUTE_FORCE:
         query = lambda: brute_force_match(hq, index)
-    elif test_type == IndexType.FLAT:
+    elif test_type in FRAME_INDEX_TESTS:
         query = lambda: index.search_with_distance_in_result(
             hq, VPDQ_DISTANCE_THRESHOLD
         )
 
     with timer("query") as t:
-        query()
+        result = query()
     query_time = t()
     print(f"  Per query: {1000 * query_time / query_size:.4f}ms")
 
+    if test_type in (IndexType.MIH, IndexType.IVF):
+        flat_result = build_frame_index(hashes, FRAME_INDEX_FLAT, nprobe)
+        print_recall(
+            flat_result.search_with_distance_in_result(hq, VPDQ_DISTANCE_THRESHOLD),
+            result,
+        )
 
-def build_flat(videos):
-    index = VPDQHashIndex()
-    for v in videos:
-        index.add_single_video(v)
+
+def build_frame_index(videos, index_type: str, nprobe: int):
+    index = VPDQHashIndex(index_type=index_type, nprobe=nprobe)
+    # Only unique frames are added, as VPDQIndex does
+    index.add_features(list({f.pdq_hex: f for v in videos for f in v}.values()))
     return index
 
 
-def build_signal(hashes):
-    index = VPDQIndex()
-    for h in hashes:
-        index.add(vpdq_to_json(h), object())
+def print_recall(truth, results) -> None:
+    expected = sum(len(matches) for matches in truth.values())
+    found = sum(
+        len(set(matches) & set(results[query_hash]))
+        for query_hash, matches in truth.items()
+    )
+    recall = found / expected * 100 if expected else 100.0
+    print(f"  Recall vs flat: {recall:.1f}% of {expected} frame matches")
+
+
+def build_signal(hashes, frame_index: str, nprobe: int):
+    index = VPDQIndex.build(
+        ((vpdq_to_json(h), object()) for h in hashes), frame_index=frame_index
+    )
+    index.index.nprobe = nprobe
     return index
 
 
@@ -152,6 +205,31 @@ def get_argparse():
         default=1000,
         help="number of queries",
     )
+    ap.add_argument(
+        "--copies",
+        "-c",
+        type=int,
+        default=1,
+        help="How many times each video is in the dataset",
+    )
+    ap.add_argument(
+        "--matching-query",
+        "-m",
+        action="store_true",
+        help="Make every query frame match frames in the dataset, rather than random",
+    )
+    ap.add_argument(
+        "--frame-index",
+        choices=list(FRAME_INDEX_TESTS.values()),
+        default=FRAME_INDEX_FLAT,
+        help="The frame index for signal_type to search with",
+    )
+    ap.add_argument(
+        "--nprobe",
+        type=int,
+        default=32,
+        help="How many clusters ivf frame indices search",
+    )
     ap.add_argument(
         "test_type",
         choices=list(IndexType),